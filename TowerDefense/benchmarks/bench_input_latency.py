@@ -0,0 +1,92 @@
+"""
+Click-to-display latency of the real game loop, normal and low-latency input order
+
+A background thread posts mouse presses and releases at random moments,
+each carrying the time it was posted, while the game runs its normal loop
+with the dummy video driver; InputLatencyMonitor times every click to the
+flip that shows it. A generated scenario keeps the simulation busy. Run
+from the TowerDefense directory:
+    python benchmarks/bench_input_latency.py --seconds 10
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import pygame
+from config import *
+from game.latency import InputLatencyMonitor
+from game.scenarios import generate_scenario
+from game.tower_defense_game import TowerDefenseGame
+
+def post_clicks(seconds, rate, seed, stop):
+    """Post presses and releases on random map tiles, then quit"""
+    rng = random.Random(seed)
+    end = time.perf_counter() + seconds
+    next_wave = 0.0
+    while time.perf_counter() < end and not stop.is_set():
+        time.sleep(rng.expovariate(rate))
+        now = time.perf_counter()
+        if now >= next_wave:
+            # Keep enemies on the map so the update does real work
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_n, mod=0))
+            next_wave = now + 2.0
+        pos = (rng.randrange(SCREEN_WIDTH - UI_PANEL_WIDTH), rng.randrange(SCREEN_HEIGHT))
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=pos,
+                                             arrival=time.perf_counter()))
+        time.sleep(rng.uniform(0.03, 0.12))
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONUP, button=1, pos=pos,
+                                             arrival=time.perf_counter()))
+    pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+def run_loop(low_latency, args):
+    """Run the game loop for args.seconds; returns (latency monitor, ticks per second)"""
+    scenario = generate_scenario(args.seed, density=args.density)
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = TowerDefenseGame(seed=args.seed, record_replay=False, rewind=False,
+                                scenario=scenario)
+    game.latency = InputLatencyMonitor()
+    game.low_latency = low_latency
+
+    stop = threading.Event()
+    clicker = threading.Thread(target=post_clicks, args=(args.seconds, args.rate, args.seed, stop))
+    clicker.start()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            game.run()
+    finally:
+        stop.set()
+        clicker.join()
+    return game.latency, game.frame_count / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure click-to-flip latency of the game loop")
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of each run")
+    parser.add_argument("--rate", type=float, default=4.0, help="clicks per second")
+    parser.add_argument("--seed", type=int, default=0, help="scenario and click seed")
+    parser.add_argument("--density", type=float, default=0.3, help="scenario tower density")
+    args = parser.parse_args()
+
+    pygame.init()
+    points = (50, 90, 99)
+    for label, low_latency in (("normal", False), ("low-latency", True)):
+        monitor, tick_rate = run_loop(low_latency, args)
+        for kind, name in ((0, "press"), (1, "release")):
+            figures = monitor.percentiles(points, kind)
+            if figures is None:
+                continue
+            values = "  ".join(f"p{point} {value:6.2f} ms"
+                               for point, value in zip(points, figures["measured"]))
+            print(f"  {label:>11}  {name:<7}  {values}  ({tick_rate:.1f} ticks/s)")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
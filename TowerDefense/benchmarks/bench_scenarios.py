@@ -0,0 +1,84 @@
+"""
+Simulation benchmark over a corpus of generated scenarios
+
+Runs every scenario headlessly with no graphics, starting each wave as soon
+as the previous one ends, and ranks them by their slowest frames so the
+pathological cases stand out. Run from the TowerDefense directory:
+    python benchmarks/bench_scenarios.py --count 20 --seed 1
+    python benchmarks/bench_scenarios.py --save-worst worst.json
+    python benchmarks/bench_scenarios.py --load worst.json
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from game.scenarios import Scenario, generate_corpus
+from game.tower_defense_game import TowerDefenseGame
+
+def run_scenario(scenario, frames, seed=0):
+    """Simulate a scenario for up to `frames` frames; returns its timing figures"""
+    game = TowerDefenseGame(graphics=False, simulation_process=False, seed=seed,
+                            record_replay=False, rewind=False, scenario=scenario)
+    times = np.zeros(frames)
+    peak_enemies = 0
+    simulated = 0
+    for frame in range(frames):
+        if not game.wave_manager.is_wave_active():
+            game.apply_command(("start_wave",))
+        start = time.perf_counter()
+        game.update_game_logic()
+        times[frame] = time.perf_counter() - start
+        peak_enemies = max(peak_enemies, len(game.enemies))
+        simulated = frame + 1
+        if game.game_over:
+            break
+    times = times[:simulated] * 1000.0
+    return {
+        "frames": simulated,
+        "towers": len(game.towers),
+        "peak_enemies": peak_enemies,
+        "wave": game.wave_manager.get_current_wave(),
+        "mean_ms": float(times.mean()),
+        "p99_ms": float(np.percentile(times, 99)),
+        "max_ms": float(times.max()),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the simulation on generated scenarios")
+    parser.add_argument("--seed", type=int, default=0, help="corpus seed")
+    parser.add_argument("--count", type=int, default=12, help="scenarios to generate")
+    parser.add_argument("--frames", type=int, default=3000, help="frames per scenario")
+    parser.add_argument("--load", help="run the scenarios in this JSON file instead")
+    parser.add_argument("--save-worst", help="write the scenario with the worst p99 here")
+    args = parser.parse_args()
+
+    if args.load:
+        scenarios = [Scenario.load(args.load)]
+    else:
+        scenarios = generate_corpus(args.seed, args.count)
+
+    results = []
+    for scenario in scenarios:
+        result = run_scenario(scenario, args.frames)
+        results.append((scenario, result))
+        params = scenario.params
+        print(f"  seed {scenario.seed:>10}  turns {params.get('turns', '-'):>2}  "
+              f"density {params.get('density', 0):.2f}  waves of {params.get('wave_size', '-'):>2}  "
+              f"towers {result['towers']:>3}  peak enemies {result['peak_enemies']:>4}  "
+              f"mean {result['mean_ms']:6.3f} ms  p99 {result['p99_ms']:6.3f} ms  "
+              f"max {result['max_ms']:6.2f} ms")
+
+    results.sort(key=lambda item: item[1]["p99_ms"], reverse=True)
+    worst, figures = results[0]
+    print(f"Worst p99: seed {worst.seed} ({figures['p99_ms']:.3f} ms, "
+          f"{figures['towers']} towers, {figures['peak_enemies']} enemies)")
+    if args.save_worst:
+        worst.save(args.save_worst)
+        print(f"Saved to {args.save_worst}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Microbenchmark: Vector2D against the previous dict-based class, tuples and NumPy
+
+Run from the TowerDefense directory:
+    python benchmarks/bench_vector2d.py
+"""
+
+import math
+import os
+import sys
+import timeit
+import tracemalloc
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from utils.vector2d import Vector2D, vectors_to_array
+
+COUNT = 1000      # Entities per step, roughly a heavy wave plus its projectiles
+REPEAT = 200
+
+class LegacyVector2D:
+    """The Vector2D this module replaced: per-instance __dict__, allocating operators"""
+
+    def __init__(self, x=0, y=0):
+        self.x = float(x)
+        self.y = float(y)
+
+    def __add__(self, other):
+        return LegacyVector2D(self.x + other.x, self.y + other.y)
+
+    def __sub__(self, other):
+        return LegacyVector2D(self.x - other.x, self.y - other.y)
+
+    def magnitude(self):
+        return math.sqrt(self.x ** 2 + self.y ** 2)
+
+    def distance_to(self, other):
+        return (other - self).magnitude()
+
+def bench(label, func):
+    seconds = min(timeit.repeat(func, number=REPEAT, repeat=3)) / REPEAT
+    print(f"  {label:<34} {seconds * 1e6:9.1f} us/step  {seconds / COUNT * 1e9:7.1f} ns/item")
+
+def allocation(label, factory):
+    tracemalloc.start()
+    items = [factory(i) for i in range(COUNT)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<34} {size / len(items):9.1f} bytes/item")
+
+def main():
+    legacy_pos = [LegacyVector2D(i, i) for i in range(COUNT)]
+    legacy_vel = [LegacyVector2D(1.0, 0.5) for _ in range(COUNT)]
+    slotted_pos = [Vector2D(i, i) for i in range(COUNT)]
+    slotted_vel = [Vector2D(1.0, 0.5) for _ in range(COUNT)]
+    tuple_pos = [(float(i), float(i)) for i in range(COUNT)]
+    tuple_vel = [(1.0, 0.5)] * COUNT
+    array_pos = np.arange(COUNT * 2, dtype=np.float64).reshape(COUNT, 2)
+    array_vel = np.tile([1.0, 0.5], (COUNT, 1))
+    legacy_center = LegacyVector2D(400, 300)
+    slotted_center = Vector2D(400, 300)
+
+    print(f"Move {COUNT} positions by their velocity")
+
+    def legacy_move():
+        for i in range(COUNT):
+            legacy_pos[i] = legacy_pos[i] + legacy_vel[i]
+
+    def slotted_move():
+        for position, velocity in zip(slotted_pos, slotted_vel):
+            position.iadd(velocity)
+
+    def tuple_move():
+        for i in range(COUNT):
+            x, y = tuple_pos[i]
+            vx, vy = tuple_vel[i]
+            tuple_pos[i] = (x + vx, y + vy)
+
+    def numpy_move():
+        array_pos.__iadd__(array_vel)
+
+    bench("legacy Vector2D (p = p + v)", legacy_move)
+    bench("slotted Vector2D (p.iadd(v))", slotted_move)
+    bench("tuples", tuple_move)
+    bench("NumPy batch (one array op)", numpy_move)
+
+    print(f"Range check {COUNT} positions against one tower")
+    radius = 120.0
+    radius_sq = radius * radius
+
+    def legacy_range():
+        return sum(1 for p in legacy_pos if legacy_center.distance_to(p) <= radius)
+
+    def slotted_distance():
+        return sum(1 for p in slotted_pos if slotted_center.distance_to(p) <= radius)
+
+    def slotted_distance_sq():
+        return sum(1 for p in slotted_pos if slotted_center.distance_sq_to(p) <= radius_sq)
+
+    def tuple_range():
+        cx, cy = 400.0, 300.0
+        return sum(1 for x, y in tuple_pos if (x - cx) ** 2 + (y - cy) ** 2 <= radius_sq)
+
+    def numpy_range():
+        delta = array_pos - (400.0, 300.0)
+        return int(np.count_nonzero(np.einsum("ij,ij->i", delta, delta) <= radius_sq))
+
+    out = np.empty((COUNT, 2))
+
+    def numpy_range_from_vectors():
+        points = vectors_to_array(slotted_pos, out)
+        delta = points - (400.0, 300.0)
+        return int(np.count_nonzero(np.einsum("ij,ij->i", delta, delta) <= radius_sq))
+
+    bench("legacy distance_to", legacy_range)
+    bench("slotted distance_to", slotted_distance)
+    bench("slotted distance_sq_to", slotted_distance_sq)
+    bench("tuples", tuple_range)
+    bench("NumPy batch", numpy_range)
+    bench("NumPy batch incl. vectors_to_array", numpy_range_from_vectors)
+
+    print("Memory per position")
+    allocation("legacy Vector2D", lambda i: LegacyVector2D(i, i))
+    allocation("slotted Vector2D", lambda i: Vector2D(i, i))
+    allocation("tuple", lambda i: (float(i), float(i) + 0.5))
+    print(f"  {'NumPy (n, 2) float64 row':<34} {array_pos.itemsize * 2:9.1f} bytes/item")
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,9 @@ ORANGE = (255, 165, 0)
 GRAY = (128, 128, 128)
 LIGHT_GRAY = (200, 200, 200)
 DARK_GRAY = (64, 64, 64)
+CYAN = (0, 200, 255)
+LIME = (120, 220, 40)
+DARK_GREEN = (20, 100, 20)
 
 # Game settings
 FPS = 60
@@ -29,16 +32,89 @@ ENEMY_HEALTH = 100
 ENEMY_SPEED = 2
 ENEMY_REWARD = 10
 
+# Crowd separation (enemies that overlap spread out sideways across the path)
+CROWD_SEPARATION_ENABLED = True
+CROWD_SEPARATION_DISTANCE = 20  # Centres closer than this push apart
+CROWD_MAX_OFFSET = 14  # Furthest an enemy strays from the centreline
+CROWD_SEPARATION_STRENGTH = 2.0  # Sideways pixels per frame at full overlap
+CROWD_RETURN_RATE = 0.2  # Pixels per frame back towards the centreline when uncrowded
+CROWD_MAX_NEIGHBOURS = 8  # Overlaps each enemy counts per frame (more than fit once spread out)
+
 # Tower settings
 TOWER_COST = 50
 TOWER_RANGE = 80
 TOWER_DAMAGE = 25
 TOWER_ATTACK_RATE = 30  # frames between attacks
+ANALYTIC_PROJECTILES = True  # Resolve hits at fire time instead of stepping projectiles
+
+# Effects settings
+PARTICLE_CAPACITY = 2048  # Global cap on live particles
+LOD_ENABLED = True  # Drop decorations automatically when frames run over budget
+
+# Telemetry settings (opt-in balance logging)
+TELEMETRY_ENABLED = False
+TELEMETRY_PATH = "telemetry.npz"  # .npz for columnar arrays, .csv for plain rows
+TELEMETRY_CAPACITY = 8192  # Records buffered before a bulk flush
+
+# Memory accounting settings (opt-in; tracemalloc slows the game down)
+MEMORY_PROFILE_ENABLED = False
+MEMORY_REPORT_PATH = "memory_report.txt"  # Written on exit
+MEMORY_TRACE_DEPTH = 1  # Stack frames kept per traced allocation
+MEMORY_GROWTH_WAVES = 3  # Consecutive waves of growth before it is flagged
+MEMORY_GROWTH_BYTES = 256 * 1024  # Smallest traced growth over those waves worth flagging
+
+# Input latency settings
+LATENCY_PROFILE_ENABLED = False  # Time every click to the flip that shows it; percentiles on exit
+LATENCY_SAMPLES = 4096  # Most recent clicks kept
+LOW_LATENCY_INPUT = False  # Poll input just before rendering instead of before the update
+
+# Multi-process settings (simulation in a worker, rendering in the main process)
+SIMULATION_PROCESS = False
+SHARED_MAX_ENEMIES = 1024  # Per-frame capacity of the shared state buffers
+SHARED_MAX_TOWERS = 512
+SHARED_MAX_PROJECTILES = 1024
+
+# Spectator streaming settings (opt-in; python -m game.spectator watches)
+SPECTATOR_ENABLED = False
+SPECTATOR_HOST = "127.0.0.1"
+SPECTATOR_PORT = 8765
+SPECTATOR_BACKLOG = 4  # Frames queued per spectator before frames are dropped for it
+
+# Replay and capture settings
+REPLAY_RECORD = False  # Log player commands so the game can be replayed and captured
+REPLAY_PATH = "replay.json"
+CAPTURE_EVERY = 2  # Capture every Nth simulated frame
+
+# Rewind settings (R steps back, Shift+R steps back further)
+REWIND_ENABLED = True
+REWIND_SECONDS = 30  # How far back the game can be rewound
+REWIND_KEYFRAME_INTERVAL = 30  # Ticks between full state keyframes; at most this many are re-run
+REWIND_MEMORY_BUDGET = 16 * 1024 * 1024  # Oldest keyframes are dropped beyond this many bytes
+REWIND_STEP_SECONDS = 1
+REWIND_LONG_STEP_SECONDS = 10
+
+# Training environment settings (game.env)
+ENV_FRAMES_PER_STEP = 10  # Simulated frames per environment step
+ENV_MAX_FRAMES = FPS * 60 * 30  # Episodes are truncated after this many frames
+ENV_LEAK_PENALTY = 25  # Reward lost per life lost
+
+# Wave outcome prediction (game.wave_predictor)
+PREDICTOR_DANGER_MARGIN = 1.5  # Warn when the weakest enemy type gets less than this times its health
 
 # Player settings
 STARTING_MONEY = 200
 STARTING_LIVES = 20
+SELL_REFUND = 0.7  # Fraction of a tower's total spend (build plus upgrades) returned on sale
 
 # UI settings
 UI_PANEL_WIDTH = 200
-UI_PANEL_HEIGHT = SCREEN_HEIGHT
\ No newline at end of file
+UI_PANEL_HEIGHT = SCREEN_HEIGHT
+
+# Map and camera settings (maps larger than the viewport scroll)
+MAP_WIDTH = SCREEN_WIDTH - UI_PANEL_WIDTH  # Default map fills the area left of the UI panel
+MAP_HEIGHT = SCREEN_HEIGHT
+CHUNK_SIZE = 256  # Background is cached in square chunks of this many pixels
+CHUNK_CACHE_SIZE = 64  # Chunks kept before least-recently-used eviction
+CAMERA_PAN_SPEED = 12  # Screen pixels per frame while an arrow key is held
+CAMERA_MIN_ZOOM = 0.5
+CAMERA_MAX_ZOOM = 2.0
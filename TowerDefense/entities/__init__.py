@@ -2,5 +2,5 @@
 Entities package initialization
 """
 
-from .enemy import Enemy
-from .tower import Tower, Projectile
\ No newline at end of file
+from .enemy import Enemy, ENEMY_TYPES
+from .tower import Tower, Projectile, ScheduledProjectile, TOWER_TYPES
\ No newline at end of file
@@ -4,92 +4,138 @@ Enemy class for tower defense game
 
 import pygame
 import math
+import itertools
 from utils.vector2d import Vector2D
+from utils.path_geometry import get_path_geometry
 from config import *
 
+_enemy_ids = itertools.count(1)
+
+# Enemy properties based on type
+ENEMY_TYPES = {
+    "basic": {"health": 100, "speed": 1.5, "reward": 10, "color": RED, "armor": 0.0},
+    "fast": {"health": 50, "speed": 3.0, "reward": 15, "color": YELLOW, "armor": 0.0},
+    "strong": {"health": 200, "speed": 1.0, "reward": 25, "color": PURPLE, "armor": 0.0},
+    "tank": {"health": 500, "speed": 0.8, "reward": 50, "color": DARK_GRAY, "armor": 0.0}
+}
+
 class Enemy:
     """Base enemy class"""
     
     def __init__(self, path_points, enemy_type="basic"):
+        self.uid = next(_enemy_ids)  # Stable identity for logs and telemetry
         self.path_points = path_points
+        self.path = get_path_geometry(path_points)
         self.path_index = 0
+        self.progress = 0.0  # Arc length travelled along the path
+        self.lateral = 0.0  # Sideways offset from the centreline, set by crowd separation
         self.position = Vector2D(path_points[0][0], path_points[0][1])
         self.target_position = Vector2D(path_points[1][0], path_points[1][1])
         
-        # Enemy properties based on type
-        enemy_types = {
-            "basic": {"health": 100, "speed": 1.5, "reward": 10, "color": RED},
-            "fast": {"health": 50, "speed": 3.0, "reward": 15, "color": YELLOW},
-            "strong": {"health": 200, "speed": 1.0, "reward": 25, "color": PURPLE},
-            "tank": {"health": 500, "speed": 0.8, "reward": 50, "color": DARK_GRAY}
-        }
-        
         self.type = enemy_type
-        props = enemy_types.get(enemy_type, enemy_types["basic"])
+        props = ENEMY_TYPES.get(enemy_type, ENEMY_TYPES["basic"])
         self.max_health = props["health"]
         self.health = self.max_health
-        self.speed = props["speed"]
+        self.base_speed = props["speed"]
+        self.speed = self.base_speed  # Effective speed after slows
+        self.base_armor = props["armor"]
+        self.armor = self.base_armor  # Fraction of damage blocked; negative amplifies
+        self.poisoned = False
         self.reward = props["reward"]
         self.color = props["color"]
         
         self.alive = True
         self.reached_end = False
         self.radius = 12
+        self.events = None  # GameEvents hook, set by the game on spawn
+    
+    def __getstate__(self):
+        """Pickle without the event hook; whoever restores the enemy re-attaches it"""
+        state = self.__dict__.copy()
+        state["events"] = None
+        return state
         
     def update(self):
         """Update enemy position along path"""
         if not self.alive or self.reached_end:
             return
         
-        # Move towards target position
-        direction = self.target_position - self.position
-        distance = direction.magnitude()
+        # Advance along the path by arc length so future positions are predictable
+        self.progress += self.speed
         
-        if distance < self.speed:
-            # Reached current target, move to next waypoint
-            self.position = Vector2D(self.target_position.x, self.target_position.y)
-            self.path_index += 1
-            
-            if self.path_index >= len(self.path_points) - 1:
-                # Reached end of path
-                self.reached_end = True
-                return
-            
-            self.target_position = Vector2D(
+        if self.progress >= self.path.total_length:
+            # Reached end of path
+            self.progress = self.path.total_length
+            self.path_index = len(self.path_points) - 1
+            end_x, end_y = self.path.points[-1]
+            self.position.set(end_x, end_y)
+            self.reached_end = True
+            return
+        
+        segment = self.path.segment_at(self.progress, self.path_index)
+        if segment != self.path_index:
+            # Moved on to the next waypoint
+            self.path_index = segment
+            self.target_position.set(
                 self.path_points[self.path_index + 1][0],
                 self.path_points[self.path_index + 1][1]
             )
-        else:
-            # Move towards target
-            normalized_direction = direction.normalize()
-            self.position = self.position + (normalized_direction * self.speed)
+        
+        x, y = self.path.point_at(self.progress, self.path_index)
+        self.position.set(x, y)
     
-    def take_damage(self, damage):
-        """Apply damage to enemy"""
-        self.health -= damage
+    def predict_position(self, frames_ahead):
+        """Predict where the enemy will be after the given number of frames"""
+        distance = self.progress + self.speed * frames_ahead
+        x, y = self.path.point_at(distance, self.path_index)
+        if self.lateral and distance < self.path.total_length:
+            normal_x, normal_y = self.path.normal_at(distance, self.path_index,
+                                                     CROWD_SEPARATION_DISTANCE)
+            return (x + normal_x * self.lateral, y + normal_y * self.lateral)
+        return (x, y)
+    
+    def take_damage(self, damage, source=None):
+        """Apply damage to enemy, optionally crediting the tower that dealt it"""
+        self.health -= damage * (1.0 - self.armor)
+        if self.events is not None:
+            self.events.enemy_hit(self, damage, source)
         if self.health <= 0:
             self.alive = False
     
-    def draw(self, screen):
-        """Draw enemy on screen"""
+    def draw(self, screen, simple_health_bar=False, offset=(0, 0)):
+        """Draw enemy on screen, shifted by the camera offset"""
         if not self.alive:
             return
         
+        center = self.position.to_screen(offset)
+        
         # Draw enemy circle
-        pygame.draw.circle(screen, self.color, self.position.to_tuple(), self.radius)
-        pygame.draw.circle(screen, BLACK, self.position.to_tuple(), self.radius, 2)
+        pygame.draw.circle(screen, self.color, center, self.radius)
+        pygame.draw.circle(screen, BLACK, center, self.radius, 2)
+        
+        # Status effect rings
+        if self.speed < self.base_speed:
+            pygame.draw.circle(screen, CYAN, center, self.radius + 3, 2)
+        if self.poisoned:
+            pygame.draw.circle(screen, DARK_GREEN, center, self.radius + 6, 2)
         
         # Draw health bar
         bar_width = 20
         bar_height = 4
-        bar_x = self.position.x - bar_width // 2
-        bar_y = self.position.y - self.radius - 8
+        bar_x = center[0] - bar_width // 2
+        bar_y = center[1] - self.radius - 8
+        health_percentage = self.health / self.max_health
+        
+        if simple_health_bar:
+            # Single rect colored by remaining health
+            bar_color = GREEN if health_percentage > 0.5 else RED
+            pygame.draw.rect(screen, bar_color, (bar_x, bar_y, int(bar_width * health_percentage), bar_height))
+            return
         
         # Background (red)
         pygame.draw.rect(screen, RED, (bar_x, bar_y, bar_width, bar_height))
         
         # Health (green)
-        health_percentage = self.health / self.max_health
         health_width = int(bar_width * health_percentage)
         pygame.draw.rect(screen, GREEN, (bar_x, bar_y, health_width, bar_height))
         
@@ -4,14 +4,58 @@ Tower class for tower defense game
 
 import pygame
 import math
+import itertools
 from utils.vector2d import Vector2D
 from config import *
 from .enemy import Enemy
 
+_tower_ids = itertools.count(1)
+
+# Tower properties based on type
+TOWER_TYPES = {
+    "basic": {
+        "name": "Basic", "damage": 25, "range": 80, "attack_rate": 30, 
+        "cost": 50, "color": BLUE, "projectile_speed": 5, "splash_radius": 0,
+        "effects": [], "aura": None
+    },
+    "sniper": {
+        "name": "Sniper", "damage": 75, "range": 150, "attack_rate": 60, 
+        "cost": 100, "color": GREEN, "projectile_speed": 10, "splash_radius": 0,
+        "effects": [], "aura": None
+    },
+    "machine_gun": {
+        "name": "M.Gun", "damage": 10, "range": 60, "attack_rate": 10, 
+        "cost": 75, "color": RED, "projectile_speed": 8, "splash_radius": 0,
+        "effects": [], "aura": None
+    },
+    "cannon": {
+        "name": "Cannon", "damage": 100, "range": 90, "attack_rate": 90, 
+        "cost": 150, "color": PURPLE, "projectile_speed": 3, "splash_radius": 50,
+        "effects": [], "aura": None
+    },
+    "frost": {
+        "name": "Frost", "damage": 5, "range": 80, "attack_rate": 30, 
+        "cost": 80, "color": CYAN, "projectile_speed": 6, "splash_radius": 0,
+        "effects": [("slow", 0.5, 90)], "aura": None
+    },
+    "poison": {
+        "name": "Poison", "damage": 5, "range": 80, "attack_rate": 45, 
+        "cost": 90, "color": LIME, "projectile_speed": 6, "splash_radius": 0,
+        "effects": [("poison", 20, 180), ("armor_break", 0.25, 180)], "aura": None
+    },
+    "support": {
+        "name": "Support", "damage": 0, "range": 100, "attack_rate": 60, 
+        "cost": 120, "color": ORANGE, "projectile_speed": 0, "splash_radius": 0,
+        "effects": [],
+        # Buffs towers within `radius` tiles: +damage, +range, +fire rate (fractions)
+        "aura": {"radius": 2, "damage": 0.25, "range": 0.1, "attack_rate": 0.2}
+    }
+}
+
 class Projectile:
     """Projectile fired by towers"""
     
-    def __init__(self, start_pos, target_pos, damage, speed=5, max_range=200):
+    def __init__(self, start_pos, target_pos, damage, speed=5, max_range=200, splash_radius=0):
         self.start_position = Vector2D(start_pos.x, start_pos.y)
         self.position = Vector2D(start_pos.x, start_pos.y)
         self.target = Vector2D(target_pos.x, target_pos.y)
@@ -19,108 +63,207 @@ class Projectile:
         self.speed = speed
         self.alive = True
         self.max_range = max_range  # Maximum distance projectile can travel
+        self.splash_radius = splash_radius  # Area damage radius on impact (0 = single target)
         
         # Calculate direction
-        direction = self.target - self.position
-        self.velocity = direction.normalize() * self.speed
+        self.velocity = (self.target - self.position).normalize_().scale_(self.speed)
+        self.max_range_sq = max_range * max_range
         
     def update(self):
         """Update projectile position"""
         if not self.alive:
             return
         
-        self.position = self.position + self.velocity
+        self.position.iadd(self.velocity)
         
         # Check if projectile has traveled too far (prevent infinite travel)
-        distance_traveled = self.position.distance_to(self.start_position)
-        if distance_traveled > self.max_range:
+        if self.position.distance_sq_to(self.start_position) > self.max_range_sq:
             self.alive = False
     
-    def draw(self, screen):
+    def draw(self, screen, offset=(0, 0)):
         """Draw projectile"""
         if self.alive:
-            pygame.draw.circle(screen, YELLOW, self.position.to_tuple(), 3)
-            pygame.draw.circle(screen, ORANGE, self.position.to_tuple(), 3, 1)
+            center = self.position.to_screen(offset)
+            pygame.draw.circle(screen, YELLOW, center, 3)
+            pygame.draw.circle(screen, ORANGE, center, 3, 1)
+
+class ScheduledProjectile(Projectile):
+    """Purely visual projectile whose hit was resolved analytically at fire time"""
+    
+    def __init__(self, start_pos, impact_pos, fire_tick, hit_tick):
+        self.start_position = Vector2D(start_pos.x, start_pos.y)
+        self.position = Vector2D(start_pos.x, start_pos.y)
+        self.impact_position = Vector2D(impact_pos[0], impact_pos[1])
+        self.fire_tick = fire_tick
+        self.hit_tick = hit_tick
+        self.alive = True
+    
+    def update(self, frame_count):
+        """Interpolate between the muzzle and the predicted impact point"""
+        if frame_count >= self.hit_tick:
+            self.alive = False
+            return
+        
+        t = (frame_count - self.fire_tick) / (self.hit_tick - self.fire_tick)
+        self.position.set(
+            self.start_position.x + (self.impact_position.x - self.start_position.x) * t,
+            self.start_position.y + (self.impact_position.y - self.start_position.y) * t
+        )
 
 class Tower:
     """Base tower class"""
     
     def __init__(self, x, y, tower_type="basic"):
+        self.uid = next(_tower_ids)  # Stable identity for logs and telemetry
         self.position = Vector2D(x, y)
         self.tower_type = tower_type
         
-        # Tower properties based on type
-        tower_types = {
-            "basic": {
-                "damage": 25, "range": 80, "attack_rate": 30, 
-                "cost": 50, "color": BLUE, "projectile_speed": 5
-            },
-            "sniper": {
-                "damage": 75, "range": 150, "attack_rate": 60, 
-                "cost": 100, "color": GREEN, "projectile_speed": 10
-            },
-            "machine_gun": {
-                "damage": 10, "range": 60, "attack_rate": 10, 
-                "cost": 75, "color": RED, "projectile_speed": 8
-            },
-            "cannon": {
-                "damage": 100, "range": 90, "attack_rate": 90, 
-                "cost": 150, "color": PURPLE, "projectile_speed": 3
-            }
-        }
-        
-        props = tower_types.get(tower_type, tower_types["basic"])
-        self.damage = props["damage"]
-        self.range = props["range"]
-        self.attack_rate = props["attack_rate"]  # frames between attacks
+        props = TOWER_TYPES.get(tower_type, TOWER_TYPES["basic"])
+        self.base_damage = props["damage"]
+        self.base_range = props["range"]
+        self.base_attack_rate = props["attack_rate"]
+        
+        # Effective stats after support buffs, cached until buffs change
+        self.damage = self.base_damage
+        self.range = self.base_range
+        self.attack_rate = self.base_attack_rate  # frames between attacks
+        self.buffs = (0.0, 0.0, 0.0)  # (damage, range, attack_rate) bonus fractions
+        
         self.cost = props["cost"]
         self.color = props["color"]
         self.projectile_speed = props["projectile_speed"]
+        self.splash_radius = props["splash_radius"]
+        self.effects = props["effects"]  # (kind, magnitude, duration) applied on hit
+        self.aura = dict(props["aura"]) if props["aura"] else None
+        self.level = 1
         
         self.last_attack = 0
         self.target = None
+        self.targeting = "first"  # See game.targeting.TARGETING_STRATEGIES
+        self.path = None
+        self.coverage = None  # Arc-length intervals of the path within range
+        self.coverage_pieces = None  # Per-segment pieces used by "closest"
         self.projectiles = []
+        self.projectile_visuals = True  # Headless simulations can skip visual projectiles
+        self.events = None  # GameEvents hook, set by the game on placement
         self.radius = 15
+    
+    def __getstate__(self):
+        """Pickle without the event hook; whoever restores the tower re-attaches it"""
+        state = self.__dict__.copy()
+        state["events"] = None
+        return state
         
     def can_attack(self, frame_count):
         """Check if tower can attack"""
         return frame_count - self.last_attack >= self.attack_rate
     
-    def find_target(self, enemies:Enemy):
-        """Find the best target among enemies in range"""
+    def compute_coverage(self, path):
+        """Precompute the stretches of the path this tower can reach"""
+        self.path = path
+        center = (self.position.x, self.position.y)
+        self.coverage_pieces = path.coverage_pieces(center, self.range)
+        self.coverage = path.coverage_intervals(center, self.range)
+    
+    def find_target(self, enemies:Enemy, enemy_index=None):
+        """Find the best target in range according to the targeting strategy"""
+        if enemy_index is not None and self.coverage is not None:
+            # Query the maintained index instead of scanning every enemy
+            return enemy_index.select(self.targeting, self.coverage,
+                                      self.coverage_pieces, self.position)
+        
         targets_in_range = []
+        range_sq = self.range * self.range
         
         for enemy in enemies:
             if enemy.alive and not enemy.reached_end:
-                distance = self.position.distance_to(enemy.position)
-                if distance <= self.range:
-                    targets_in_range.append((enemy, distance))
+                distance_sq = self.position.distance_sq_to(enemy.position)
+                if distance_sq <= range_sq:
+                    targets_in_range.append((enemy, distance_sq))
         
         if not targets_in_range:
             return None
         
-        # Target the enemy that's furthest along the path (highest path_index)
-        targets_in_range.sort(key=lambda x: x[0].path_index, reverse=True)
-        return targets_in_range[0][0]
+        # Single pass selection, no sorting
+        if self.targeting == "last":
+            best = min(targets_in_range, key=lambda x: x[0].progress)
+        elif self.targeting == "strongest":
+            best = max(targets_in_range, key=lambda x: x[0].health)
+        elif self.targeting == "weakest":
+            best = min(targets_in_range, key=lambda x: x[0].health)
+        elif self.targeting == "closest":
+            best = min(targets_in_range, key=lambda x: x[1])
+        else:
+            # Target the enemy that's furthest along the path
+            best = max(targets_in_range, key=lambda x: x[0].progress)
+        return best[0]
     
-    def attack(self, target, frame_count):
-        """Attack target enemy"""
-        if self.can_attack(frame_count) and target:
+    def attack(self, target, frame_count, damage_events=None):
+        """Attack target enemy
+        
+        With a damage event queue the hit is resolved analytically: the intercept
+        time is solved against the target's path motion and the damage is
+        scheduled for the frame it lands. Otherwise a physical projectile is fired.
+        """
+        if not (self.can_attack(frame_count) and target):
+            return
+        
+        max_travel = self.range + 100  # Allow projectile to travel beyond tower range
+        
+        if damage_events is not None:
+            flight_time = target.path.intercept_time(
+                target.progress, target.speed,
+                (self.position.x, self.position.y),
+                self.projectile_speed, max_travel
+            )
+            if flight_time is None:
+                return  # Target leaves the path before any shot could land
+            
+            hit_tick = frame_count + max(1, math.ceil(flight_time))
+            impact = target.predict_position(hit_tick - frame_count)
+            damage_events.push(hit_tick, target, self.damage, self,
+                               self.splash_radius, impact)
+            if self.projectile_visuals:
+                self.projectiles.append(
+                    ScheduledProjectile(self.position, impact, frame_count, hit_tick)
+                )
+        else:
             # Create projectile with max range based on tower range
             projectile = Projectile(
                 self.position, target.position, 
                 self.damage, self.projectile_speed, 
-                max_range=self.range + 100  # Allow projectile to travel beyond tower range
+                max_range=max_travel, splash_radius=self.splash_radius
             )
             self.projectiles.append(projectile)
-            self.last_attack = frame_count
+        
+        self.last_attack = frame_count
+        if self.events is not None:
+            self.events.tower_fired(self, target, frame_count)
     
-    def update(self, enemies, frame_count):
+    def acquire_target(self, enemies, frame_count, damage_events=None, enemy_index=None):
+        """Find a target and attack it"""
+        self.target = self.find_target(enemies, enemy_index)
+        if self.target:
+            self.attack(self.target, frame_count, damage_events)
+    
+    def update(self, enemies, frame_count, damage_events=None, enemy_index=None,
+               status_effects=None):
         """Update tower logic"""
         # Find and attack target
-        self.target = self.find_target(enemies)
-        if self.target:
-            self.attack(self.target, frame_count)
+        self.acquire_target(enemies, frame_count, damage_events, enemy_index)
+        self.update_projectiles(enemies, frame_count, damage_events, enemy_index,
+                                status_effects)
+    
+    def update_projectiles(self, enemies, frame_count, damage_events=None, enemy_index=None,
+                           status_effects=None):
+        """Advance projectiles already in flight"""
+        if damage_events is not None:
+            # Hits are already scheduled, projectiles only need to be animated
+            for projectile in self.projectiles[:]:
+                projectile.update(frame_count)
+                if not projectile.alive:
+                    self.projectiles.remove(projectile)
+            return
         
         # Update projectiles
         for projectile in self.projectiles[:]:
@@ -133,11 +276,22 @@ class Tower:
             hit_enemy = False
             for enemy in enemies:
                 if enemy.alive and not enemy.reached_end:
-                    distance = projectile.position.distance_to(enemy.position)
                     # Much more generous collision radius for better gameplay
                     collision_radius = enemy.radius + 25  # Significantly increased collision area
-                    if distance < collision_radius:
-                        enemy.take_damage(projectile.damage)
+                    if (projectile.position.distance_sq_to(enemy.position)
+                            < collision_radius * collision_radius):
+                        if projectile.splash_radius > 0 and enemy_index is not None:
+                            # Explode on contact, damaging everything nearby
+                            hit = enemy_index.damage_area(
+                                enemy.path, projectile.position.to_tuple(),
+                                projectile.splash_radius, projectile.damage, self
+                            )
+                        else:
+                            enemy.take_damage(projectile.damage, self)
+                            hit = [enemy]
+                        if status_effects is not None and self.effects:
+                            for target in hit:
+                                status_effects.apply_all(target, self.effects, frame_count)
                         projectile.alive = False
                         hit_enemy = True
                         break
@@ -146,23 +300,49 @@ class Tower:
             if hit_enemy:
                 continue
     
-    def draw(self, screen):
-        """Draw tower and its projectiles"""
-        # Draw range circle (when selected - for now always show)
-        pygame.draw.circle(screen, LIGHT_GRAY, self.position.to_tuple(), self.range, 1)
+    def apply_buffs(self, damage_bonus, range_bonus, rate_bonus):
+        """Recompute cached effective stats from base stats and support bonuses"""
+        self.buffs = (damage_bonus, range_bonus, rate_bonus)
+        old_range = self.range
+        
+        self.damage = int(self.base_damage * (1 + damage_bonus))
+        self.range = int(self.base_range * (1 + range_bonus))
+        self.attack_rate = max(1, int(self.base_attack_rate / (1 + rate_bonus)))
+        
+        # Range changed, so the covered stretches of path did too
+        if self.range != old_range and self.path is not None:
+            self.compute_coverage(self.path)
+    
+    def draw(self, screen, show_range=True, show_target_line=True, offset=(0, 0)):
+        """Draw tower and its projectiles, shifted by the camera offset"""
+        center = self.position.to_screen(offset)
+        
+        if show_range and self.aura is not None:
+            # Draw aura area
+            size = (self.aura["radius"] * 2 + 1) * TILE_SIZE
+            aura_rect = pygame.Rect(0, 0, size, size)
+            aura_rect.center = center
+            pygame.draw.rect(screen, ORANGE, aura_rect, 2)
+        elif show_range:
+            # Draw range circle
+            pygame.draw.circle(screen, LIGHT_GRAY, center, self.range, 1)
         
         # Draw tower
-        pygame.draw.circle(screen, self.color, self.position.to_tuple(), self.radius)
-        pygame.draw.circle(screen, BLACK, self.position.to_tuple(), self.radius, 2)
+        pygame.draw.circle(screen, self.color, center, self.radius)
+        pygame.draw.circle(screen, BLACK, center, self.radius, 2)
+        
+        # Mark towers boosted by a support aura
+        if self.buffs != (0.0, 0.0, 0.0):
+            pygame.draw.circle(screen, ORANGE, (center[0] + 10, center[1] - 10), 4)
         
         # Draw targeting line
-        if self.target and self.target.alive:
-            pygame.draw.line(screen, RED, self.position.to_tuple(), 
-                           self.target.position.to_tuple(), 2)
+        if show_target_line and self.target and self.target.alive and not self.target.reached_end:
+            pygame.draw.line(screen, RED, center, 
+                           self.target.position.to_screen(offset), 2)
         
         # Draw projectiles
         for projectile in self.projectiles:
-            projectile.draw(screen)
+            projectile.draw(screen, offset)
     
     def get_upgrade_cost(self):
         """Get cost to upgrade this tower"""
@@ -170,7 +350,15 @@ class Tower:
     
     def upgrade(self):
         """Upgrade tower stats"""
-        self.damage = int(self.damage * 1.5)
-        self.range = int(self.range * 1.1)
-        self.attack_rate = max(5, int(self.attack_rate * 0.8))
-        self.cost += self.get_upgrade_cost()
\ No newline at end of file
+        self.base_damage = int(self.base_damage * 1.5)
+        self.base_range = int(self.base_range * 1.1)
+        self.base_attack_rate = max(5, int(self.base_attack_rate * 0.8))
+        self.cost += self.get_upgrade_cost()
+        self.level += 1
+        
+        # Support towers grow a stronger aura instead
+        if self.aura is not None:
+            for stat in ("damage", "range", "attack_rate"):
+                self.aura[stat] *= 1.25
+        
+        self.apply_buffs(*self.buffs)
\ No newline at end of file
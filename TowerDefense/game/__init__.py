@@ -5,4 +5,35 @@ Game package initialization
 from .tower_defense_game import TowerDefenseGame
 from .game_map import GameMap
 from .ui import UI
-from .wave_manager import WaveManager
\ No newline at end of file
+from .wave_manager import WaveManager
+from .damage_events import DamageEventQueue
+from .tower_scheduler import TowerScheduler
+from .targeting import EnemyProgressIndex, TARGETING_STRATEGIES
+from .status_effects import StatusEffectEngine
+from .aura_graph import AuraGraph
+from .events import GameEvents
+from .particles import ParticleSystem
+from .lod import LODController
+from .camera import Camera
+from .background_cache import ChunkedBackground
+from .replay import ReplayLog, play_replay
+
+# Optional subsystems with heavier imports (multiprocessing, Pillow, asyncio) load on first access
+_LAZY_EXPORTS = {
+    "TelemetryRecorder": ".telemetry",
+    "SharedGameState": ".shared_state",
+    "SimulationClient": ".shared_state",
+    "FrameCapture": ".capture",
+    "capture_replay": ".capture",
+    "TowerDefenseEnv": ".env",
+    "VectorTowerDefenseEnv": ".env",
+    "SpectatorServer": ".spectator",
+    "SpectatorClient": ".spectator",
+}
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import importlib
+    return getattr(importlib.import_module(module, __name__), name)
@@ -0,0 +1,121 @@
+"""
+Support tower auras maintained as an incremental buff graph over the map grid
+"""
+
+def _uid(tower):
+    return tower.uid
+
+class AuraGraph:
+    """Tracks which support towers buff which neighbouring towers
+
+    Towers are static, so the graph only changes when a tower is placed,
+    upgraded or removed. Each change touches the tiles around that tower and
+    rewrites the cached effective stats of the towers whose buffs changed.
+    Nothing is recomputed per frame. Changed towers are returned and summed
+    in placement (uid) order rather than set order, which follows object ids
+    and would differ between a live game and one restored from a snapshot.
+    """
+
+    def __init__(self, game_map):
+        self.game_map = game_map
+        self.supporters = {}  # tower -> set of support towers buffing it
+        self.buffed = {}      # support tower -> set of towers it buffs
+        self.max_radius = 0   # Largest aura radius in tiles seen so far
+
+    def add_tower(self, tower):
+        """Link a newly placed tower into the graph
+
+        Returns the towers whose effective stats changed.
+        """
+        return self.add_towers([tower])
+
+    def add_towers(self, towers):
+        """Link several newly placed towers, refreshing each changed tower once
+
+        The towers must already be on the map. Returns the towers whose
+        effective stats changed.
+        """
+        # Register the whole batch first, so towers can link to supports placed after them
+        for tower in towers:
+            self.supporters.setdefault(tower, set())
+            if tower.aura is not None:
+                self.buffed[tower] = set()
+                self.max_radius = max(self.max_radius, tower.aura["radius"])
+
+        changed = set()
+        for tower in towers:
+            if tower.aura is not None:
+                for neighbour in self._towers_near(tower, tower.aura["radius"]):
+                    if neighbour.aura is None:
+                        self._link(tower, neighbour)
+                        changed.add(neighbour)
+            else:
+                for neighbour in self._towers_near(tower, self.max_radius):
+                    if neighbour.aura is not None and self._in_aura(neighbour, tower):
+                        self._link(neighbour, tower)
+                changed.add(tower)
+
+        return self._refresh(changed)
+
+    def remove_tower(self, tower):
+        """Unlink a tower that was sold or destroyed
+
+        Returns the towers whose effective stats changed.
+        """
+        changed = set()
+        for target in self.buffed.pop(tower, set()):
+            self.supporters[target].discard(tower)
+            changed.add(target)
+        for support in self.supporters.pop(tower, set()):
+            self.buffed[support].discard(tower)
+
+        return self._refresh(changed)
+
+    def upgrade_tower(self, tower):
+        """Re-apply buffs after a tower's base stats or aura changed
+
+        Returns the towers whose effective stats changed.
+        """
+        if tower.aura is not None:
+            changed = set(self.buffed.get(tower, ()))
+        else:
+            changed = {tower}
+        return self._refresh(changed)
+
+    def _link(self, support, target):
+        self.buffed[support].add(target)
+        self.supporters.setdefault(target, set()).add(support)
+
+    def _in_aura(self, support, tower):
+        support_x, support_y = self._tile_of(support)
+        tower_x, tower_y = self._tile_of(tower)
+        radius = support.aura["radius"]
+        return abs(support_x - tower_x) <= radius and abs(support_y - tower_y) <= radius
+
+    def _tile_of(self, tower):
+        tile_size = self.game_map.tile_size
+        return int(tower.position.x) // tile_size, int(tower.position.y) // tile_size
+
+    def _towers_near(self, tower, radius):
+        """Get towers on the tiles within radius (Chebyshev) of a tower"""
+        center_x, center_y = self._tile_of(tower)
+        towers_by_tile = self.game_map.towers_by_tile
+        found = []
+        for grid_y in range(center_y - radius, center_y + radius + 1):
+            for grid_x in range(center_x - radius, center_x + radius + 1):
+                neighbour = towers_by_tile.get((grid_x, grid_y))
+                if neighbour is not None and neighbour is not tower:
+                    found.append(neighbour)
+        return found
+
+    def _refresh(self, towers):
+        """Rewrite the cached effective stats of the given towers, returned in uid order"""
+        towers = sorted(towers, key=_uid)
+        for tower in towers:
+            damage_bonus = range_bonus = rate_bonus = 0.0
+            for support in sorted(self.supporters.get(tower, ()), key=_uid):
+                damage_bonus += support.aura["damage"]
+                range_bonus += support.aura["range"]
+                rate_bonus += support.aura["attack_rate"]
+            tower.apply_buffs(damage_bonus, range_bonus, rate_bonus)
+        return towers
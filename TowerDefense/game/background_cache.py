@@ -0,0 +1,70 @@
+"""
+Chunked, lazily rendered map background with LRU eviction
+"""
+
+from collections import OrderedDict
+import pygame
+from config import *
+
+class ChunkedBackground:
+    """Caches the static map background as fixed-size tile chunks
+
+    Chunks are rendered the first time they scroll into view and evicted
+    least-recently-used once the cache is full, so memory stays bounded no
+    matter how large the map is and no frame ever redraws the whole map.
+    """
+
+    def __init__(self, game_map, chunk_size=CHUNK_SIZE, max_chunks=CHUNK_CACHE_SIZE):
+        self.game_map = game_map
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()  # (chunk_x, chunk_y) -> Surface
+
+    def draw(self, surface, view_rect):
+        """Blit the chunks covering view_rect (world space) onto surface"""
+        size = self.chunk_size
+        for chunk_x, chunk_y in self._visible_chunks(view_rect):
+            chunk = self._get_chunk(chunk_x, chunk_y)
+            surface.blit(chunk, (chunk_x * size - view_rect.x, chunk_y * size - view_rect.y))
+
+    def prepare(self, view_rect):
+        """Render the chunks covering view_rect ahead of the first draw"""
+        for chunk_x, chunk_y in self._visible_chunks(view_rect):
+            self._get_chunk(chunk_x, chunk_y)
+
+    def invalidate(self, world_rect=None):
+        """Drop cached chunks overlapping a world rectangle (all chunks if None)"""
+        if world_rect is None:
+            self.chunks.clear()
+            return
+
+        size = self.chunk_size
+        for chunk_y in range(world_rect.top // size, (world_rect.bottom - 1) // size + 1):
+            for chunk_x in range(world_rect.left // size, (world_rect.right - 1) // size + 1):
+                self.chunks.pop((chunk_x, chunk_y), None)
+
+    def _visible_chunks(self, view_rect):
+        size = self.chunk_size
+        first_x = max(0, view_rect.left // size)
+        first_y = max(0, view_rect.top // size)
+        last_x = min((self.game_map.width - 1) // size, (view_rect.right - 1) // size)
+        last_y = min((self.game_map.height - 1) // size, (view_rect.bottom - 1) // size)
+        for chunk_y in range(first_y, last_y + 1):
+            for chunk_x in range(first_x, last_x + 1):
+                yield chunk_x, chunk_y
+
+    def _get_chunk(self, chunk_x, chunk_y):
+        key = (chunk_x, chunk_y)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        size = self.chunk_size
+        chunk = pygame.Surface((size, size))
+        self.game_map.draw_region(chunk, pygame.Rect(chunk_x * size, chunk_y * size, size, size))
+
+        self.chunks[key] = chunk
+        if len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return chunk
@@ -0,0 +1,65 @@
+"""
+Camera for panning and zooming around maps larger than the screen
+"""
+
+import math
+import pygame
+from config import *
+
+class Camera:
+    """Maps between world coordinates and the on-screen map viewport"""
+
+    def __init__(self, world_width, world_height,
+                 viewport_width=SCREEN_WIDTH - UI_PANEL_WIDTH, viewport_height=SCREEN_HEIGHT):
+        self.world_width = world_width
+        self.world_height = world_height
+        self.viewport_width = viewport_width
+        self.viewport_height = viewport_height
+
+        # Never zoom out past the point where the whole map fits
+        fit_zoom = max(viewport_width / world_width, viewport_height / world_height)
+        self.min_zoom = min(1.0, max(CAMERA_MIN_ZOOM, fit_zoom))
+        self.max_zoom = CAMERA_MAX_ZOOM
+
+        self.x = 0.0  # World position of the viewport's top-left corner
+        self.y = 0.0
+        self.zoom = 1.0
+
+    def view_rect(self):
+        """Get the world-space rectangle currently visible"""
+        width = math.ceil(self.viewport_width / self.zoom)
+        height = math.ceil(self.viewport_height / self.zoom)
+        return pygame.Rect(int(self.x), int(self.y), width, height)
+
+    def world_to_screen(self, x, y):
+        """Convert a world position to screen pixels"""
+        return (int((x - int(self.x)) * self.zoom), int((y - int(self.y)) * self.zoom))
+
+    def screen_to_world(self, screen_x, screen_y):
+        """Convert a screen position inside the viewport to world coordinates"""
+        return (int(int(self.x) + screen_x / self.zoom), int(int(self.y) + screen_y / self.zoom))
+
+    def pan(self, dx, dy):
+        """Move the camera by a distance in screen pixels"""
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+        self._clamp()
+
+    def zoom_at(self, factor, screen_pos):
+        """Zoom by a factor while keeping the world point under screen_pos fixed"""
+        new_zoom = min(self.max_zoom, max(self.min_zoom, self.zoom * factor))
+        if new_zoom == self.zoom:
+            return
+
+        anchor_x = self.x + screen_pos[0] / self.zoom
+        anchor_y = self.y + screen_pos[1] / self.zoom
+        self.zoom = new_zoom
+        self.x = anchor_x - screen_pos[0] / self.zoom
+        self.y = anchor_y - screen_pos[1] / self.zoom
+        self._clamp()
+
+    def _clamp(self):
+        view_width = self.viewport_width / self.zoom
+        view_height = self.viewport_height / self.zoom
+        self.x = min(max(0.0, self.x), max(0.0, self.world_width - view_width))
+        self.y = min(max(0.0, self.y), max(0.0, self.world_height - view_height))
@@ -0,0 +1,259 @@
+"""
+Offscreen frame capture with PNG/GIF encoding in worker processes
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+import numpy as np
+import pygame
+from PIL import GifImagePlugin, Image
+from config import *
+
+# Worker-side view of the shared frame slots, set up once per process
+_worker_shm = None
+_worker_frames = None
+_worker_raw_mode = None
+_worker_palette = None
+
+def _init_worker(shm_name, shape, raw_mode, palette):
+    global _worker_shm, _worker_frames, _worker_raw_mode, _worker_palette
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_frames = np.ndarray(shape, dtype=np.uint8, buffer=_worker_shm.buf)
+    _worker_raw_mode = raw_mode
+    _worker_palette = Image.new("P", (1, 1))
+    _worker_palette.putpalette(palette)
+
+def _slot_image(slot):
+    """Decode a slot's raw 32-bit surface pixels as an RGB image"""
+    frame = _worker_frames[slot]
+    return Image.frombuffer("RGB", (frame.shape[1], frame.shape[0]), frame,
+                            "raw", _worker_raw_mode, 0, 1)
+
+def _encode_png(slot, path):
+    _slot_image(slot).save(path, compress_level=1)
+
+def _quantize_gif_frame(slot, reduce):
+    image = _slot_image(slot)
+    if reduce > 1:
+        image = image.reduce(reduce)
+    frame = image.quantize(palette=_worker_palette, dither=Image.Dither.NONE)
+    return frame.size, frame.tobytes()
+
+def _raw_mode(surface):
+    """Pillow raw mode matching a 32-bit surface's byte order"""
+    red, green, blue, _ = surface.get_masks()
+    if (red, green, blue) == (0xFF0000, 0xFF00, 0xFF):
+        return "BGRX"
+    if (red, green, blue) == (0xFF, 0xFF00, 0xFF0000):
+        return "RGBX"
+    raise ValueError(f"Unsupported surface pixel layout: {surface.get_masks()}")
+
+# Every color config defines; new colors must be added here to reach the GIF palette
+GIF_COLORS = (
+    BLACK, WHITE, RED, GREEN, BLUE, YELLOW, PURPLE, ORANGE,
+    GRAY, LIGHT_GRAY, DARK_GRAY, CYAN, LIME, DARK_GREEN,
+)
+
+def _gif_palette():
+    """Shared GIF palette: the config colors plus a gray ramp for text"""
+    colors = set(GIF_COLORS)
+    colors.update((level, level, level) for level in range(0, 256, 8))
+    palette = [channel for color in sorted(colors)[:256] for channel in color]
+    return palette + [0] * (768 - len(palette))
+
+class FrameCapture:
+    """Copy rendered frames into shared memory slots and encode them in a process pool
+
+    capture() only memcpys the surface's raw pixels into a free slot and
+    queues a job, so the render loop does not wait for Pillow. Workers decode
+    the slot straight out of shared memory; only the slot number crosses the
+    process boundary. Output ending in ``.gif`` produces one animated GIF:
+    workers halve each frame and map it onto a fixed global palette, and as
+    frames come back in order only the box that changed since the previous
+    one is encoded and appended to the file (an unchanged frame lengthens
+    the previous one), so memory does not grow with the length of the
+    recording. Anything else is a directory of numbered PNGs.
+
+    capture() never waits: when every slot is still being encoded the frame
+    is dropped and counted in stalls. Callers that must keep every frame
+    wait for wait_for_slot() before rendering.
+    """
+
+    def __init__(self, output, size=(SCREEN_WIDTH, SCREEN_HEIGHT), workers=None, slots=None,
+                 frame_ms=1000 / FPS, gif_reduce=2):
+        self.output = output
+        self.gif = output.lower().endswith(".gif")
+        self.frame_ms = frame_ms  # GIF display time per captured frame
+        self.gif_reduce = gif_reduce
+        if not self.gif:
+            os.makedirs(output, exist_ok=True)
+
+        workers = workers or os.cpu_count() or 1
+        slots = slots or workers * 4
+        width, height = size
+        self.shape = (slots, height, width, 4)
+        self.shm = shared_memory.SharedMemory(create=True, size=int(np.prod(self.shape)))
+        self.frames = np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf)
+        self.raw_mode = None  # Taken from the first captured surface
+        self.workers = workers
+        self.pool = None
+        self.free_slots = collections.deque(range(slots))
+        self.jobs = collections.deque()  # (slot, future) in submission order
+        self.gif_file = None  # Opened when the first quantized frame comes back
+        self._gif_previous = None  # Palette indices of the last frame appended
+        self._gif_pending = None  # [image, offset, duration] not yet written
+        self.count = 0
+        self.stalls = 0  # Frames dropped because every slot was busy
+
+    def wait_for_slot(self):
+        """Block until capture() has a free slot"""
+        if not self.free_slots:
+            self._reclaim(block=True)
+
+    def capture(self, surface):
+        """Queue one frame of the surface for encoding; False if it was dropped"""
+        if not self.free_slots:
+            self._reclaim(block=False)
+            if not self.free_slots:
+                self.stalls += 1
+                return False
+        slot = self.free_slots.popleft()
+
+        if self.pool is None:
+            self._start_pool(surface)
+
+        # Copy the surface's pixel rows as-is; channel order is sorted out by the workers
+        width = self.shape[2]
+        rows = np.frombuffer(surface.get_buffer(), dtype=np.uint8)
+        rows = rows.reshape(self.shape[1], surface.get_pitch())
+        np.copyto(self.frames[slot].reshape(self.shape[1], width * 4), rows[:, :width * 4])
+        del rows  # Unlock the surface
+
+        if self.gif:
+            future = self.pool.submit(_quantize_gif_frame, slot, self.gif_reduce)
+        else:
+            path = os.path.join(self.output, f"frame_{self.count:06d}.png")
+            future = self.pool.submit(_encode_png, slot, path)
+        self.jobs.append((slot, future))
+        self.count += 1
+        self._reclaim(block=False)
+        return True
+
+    def _start_pool(self, surface):
+        if surface.get_bitsize() != 32 or surface.get_size() != (self.shape[2], self.shape[1]):
+            raise ValueError("Capture needs a 32-bit surface of the configured size")
+        self.raw_mode = _raw_mode(surface)
+        self.palette = _gif_palette()
+        self.pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.shm.name, self.shape, self.raw_mode, self.palette))
+
+    def _reclaim(self, block):
+        """Return slots of finished jobs, oldest first (waiting for one if block)"""
+        while self.jobs:
+            slot, future = self.jobs[0]
+            if not block and not future.done():
+                return
+            result = future.result()
+            if self.gif:
+                self._write_gif_frame(*result)
+            self.jobs.popleft()
+            self.free_slots.append(slot)
+            block = False
+
+    def _write_gif_frame(self, size, data):
+        """Queue a quantized frame as the part that differs from the previous one"""
+        width, height = size
+        indices = np.frombuffer(data, dtype=np.uint8).reshape(height, width)
+        previous = self._gif_previous
+        if previous is None:
+            screen = Image.new("P", size)
+            screen.putpalette(self.palette)
+            header, _ = GifImagePlugin.getheader(screen, info={"loop": 0, "optimize": False})
+            self.gif_file = open(self.output, "wb")
+            self.gif_file.write(b"".join(header))
+            top, bottom, left, right = 0, height, 0, width
+        else:
+            changed = indices != previous
+            rows = np.flatnonzero(changed.any(axis=1))
+            if not len(rows):
+                self._gif_pending[2] += self.frame_ms
+                return
+            cols = np.flatnonzero(changed.any(axis=0))
+            top, bottom, left, right = rows[0], rows[-1] + 1, cols[0], cols[-1] + 1
+            self._flush_gif_frame()
+        box = np.ascontiguousarray(indices[top:bottom, left:right])
+        image = Image.frombytes("P", (right - left, bottom - top), box.tobytes())
+        self._gif_pending = [image, (int(left), int(top)), self.frame_ms]
+        self._gif_previous = indices
+
+    def _flush_gif_frame(self):
+        image, offset, duration = self._gif_pending
+        self.gif_file.write(b"".join(GifImagePlugin.getdata(image, offset=offset,
+                                                            duration=int(duration))))
+        self._gif_pending = None
+
+    def close(self):
+        """Wait for every queued frame, write the GIF if any, and free resources"""
+        while self.jobs:
+            self._reclaim(block=True)
+        if self.pool is not None:
+            self.pool.shutdown()
+        del self.frames
+        self.shm.close()
+        self.shm.unlink()
+
+        if self.gif_file is not None:
+            self._flush_gif_frame()
+            self.gif_file.write(b";")  # Trailer
+            self.gif_file.close()
+            self.gif_file = None
+        return self.count
+
+def capture_replay(replay_path, output, every=CAPTURE_EVERY, workers=None, max_frames=None):
+    """Render a recorded game offscreen and encode every Nth frame
+
+    Runs uncapped under the dummy video driver. Returns (frames captured,
+    wall seconds).
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from game.replay import ReplayLog, play_replay
+
+    log = ReplayLog.load(replay_path)
+    capture = FrameCapture(output, workers=workers, frame_ms=1000 * every / FPS)
+    start = time.perf_counter()
+
+    def on_frame(game):
+        if game.frame_count % every == 0 and (max_frames is None or capture.count < max_frames):
+            capture.wait_for_slot()  # Offline, so keep every frame rather than drop
+            game.render()
+            capture.capture(game.screen)
+
+    try:
+        play_replay(log, on_frame)
+    finally:
+        count = capture.close()
+    return count, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a replay to PNG frames or a GIF")
+    parser.add_argument("replay", help="replay file recorded with REPLAY_RECORD")
+    parser.add_argument("output", help="directory for PNG frames, or a path ending in .gif")
+    parser.add_argument("--every", type=int, default=CAPTURE_EVERY,
+                        help="capture every Nth simulated frame")
+    parser.add_argument("--workers", type=int, default=None, help="encoder processes")
+    parser.add_argument("--max-frames", type=int, default=None)
+    args = parser.parse_args()
+
+    count, seconds = capture_replay(args.replay, args.output, args.every, args.workers,
+                                    args.max_frames)
+    print(f"Captured {count} frames to {args.output} in {seconds:.1f}s")
+
+if __name__ == "__main__":
+    main()
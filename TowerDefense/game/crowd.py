@@ -0,0 +1,114 @@
+"""
+Crowd separation: spreads overlapping enemies sideways across the path
+"""
+
+from bisect import bisect_right
+from config import *
+
+# A cell and the eight around it
+NEIGHBOUR_CELLS = tuple((dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1))
+
+class CrowdSeparation:
+    """Pushes enemies that overlap apart across the width of the path
+
+    Each enemy keeps a lateral offset from the path centreline, so movement
+    along the path (progress, and with it targeting, coverage and leaks) is
+    untouched; only the drawn and collided position moves sideways. Every
+    frame the enemies are bucketed into a uniform grid of cells one
+    separation distance wide, and each one is compared with the enemies in
+    its own and the eight surrounding cells, so every pair close enough to
+    overlap is found: on the same stretch of path, or on two legs of an
+    inside corner. Each enemy counts at most max_neighbours overlaps per
+    frame. Enemies that have spread out have fewer than that within one
+    separation distance, so the cap only limits a pile that still overlaps
+    (it keeps being pushed apart frame after frame), and the cost stays
+    O(E * max_neighbours) however tightly the enemies bunch up.
+
+    Overlapping pairs push each other apart in proportion to their overlap;
+    the enemy with the larger offset (or, when equal, the larger uid) moves
+    left of travel. Enemies with nobody close drift back to the centreline.
+    Enemies are visited in (progress, uid) order with no randomness, so
+    replays and rewinds reproduce it exactly.
+    """
+
+    def __init__(self, distance=CROWD_SEPARATION_DISTANCE, max_offset=CROWD_MAX_OFFSET,
+                 strength=CROWD_SEPARATION_STRENGTH, return_rate=CROWD_RETURN_RATE,
+                 max_neighbours=CROWD_MAX_NEIGHBOURS):
+        self.distance = distance
+        self.max_offset = max_offset
+        self.strength = strength
+        self.return_rate = return_rate
+        self.max_neighbours = max_neighbours
+
+    def update(self, enemies):
+        """Adjust lateral offsets and move enemies off the centreline
+
+        Expects enemy positions on the centreline, as Enemy.update leaves them.
+        """
+        distance = self.distance
+        distance_sq = distance * distance
+
+        # Where each enemy was drawn (centreline plus last frame's offset), in path order
+        placed = []
+        for enemy in enemies:
+            if not enemy.alive or enemy.reached_end:
+                continue
+            normal = enemy.path.normal_at(enemy.progress, enemy.path_index, distance)
+            x = enemy.position.x + normal[0] * enemy.lateral
+            y = enemy.position.y + normal[1] * enemy.lateral
+            placed.append((enemy.progress, enemy.uid, enemy, normal, x, y))
+        placed.sort(key=lambda item: (item[0], item[1]))
+
+        # Cell -> indices into placed, each list in path order
+        cells = {}
+        for i, (_, _, _, _, x, y) in enumerate(placed):
+            cells.setdefault((int(x // distance), int(y // distance)), []).append(i)
+
+        # Work out every push before applying any, so list order does not matter
+        count = len(placed)
+        pushes = [0.0] * count
+        crowded = [False] * count
+        around = {}  # Cell -> indices in it and the eight cells around it, in path order
+        for i, (_, uid, enemy, _, x, y) in enumerate(placed):
+            key = (enemy.lateral, uid)
+            cell = (int(x // distance), int(y // distance))
+            nearby = around.get(cell)
+            if nearby is None:
+                nearby = sorted(j for dx, dy in NEIGHBOUR_CELLS
+                                for j in cells.get((cell[0] + dx, cell[1] + dy), ()))
+                around[cell] = nearby
+            overlaps = 0
+            # Each pair once, from the one earlier on the path
+            for position in range(bisect_right(nearby, i), len(nearby)):
+                j = nearby[position]
+                _, other_uid, other, _, other_x, other_y = placed[j]
+                gap_x = x - other_x
+                gap_y = y - other_y
+                gap_sq = gap_x * gap_x + gap_y * gap_y
+                if gap_sq >= distance_sq:
+                    continue
+                crowded[i] = crowded[j] = True
+                overlap = 1.0 - gap_sq ** 0.5 / distance
+                if key > (other.lateral, other_uid):
+                    pushes[i] += overlap
+                    pushes[j] -= overlap
+                else:
+                    pushes[i] -= overlap
+                    pushes[j] += overlap
+                overlaps += 1
+                if overlaps == self.max_neighbours:
+                    break
+
+        for (_, _, enemy, normal, _, _), push, was_crowded in zip(placed, pushes, crowded):
+            lateral = enemy.lateral
+            if was_crowded:
+                lateral += push * self.strength
+            elif lateral > 0:
+                lateral = max(0.0, lateral - self.return_rate)
+            elif lateral < 0:
+                lateral = min(0.0, lateral + self.return_rate)
+            lateral = max(-self.max_offset, min(self.max_offset, lateral))
+            enemy.lateral = lateral
+            if lateral:
+                enemy.position.set(enemy.position.x + normal[0] * lateral,
+                                   enemy.position.y + normal[1] * lateral)
@@ -0,0 +1,60 @@
+"""
+Tick-ordered damage event queue for analytic projectile resolution
+"""
+
+import heapq
+
+class DamageEventQueue:
+    """Priority queue of pending hits keyed on the frame they land"""
+
+    def __init__(self):
+        self._heap = []
+        self._sequence = 0  # Keeps same-tick events in fire order (a plain int so the queue pickles)
+
+    def push(self, tick, enemy, damage, source=None, splash_radius=0, impact=None):
+        """Schedule damage against an enemy on the given frame
+
+        Splash hits also damage every enemy within splash_radius of the
+        impact point, and detonate even if the target died on the way.
+        """
+        self._sequence += 1
+        heapq.heappush(self._heap, (tick, self._sequence, enemy, damage,
+                                    source, splash_radius, impact))
+
+    def process(self, tick, enemy_index=None, status_effects=None):
+        """Apply every event due on or before the given frame
+
+        Returns the number of enemies hit.
+        """
+        heap = self._heap
+        hits = 0
+        while heap and heap[0][0] <= tick:
+            _, _, enemy, damage, source, splash_radius, impact = heapq.heappop(heap)
+
+            if splash_radius > 0 and enemy_index is not None:
+                center = impact if impact is not None else enemy.position.to_tuple()
+                hit = enemy_index.damage_area(enemy.path, center, splash_radius, damage,
+                                               source)
+            # Enemies that died or leaked while the shot was in flight absorb nothing
+            elif enemy.alive and not enemy.reached_end:
+                enemy.take_damage(damage, source)
+                hit = [enemy]
+            else:
+                continue
+
+            hits += len(hit)
+            if status_effects is not None and source is not None and source.effects:
+                for target in hit:
+                    status_effects.apply_all(target, source.effects, tick)
+        return hits
+
+    def next_tick(self):
+        """Get the frame of the earliest pending event, or None"""
+        return self._heap[0][0] if self._heap else None
+
+    def clear(self):
+        """Drop all pending events"""
+        self._heap.clear()
+
+    def __len__(self):
+        return len(self._heap)
@@ -0,0 +1,236 @@
+"""
+Gym-style reset/step environments for training tower placement agents
+"""
+
+import random
+import numpy as np
+from config import *
+from entities.tower import TOWER_TYPES
+
+TOWER_TYPE_NAMES = tuple(TOWER_TYPES)
+TOWER_COSTS = np.array([TOWER_TYPES[name]["cost"] for name in TOWER_TYPE_NAMES])
+
+# Discrete actions: no-op, start the next wave, then one per (tower type, tile)
+NOOP = 0
+START_WAVE = 1
+FIRST_PLACEMENT = 2
+
+# Grid observation codes; tower type i is stored as TOWER_CODE + i
+EMPTY_CODE = 0
+PATH_CODE = 1
+TOWER_CODE = 2
+
+# Layout of the status observation vector
+STATUS_FIELDS = ("money", "lives", "wave", "wave_active", "frame")
+
+def observation_buffers(count, grid_height, grid_width):
+    """Allocate batched observation, reward and done arrays for count games"""
+    return {
+        "grid": np.zeros((count, grid_height, grid_width), dtype=np.int8),
+        "enemies": np.zeros((count, grid_height, grid_width), dtype=np.float32),
+        "status": np.zeros((count, len(STATUS_FIELDS)), dtype=np.float32),
+        "reward": np.zeros(count, dtype=np.float32),
+        "terminated": np.zeros(count, dtype=bool),
+        "truncated": np.zeros(count, dtype=bool),
+    }
+
+class TowerDefenseEnv:
+    """One headless game behind a reset/step interface
+
+    The game is built without graphics: no pygame display, fonts, UI,
+    particles or visual projectiles. Actions are integers: NOOP,
+    START_WAVE, or FIRST_PLACEMENT + type_index * tiles + tile_index for a
+    tower of TOWER_TYPE_NAMES[type_index] on GameMap.grid tile
+    (tile_index % grid_width, tile_index // grid_width). Invalid placements
+    (occupied tile, not enough money) do nothing. Every step applies the
+    action as a player command and then simulates frames_per_step frames.
+
+    Observations are NumPy arrays: "grid" (tile occupancy codes), "enemies"
+    (enemy count per tile) and "status" (STATUS_FIELDS). They are written in
+    place into fixed buffers, which may be rows of a VectorTowerDefenseEnv's
+    batched arrays, and the same array objects are returned every step;
+    copy them to keep an observation past the next step.
+
+    The reward is the score gained (enemy bounties) minus leak_penalty per
+    life lost. reset() restores a snapshot of the freshly built game
+    instead of rebuilding it, then reseeds the wave spawner.
+    """
+
+    def __init__(self, seed=None, frames_per_step=ENV_FRAMES_PER_STEP,
+                 max_frames=ENV_MAX_FRAMES, leak_penalty=ENV_LEAK_PENALTY, buffers=None):
+        from game.tower_defense_game import TowerDefenseGame
+        from game.rewind import capture_state
+
+        self.frames_per_step = frames_per_step
+        self.max_frames = max_frames
+        self.leak_penalty = leak_penalty
+        self._seeds = random.Random(seed)
+
+        self.game = TowerDefenseGame(graphics=False, simulation_process=False,
+                                     seed=self._seeds.randrange(2 ** 32),
+                                     record_replay=False, rewind=False, instruments=False)
+        self._initial_state = capture_state(self.game)
+
+        game_map = self.game.game_map
+        self.tile_size = game_map.tile_size
+        self.grid_width = game_map.grid_width
+        self.grid_height = game_map.grid_height
+        self.tile_count = self.grid_width * self.grid_height
+        self.action_count = FIRST_PLACEMENT + len(TOWER_TYPE_NAMES) * self.tile_count
+
+        if buffers is None:
+            buffers = {name: array[0, ...] for name, array in
+                       observation_buffers(1, self.grid_height, self.grid_width).items()}
+        self.buffers = buffers
+        self.observation = {name: buffers[name] for name in ("grid", "enemies", "status")}
+        self._path_tiles = np.array(game_map.grid, dtype=np.int8) == 1
+        self._tower_count = -1  # Forces a grid rewrite on the first observation
+
+    def reset(self, seed=None):
+        """Start a new episode and return (observation, info)"""
+        from game.rewind import restore_state
+
+        game = self.game
+        restore_state(game, self._initial_state)
+        game.paused = False
+        game.seed = seed if seed is not None else self._seeds.randrange(2 ** 32)
+        game.wave_manager.rng.seed(game.seed)
+
+        self._tower_count = -1
+        self._observe()
+        self.buffers["reward"][...] = 0.0
+        self.buffers["terminated"][...] = False
+        self.buffers["truncated"][...] = False
+        return self.observation, {"seed": game.seed}
+
+    def step(self, action):
+        """Apply an action, advance frames_per_step frames
+
+        Returns (observation, reward, terminated, truncated, info) like Gymnasium.
+        """
+        game = self.game
+        score, lives = game.score, game.lives
+        command = self.decode_action(int(action))
+        if command is not None:
+            game.apply_command(command)
+
+        for _ in range(self.frames_per_step):
+            game.update_game_logic()
+            if game.game_over or game.victory:
+                break
+
+        reward = (game.score - score) - self.leak_penalty * (lives - game.lives)
+        terminated = game.game_over or game.victory
+        truncated = not terminated and game.frame_count >= self.max_frames
+        self._observe()
+        self.buffers["reward"][...] = reward
+        self.buffers["terminated"][...] = terminated
+        self.buffers["truncated"][...] = truncated
+        info = {"score": game.score, "victory": game.victory} if terminated or truncated else {}
+        return self.observation, float(reward), terminated, truncated, info
+
+    def decode_action(self, action):
+        """Turn an action index into a player command tuple, or None for no-op"""
+        if action == START_WAVE:
+            return ("start_wave",)
+        if action < FIRST_PLACEMENT:
+            return None
+        type_index, tile = divmod(action - FIRST_PLACEMENT, self.tile_count)
+        grid_y, grid_x = divmod(tile, self.grid_width)
+        return ("place", grid_x * self.tile_size, grid_y * self.tile_size,
+                TOWER_TYPE_NAMES[type_index])
+
+    def action_mask(self, out=None):
+        """Boolean mask of actions that would currently have an effect"""
+        if out is None:
+            out = np.empty(self.action_count, dtype=bool)
+        game = self.game
+        out[NOOP] = True
+        out[START_WAVE] = not game.wave_manager.is_wave_active()
+        free = (self.observation["grid"] == EMPTY_CODE).ravel()
+        affordable = TOWER_COSTS <= game.money
+        placements = out[FIRST_PLACEMENT:].reshape(len(TOWER_TYPE_NAMES), self.tile_count)
+        np.logical_and(affordable[:, None], free[None, :], out=placements)
+        return out
+
+    def _observe(self):
+        game = self.game
+        grid = self.observation["grid"]
+
+        # Occupancy only changes when towers are placed
+        if len(game.towers) != self._tower_count:
+            grid[...] = EMPTY_CODE
+            grid[self._path_tiles] = PATH_CODE
+            for (grid_x, grid_y), tower in game.game_map.towers_by_tile.items():
+                grid[grid_y, grid_x] = TOWER_CODE + TOWER_TYPE_NAMES.index(tower.tower_type)
+            self._tower_count = len(game.towers)
+
+        enemies = self.observation["enemies"]
+        if game.enemies:
+            tile = self.tile_size
+            width = self.grid_width
+            limit = self.tile_count - 1
+            tiles = [min(int(enemy.position.y) // tile * width + int(enemy.position.x) // tile,
+                         limit) for enemy in game.enemies]
+            enemies.reshape(-1)[...] = np.bincount(tiles, minlength=self.tile_count)
+        else:
+            enemies[...] = 0.0
+
+        self.observation["status"][...] = (game.money, game.lives,
+                                           game.wave_manager.get_current_wave(),
+                                           game.wave_manager.is_wave_active(), game.frame_count)
+
+class VectorTowerDefenseEnv:
+    """K independent games stepped together into shared batched arrays
+
+    Each game writes its observation, reward and done flags straight into
+    its row of the batch arrays, so step() returns the same arrays every
+    time with no stacking or copying. Games that finish are reset in the
+    same step (their row then holds the new episode's first observation);
+    the finished episode's score is reported in infos.
+    """
+
+    def __init__(self, count, seed=None, **env_kwargs):
+        seeds = random.Random(seed)
+        self.count = count
+        self.buffers = observation_buffers(count, MAP_HEIGHT // TILE_SIZE, MAP_WIDTH // TILE_SIZE)
+        self.envs = []
+        for index in range(count):
+            rows = {name: array[index, ...] for name, array in self.buffers.items()}
+            self.envs.append(TowerDefenseEnv(seed=seeds.randrange(2 ** 32), buffers=rows,
+                                             **env_kwargs))
+        self.action_count = self.envs[0].action_count
+        self.observation = {name: self.buffers[name] for name in ("grid", "enemies", "status")}
+
+    def reset(self, seed=None):
+        """Reset every game; returns (observation, infos)"""
+        seeds = random.Random(seed) if seed is not None else None
+        infos = []
+        for env in self.envs:
+            _, info = env.reset(seeds.randrange(2 ** 32) if seeds is not None else None)
+            infos.append(info)
+        return self.observation, infos
+
+    def step(self, actions):
+        """Step game k with actions[k]; returns batched (obs, rewards, terminated, truncated, infos)"""
+        infos = [None] * self.count
+        for index, (env, action) in enumerate(zip(self.envs, actions)):
+            _, reward, terminated, truncated, info = env.step(action)
+            if terminated or truncated:
+                env.reset()
+                # Keep the finished episode's outcome visible alongside the fresh observation
+                env.buffers["reward"][...] = reward
+                env.buffers["terminated"][...] = terminated
+                env.buffers["truncated"][...] = truncated
+            infos[index] = info
+        buffers = self.buffers
+        return (self.observation, buffers["reward"], buffers["terminated"],
+                buffers["truncated"], infos)
+
+    def action_masks(self, out=None):
+        """Stacked action masks, shape (count, action_count)"""
+        if out is None:
+            out = np.empty((self.count, self.action_count), dtype=bool)
+        for env, row in zip(self.envs, out):
+            env.action_mask(row)
+        return out
@@ -0,0 +1,62 @@
+"""
+Gameplay event hooks for effects and instrumentation
+"""
+
+class GameEvents:
+    """Fans gameplay events out to registered listeners
+
+    Listeners implement any subset of on_tower_fired, on_enemy_hit,
+    on_enemy_killed, on_enemy_leaked, on_tower_changed (placed, upgraded,
+    retargeted or rebuffed) and on_tower_removed. Handlers are resolved once when a
+    listener is added, so an event with no interested listener costs one
+    empty loop.
+    """
+
+    EVENT_NAMES = ("on_tower_fired", "on_enemy_hit", "on_enemy_killed", "on_enemy_leaked",
+                   "on_tower_changed", "on_tower_removed")
+
+    def __init__(self):
+        self.listeners = []
+        self._handlers = {name: [] for name in self.EVENT_NAMES}
+
+    def add_listener(self, listener):
+        """Register a listener for every event it implements"""
+        self.listeners.append(listener)
+        for name in self.EVENT_NAMES:
+            handler = getattr(listener, name, None)
+            if handler is not None:
+                self._handlers[name].append(handler)
+
+    def remove_listener(self, listener):
+        """Unregister a listener"""
+        if listener not in self.listeners:
+            return
+        self.listeners.remove(listener)
+        for name in self.EVENT_NAMES:
+            handler = getattr(listener, name, None)
+            if handler is not None:
+                self._handlers[name].remove(handler)
+
+    def tower_fired(self, tower, target, frame_count):
+        for handler in self._handlers["on_tower_fired"]:
+            handler(tower, target, frame_count)
+
+    def enemy_hit(self, enemy, damage, source=None):
+        for handler in self._handlers["on_enemy_hit"]:
+            handler(enemy, damage, source)
+
+    def enemy_killed(self, enemy):
+        for handler in self._handlers["on_enemy_killed"]:
+            handler(enemy)
+
+    def enemy_leaked(self, enemy):
+        for handler in self._handlers["on_enemy_leaked"]:
+            handler(enemy)
+
+    def tower_changed(self, tower):
+        for handler in self._handlers["on_tower_changed"]:
+            handler(tower)
+
+    def tower_removed(self, tower):
+        for handler in self._handlers["on_tower_removed"]:
+            handler(tower)
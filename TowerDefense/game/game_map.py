@@ -3,19 +3,21 @@ Game map and path management
 """
 
 import pygame
+import numpy as np
 from utils.vector2d import Vector2D
+from utils.path_geometry import get_path_geometry
 from config import *
 
 class GameMap:
     """Handles the game map, path, and tile placement"""
     
-    def __init__(self):
-        self.width = SCREEN_WIDTH - UI_PANEL_WIDTH
-        self.height = SCREEN_HEIGHT
+    def __init__(self, width=MAP_WIDTH, height=MAP_HEIGHT, path_points=None):
+        self.width = width
+        self.height = height
         self.tile_size = TILE_SIZE
         
         # Define the path that enemies will follow
-        self.path_points = [
+        self.path_points = path_points or [
             (50, 100),    # Start
             (200, 100),
             (200, 300),
@@ -27,6 +29,7 @@ class GameMap:
             (800, 200),
             (950, 200),   # End
         ]
+        self.path_geometry = get_path_geometry(self.path_points)
         
         # Create grid for tower placement
         self.grid_width = self.width // self.tile_size
@@ -34,9 +37,14 @@ class GameMap:
         
         # Grid: 0 = empty, 1 = path, 2 = tower
         self.grid = [[0 for _ in range(self.grid_width)] for _ in range(self.grid_height)]
+        self.towers_by_tile = {}  # (grid_x, grid_y) -> tower occupying the tile
         
         # Mark path tiles
         self._mark_path_tiles()
+        
+        # NumPy copy of the grid for batch checks, kept in step by place/remove_tower
+        self._grid_array = None
+        self._grid_array_source = None
     
     def _mark_path_tiles(self):
         """Mark path tiles in the grid"""
@@ -76,16 +84,75 @@ class GameMap:
         
         return self.grid[grid_y][grid_x] == 0
     
-    def place_tower(self, x, y):
+    def tiles_in_drag(self, start, end, shape="line"):
+        """Get the grid tiles covered by a drag between two world positions
+        
+        "line" steps once per tile along the longer axis from start to end;
+        "rect" fills the rectangle the two corners span, row by row from the
+        start corner. Returns (grid_xs, grid_ys) integer arrays in build order.
+        Tiles may lie off the map; placement_mask rejects them.
+        """
+        start_x, start_y = start[0] // self.tile_size, start[1] // self.tile_size
+        end_x, end_y = end[0] // self.tile_size, end[1] // self.tile_size
+        
+        if shape == "rect":
+            step_x = 1 if end_x >= start_x else -1
+            step_y = 1 if end_y >= start_y else -1
+            grid_ys, grid_xs = np.meshgrid(np.arange(start_y, end_y + step_y, step_y),
+                                           np.arange(start_x, end_x + step_x, step_x),
+                                           indexing="ij")
+            return grid_xs.ravel(), grid_ys.ravel()
+        
+        steps = max(abs(end_x - start_x), abs(end_y - start_y))
+        t = np.linspace(0.0, 1.0, steps + 1)
+        grid_xs = np.rint(start_x + (end_x - start_x) * t).astype(np.int64)
+        grid_ys = np.rint(start_y + (end_y - start_y) * t).astype(np.int64)
+        return grid_xs, grid_ys
+    
+    def placement_mask(self, grid_xs, grid_ys):
+        """Check many tiles at once: True where a tower could be placed"""
+        inside = ((grid_xs >= 0) & (grid_xs < self.grid_width)
+                  & (grid_ys >= 0) & (grid_ys < self.grid_height))
+        indices = np.flatnonzero(inside)
+        grid_xs = grid_xs[indices]
+        grid_ys = grid_ys[indices]
+        free = self._grid_cells()[grid_ys, grid_xs] == 0
+        
+        # A tile listed twice (a line doubling back) is only free the first time;
+        # ids are only computed on the map, where they cannot collide
+        _, first = np.unique(grid_ys * self.grid_width + grid_xs, return_index=True)
+        first_seen = np.zeros(len(indices), dtype=bool)
+        first_seen[first] = True
+        
+        mask = np.zeros(len(inside), dtype=bool)
+        mask[indices] = free & first_seen
+        return mask
+    
+    def _grid_cells(self):
+        """The grid as an int8 array; rebuilt only if the grid list was replaced (rewind)"""
+        if self._grid_array_source is not self.grid:
+            self._grid_array = np.array(self.grid, dtype=np.int8)
+            self._grid_array_source = self.grid
+        return self._grid_array
+    
+    def place_tower(self, x, y, tower=None):
         """Mark a position as having a tower"""
         grid_x = x // self.tile_size
         grid_y = y // self.tile_size
         
         if self.can_place_tower(x, y):
             self.grid[grid_y][grid_x] = 2
+            if self._grid_array_source is self.grid:
+                self._grid_array[grid_y, grid_x] = 2
+            if tower is not None:
+                self.towers_by_tile[(grid_x, grid_y)] = tower
             return True
         return False
     
+    def get_tower_at(self, x, y):
+        """Get the tower occupying the tile at the given position, if any"""
+        return self.towers_by_tile.get((x // self.tile_size, y // self.tile_size))
+    
     def remove_tower(self, x, y):
         """Remove tower from position"""
         grid_x = x // self.tile_size
@@ -94,6 +161,9 @@ class GameMap:
         if 0 <= grid_x < self.grid_width and 0 <= grid_y < self.grid_height:
             if self.grid[grid_y][grid_x] == 2:
                 self.grid[grid_y][grid_x] = 0
+                if self._grid_array_source is self.grid:
+                    self._grid_array[grid_y, grid_x] = 0
+                self.towers_by_tile.pop((grid_x, grid_y), None)
                 return True
         return False
     
@@ -102,24 +172,33 @@ class GameMap:
         return self.path_points
     
     def draw(self, screen):
-        """Draw the map"""
-        # Draw background
-        map_surface = pygame.Surface((self.width, self.height))
-        map_surface.fill(GREEN)
+        """Draw the whole map"""
+        self.draw_region(screen, pygame.Rect(0, 0, self.width, self.height))
+    
+    def draw_region(self, surface, world_rect):
+        """Draw the part of the map inside world_rect onto surface at (0, 0)"""
+        offset_x, offset_y = world_rect.x, world_rect.y
+        
+        # Draw background, leaving anything beyond the map edge black
+        surface.fill(BLACK)
+        surface.fill(GREEN, pygame.Rect(-offset_x, -offset_y, self.width, self.height))
         
         # Draw grid lines (optional - for debugging)
-        for x in range(0, self.width, self.tile_size):
-            pygame.draw.line(map_surface, LIGHT_GRAY, (x, 0), (x, self.height))
-        for y in range(0, self.height, self.tile_size):
-            pygame.draw.line(map_surface, LIGHT_GRAY, (0, y), (self.width, y))
+        first_x = max(0, world_rect.left // self.tile_size * self.tile_size)
+        first_y = max(0, world_rect.top // self.tile_size * self.tile_size)
+        bottom = min(self.height, world_rect.bottom) - offset_y
+        right = min(self.width, world_rect.right) - offset_x
+        for x in range(first_x, min(self.width, world_rect.right), self.tile_size):
+            pygame.draw.line(surface, LIGHT_GRAY, (x - offset_x, -offset_y), (x - offset_x, bottom))
+        for y in range(first_y, min(self.height, world_rect.bottom), self.tile_size):
+            pygame.draw.line(surface, LIGHT_GRAY, (-offset_x, y - offset_y), (right, y - offset_y))
         
         # Draw path
-        if len(self.path_points) > 1:
-            pygame.draw.lines(map_surface, YELLOW, False, self.path_points, 8)
-            pygame.draw.lines(map_surface, ORANGE, False, self.path_points, 4)
+        points = [(x - offset_x, y - offset_y) for x, y in self.path_points]
+        if len(points) > 1:
+            pygame.draw.lines(surface, YELLOW, False, points, 8)
+            pygame.draw.lines(surface, ORANGE, False, points, 4)
         
         # Draw path points
-        for point in self.path_points:
-            pygame.draw.circle(map_surface, RED, point, 6)
-        
-        screen.blit(map_surface, (0, 0))
\ No newline at end of file
+        for point in points:
+            pygame.draw.circle(surface, RED, point, 6)
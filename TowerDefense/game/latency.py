@@ -0,0 +1,99 @@
+"""
+Input-to-display latency measurement for mouse clicks
+"""
+
+import numpy as np
+import pygame
+from config import *
+
+class InputLatencyMonitor:
+    """Times each mouse press and release to the first display flip that shows it
+
+    pygame events carry no arrival time, so every press is stamped when the
+    loop polls it, together with the previous poll: the click arrived
+    somewhere in between. Two figures are kept per click, the measured time
+    from poll to flip and the upper bound from the previous poll to flip;
+    the true latency lies between them. Events posted with an `arrival`
+    attribute (perf_counter seconds, as benchmarks do) are timed from that
+    instead, which is exact.
+
+    In-process, a click's effect is drawn by the first flip after it is
+    handled. With the simulation in a worker process the effect comes back
+    with the worker's state, so a click waits for the second new frame
+    after it was sent, the first one certain to have applied it.
+    """
+
+    def __init__(self, capacity=LATENCY_SAMPLES):
+        self.samples = np.zeros((capacity, 2))  # (measured, upper bound) in ms, a ring buffer
+        self.kinds = np.zeros(capacity, dtype=np.uint8)  # 0 press, 1 release
+        self.count = 0
+        self._pending = []  # (arrival, previous poll, kind, frames still to wait)
+        self._poll = None
+        self._previous_poll = None
+
+    def begin_poll(self, now):
+        """Note that the loop is about to drain the event queue"""
+        self._previous_poll = self._poll
+        self._poll = now
+
+    def record_input(self, event, wait_frames=0):
+        """Start timing a MOUSEBUTTONDOWN or MOUSEBUTTONUP event polled just now"""
+        arrival = getattr(event, "arrival", None)
+        if arrival is not None:
+            bound = arrival
+        else:
+            arrival = self._poll
+            bound = self._previous_poll if self._previous_poll is not None else self._poll
+        kind = 0 if event.type == pygame.MOUSEBUTTONDOWN else 1
+        self._pending.append((arrival, bound, kind, wait_frames))
+
+    def state_synced(self):
+        """Note that a new simulation frame arrived from the worker
+
+        Only clicks recorded before this call count it, so a click handled
+        after the sync in the same loop iteration still waits its full count.
+        """
+        self._pending = [(arrival, bound, kind, max(0, wait_frames - 1))
+                         for arrival, bound, kind, wait_frames in self._pending]
+
+    def frame_shown(self, now):
+        """Close out the clicks this flip shows"""
+        if not self._pending:
+            return
+        still_pending = []
+        for arrival, bound, kind, wait_frames in self._pending:
+            if wait_frames:
+                still_pending.append((arrival, bound, kind, wait_frames))
+                continue
+            row = self.count % len(self.samples)
+            self.samples[row] = ((now - arrival) * 1000.0, (now - bound) * 1000.0)
+            self.kinds[row] = kind
+            self.count += 1
+        self._pending = still_pending
+
+    def percentiles(self, points=(50, 90, 99), kind=None):
+        """{"measured": [...], "bound": [...]} in ms at the given percentiles
+
+        kind picks presses (0) or releases (1) only. Returns None without samples.
+        """
+        filled = min(self.count, len(self.samples))
+        samples = self.samples[:filled]
+        if kind is not None:
+            samples = samples[self.kinds[:filled] == kind]
+        if not len(samples):
+            return None
+        return {
+            "measured": np.percentile(samples[:, 0], points).tolist(),
+            "bound": np.percentile(samples[:, 1], points).tolist(),
+        }
+
+    def report(self, points=(50, 90, 99)):
+        """One-line summary of the recorded latencies"""
+        figures = self.percentiles(points)
+        if figures is None:
+            return "Input latency: no clicks recorded"
+        labels = "/".join(f"p{point}" for point in points)
+        measured = "/".join(f"{value:.1f}" for value in figures["measured"])
+        bound = "/".join(f"{value:.1f}" for value in figures["bound"])
+        return (f"Input latency over {min(self.count, len(self.samples))} clicks ({labels}): "
+                f"{measured} ms measured, at most {bound} ms from arrival to flip")
@@ -0,0 +1,71 @@
+"""
+Adaptive level-of-detail controller driven by measured frame time
+"""
+
+from config import *
+
+# Detail levels from full quality to minimal decorations
+LOD_LEVELS = [
+    {"all_ranges": True, "target_lines": True, "simple_health_bars": False, "particles": 1.0},
+    {"all_ranges": False, "target_lines": True, "simple_health_bars": False, "particles": 0.75},
+    {"all_ranges": False, "target_lines": False, "simple_health_bars": False, "particles": 0.5},
+    {"all_ranges": False, "target_lines": False, "simple_health_bars": True, "particles": 0.25},
+]
+
+class LODController:
+    """Drops decorations one step at a time when frames run over budget
+
+    Frame time is the work done per frame (update + render), not including the
+    sleep in clock.tick, smoothed with an exponential moving average. Detail is
+    lowered quickly when the average exceeds the budget and restored slowly once
+    there is clear headroom, so the level does not oscillate.
+    """
+
+    def __init__(self, target_fps=FPS, enabled=LOD_ENABLED):
+        self.enabled = enabled
+        self.budget_ms = 1000.0 / target_fps
+        self.level = 0
+        self.average_ms = 0.0
+        self.frames_since_change = 0
+
+        # Hysteresis: degrade above 90% of budget, restore below 60%
+        self.degrade_threshold = 0.9
+        self.restore_threshold = 0.6
+        self.degrade_delay = 30    # Frames to wait after a change before degrading again
+        self.restore_delay = 180   # Frames of headroom before restoring a level
+
+    @property
+    def settings(self):
+        return LOD_LEVELS[self.level]
+
+    def update(self, frame_ms):
+        """Record one frame's work time and adjust the level
+
+        Returns True if the level changed.
+        """
+        if not self.enabled:
+            return False
+
+        if self.average_ms == 0.0:
+            self.average_ms = frame_ms
+        else:
+            self.average_ms += (frame_ms - self.average_ms) * 0.1
+        self.frames_since_change += 1
+
+        load = self.average_ms / self.budget_ms
+        if load > self.degrade_threshold and self.level < len(LOD_LEVELS) - 1:
+            if self.frames_since_change >= self.degrade_delay:
+                return self._set_level(self.level + 1)
+        elif load < self.restore_threshold and self.level > 0:
+            if self.frames_since_change >= self.restore_delay:
+                return self._set_level(self.level - 1)
+        return False
+
+    def apply(self, particles):
+        """Push the current particle cap to the particle system"""
+        particles.set_limit(self.settings["particles"])
+
+    def _set_level(self, level):
+        self.level = level
+        self.frames_since_change = 0
+        return True
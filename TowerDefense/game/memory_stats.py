@@ -0,0 +1,284 @@
+"""
+Opt-in live object and memory accounting for long sessions
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+import pygame
+from config import *
+from entities.enemy import Enemy
+from entities.tower import Tower, Projectile, ScheduledProjectile
+from utils.vector2d import Vector2D
+
+# Classes counted by exact type; Surfaces are counted separately because they are not gc-tracked
+TRACKED_TYPES = {
+    Enemy: "Enemy",
+    Tower: "Tower",
+    Projectile: "Projectile",
+    ScheduledProjectile: "ScheduledProjectile",
+}
+TRACKED_NAMES = tuple(TRACKED_TYPES.values()) + ("Surface",)
+
+# Instance attributes counted as owned by the instance when no other instance shares them
+_OWNED_TYPES = (Vector2D, list, dict, set)
+
+class MemoryMonitor:
+    """Counts live entity objects and traces allocations across waves
+
+    A census walks the garbage collector's object list once and counts
+    instances of each tracked class, whether or not the game still lists
+    them, so objects kept alive by stale references (a tower's last target,
+    an event still queued) show up as the difference between live and in
+    play. Surfaces are found among the referents of those objects and sized
+    by their pixel buffers, which tracemalloc cannot see. A census is taken
+    whenever a wave ends and on demand; growth that persists for
+    MEMORY_GROWTH_WAVES consecutive waves is flagged. Between censuses the
+    overlay only reads the cheap running figures.
+    """
+
+    def __init__(self, path=MEMORY_REPORT_PATH, trace_depth=MEMORY_TRACE_DEPTH,
+                 growth_waves=MEMORY_GROWTH_WAVES, growth_bytes=MEMORY_GROWTH_BYTES):
+        self.path = path
+        self.growth_waves = growth_waves
+        self.growth_bytes = growth_bytes
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(trace_depth)
+
+        self.samples = []       # One census per completed wave, oldest first
+        self.latest = None      # Most recent census, wave end or on demand
+        self.warnings = []
+        self.snapshot = None    # Last tracemalloc snapshot and its diff against the one before
+        self.top_allocations = []
+        self.top_growth = []
+
+        self.visible = False
+        self._font = None
+        self._was_wave_active = False
+
+    def update(self, game):
+        """Take a census on the frame a wave finishes"""
+        active = game.wave_manager.is_wave_active()
+        if self._was_wave_active and not active:
+            sample = self.census(game, f"wave {game.wave_manager.get_current_wave()} end")
+            self.samples.append(sample)
+            self._check_growth()
+        self._was_wave_active = active
+
+    def census(self, game, label):
+        """Count and size live objects of each tracked type
+
+        Costs one pass over every gc-tracked object, so it runs at wave ends
+        and on request rather than every frame.
+        """
+        start = time.perf_counter()
+        instances = {name: [] for name in TRACKED_NAMES}
+        objects = gc.get_objects()
+        for obj in objects:
+            name = TRACKED_TYPES.get(type(obj))
+            if name is not None:
+                instances[name].append(obj)
+
+        surfaces = {}
+        for obj in gc.get_referents(*objects):
+            if isinstance(obj, pygame.Surface):
+                surfaces[id(obj)] = obj
+        instances["Surface"] = list(surfaces.values())
+        del objects, surfaces
+
+        in_play = {
+            "Enemy": len(game.enemies),
+            "Tower": len(game.towers),
+            "Projectile": sum(type(p) is Projectile
+                              for tower in game.towers for p in tower.projectiles),
+            "ScheduledProjectile": sum(type(p) is ScheduledProjectile
+                                       for tower in game.towers for p in tower.projectiles),
+        }
+        listed = {id(enemy) for enemy in game.enemies}
+        stale_targets = sum(1 for tower in game.towers
+                            if tower.target is not None and id(tower.target) not in listed)
+
+        traced, traced_peak = tracemalloc.get_traced_memory()
+        sample = {
+            "label": label,
+            "frame": game.frame_count,
+            "wave": game.wave_manager.get_current_wave(),
+            "live": {name: len(objs) for name, objs in instances.items()},
+            "in_play": in_play,
+            "bytes_each": {name: self._mean_footprint(objs) for name, objs in instances.items()
+                           if name != "Surface"},
+            "surface_bytes": sum(self._surface_bytes(surface)
+                                 for surface in instances["Surface"]),
+            "stale_targets": stale_targets,
+            "traced": traced,
+            "traced_peak": traced_peak,
+            "seconds": time.perf_counter() - start,
+        }
+        self.latest = sample
+        return sample
+
+    def _mean_footprint(self, objs):
+        """Average bytes per instance: the object, its __dict__ and attributes only it holds"""
+        if not objs:
+            return 0
+        # Containers referenced by several instances (the shared path list) are not theirs
+        holders = {}
+        for obj in objs:
+            for value in vars(obj).values():
+                if isinstance(value, _OWNED_TYPES):
+                    holders[id(value)] = holders.get(id(value), 0) + 1
+        total = 0
+        for obj in objs:
+            attrs = vars(obj)
+            total += sys.getsizeof(obj) + sys.getsizeof(attrs)
+            for value in attrs.values():
+                if isinstance(value, _OWNED_TYPES) and holders[id(value)] == 1:
+                    total += sys.getsizeof(value)
+        return total // len(objs)
+
+    def _surface_bytes(self, surface):
+        """Pixel buffer size; subsurfaces share their parent's pixels"""
+        if surface.get_parent() is not None:
+            return 0
+        return surface.get_pitch() * surface.get_height()
+
+    def take_snapshot(self, game, limit=10):
+        """Census plus a tracemalloc snapshot diffed against the previous one"""
+        sample = self.census(game, f"snapshot at frame {game.frame_count}")
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),  # The monitor's own samples
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        self.top_allocations = snapshot.statistics("lineno")[:limit]
+        if self.snapshot is not None:
+            diff = snapshot.compare_to(self.snapshot, "lineno")
+            self.top_growth = [stat for stat in diff if stat.size_diff > 0][:limit]
+        self.snapshot = snapshot
+        return sample
+
+    def _check_growth(self):
+        """Flag leftovers of the wave just finished and figures that keep rising"""
+        latest = self.samples[-1]
+
+        # Nothing should outlive a finished wave except towers
+        for name in ("Enemy", "Projectile", "ScheduledProjectile"):
+            retained = latest["live"][name] - latest["in_play"][name]
+            if retained > 0:
+                self._warn(latest, f"{retained} {name} objects outlive the wave"
+                           + (f" ({latest['stale_targets']} held as tower targets)"
+                              if name == "Enemy" and latest["stale_targets"] else ""))
+
+        # Growth has to hold at every one of the last growth_waves wave ends
+        window = self.samples[-(self.growth_waves + 1):]
+        if len(window) <= self.growth_waves:
+            return
+
+        def rising(values):
+            return all(later > earlier for earlier, later in zip(values, values[1:]))
+
+        traced = [sample["traced"] for sample in window]
+        if rising(traced) and traced[-1] - traced[0] >= self.growth_bytes:
+            self._warn(latest, f"traced memory grew for {self.growth_waves} waves "
+                       f"(+{(traced[-1] - traced[0]) / 1024:.0f} KiB)")
+        surfaces = [sample["live"]["Surface"] for sample in window]
+        if rising(surfaces):
+            self._warn(latest, f"Surface count grew for {self.growth_waves} waves "
+                       f"({surfaces[0]} -> {surfaces[-1]})")
+
+    def _warn(self, sample, message):
+        warning = f"wave {sample['wave']}: {message}"
+        if warning not in self.warnings:
+            self.warnings.append(warning)
+            print(f"Memory warning, {warning}")
+
+    def overlay_lines(self, game):
+        """Text for the overlay: running figures plus the latest census"""
+        traced, peak = tracemalloc.get_traced_memory()
+        projectiles = sum(len(tower.projectiles) for tower in game.towers)
+        lines = [
+            f"Traced {traced / 1048576:.1f} MiB (peak {peak / 1048576:.1f} MiB)",
+            f"In play: {len(game.enemies)} enemies, {len(game.towers)} towers, "
+            f"{projectiles} projectiles",
+        ]
+        sample = self.latest
+        if sample is None:
+            lines.append("No census yet (F9 or end of a wave)")
+        else:
+            lines.append(f"Census, {sample['label']} ({sample['seconds'] * 1000:.0f} ms):")
+            for name in TRACKED_NAMES:
+                if name == "Surface":
+                    lines.append(f"  Surface: {sample['live'][name]} live, "
+                                 f"{sample['surface_bytes'] / 1048576:.1f} MiB pixels")
+                else:
+                    lines.append(f"  {name}: {sample['live'][name]} live / "
+                                 f"{sample['in_play'][name]} in play, "
+                                 f"{sample['bytes_each'][name]} B each")
+        lines.extend(self.warnings[-3:])
+        return lines
+
+    def draw(self, surface, game):
+        """Draw the overlay in the top-left corner of the map"""
+        if self._font is None:
+            self._font = pygame.font.Font(None, 18)
+        lines = self.overlay_lines(game)
+        rendered = [self._font.render(line, True, YELLOW if line.startswith("wave") else WHITE)
+                    for line in lines]
+        width = max(text.get_width() for text in rendered) + 12
+        height = len(rendered) * 16 + 8
+        backdrop = pygame.Surface((width, height), pygame.SRCALPHA)
+        backdrop.fill((0, 0, 0, 170))
+        surface.blit(backdrop, (8, 8))
+        for row, text in enumerate(rendered):
+            surface.blit(text, (14, 12 + row * 16))
+
+    def report(self):
+        """Plain-text report of every census, warning and the last snapshot"""
+        lines = ["Memory report", ""]
+        samples = self.samples + ([self.latest] if self.latest is not None
+                                  and self.latest not in self.samples else [])
+        header = f"{'census':<28}{'frame':>8}"
+        widths = {name: max(len(name), 6) + 4 for name in TRACKED_NAMES}
+        for name in TRACKED_NAMES:
+            header += f"{name:>{widths[name] - 4}}    "
+        header += f"{'traced KiB':>10}{'surf KiB':>10}"
+        lines.append(header)
+        for sample in samples:
+            row = f"{sample['label']:<28}{sample['frame']:>8}"
+            for name in TRACKED_NAMES:
+                count = sample["live"][name]
+                retained = count - sample["in_play"].get(name, count)
+                row += f"{count:>{widths[name] - 4}}" + (f" +{retained:<2}" if retained > 0
+                                                          else "    ")
+            row += f"{sample['traced'] // 1024:>10}{sample['surface_bytes'] // 1024:>10}"
+            lines.append(row)
+        lines.append("(+N: live objects no longer in play)")
+
+        if samples:
+            lines.append("")
+            lines.append("Bytes per instance at the last census:")
+            for name, size in samples[-1]["bytes_each"].items():
+                lines.append(f"  {name}: {size}")
+
+        lines.append("")
+        lines.append("Warnings:" if self.warnings else "Warnings: none")
+        lines.extend(f"  {warning}" for warning in self.warnings)
+
+        if self.top_allocations:
+            lines.append("")
+            lines.append("Largest allocation sites at the last snapshot:")
+            lines.extend(f"  {stat}" for stat in self.top_allocations)
+        if self.top_growth:
+            lines.append("")
+            lines.append("Growth since the snapshot before it:")
+            lines.extend(f"  {stat}" for stat in self.top_growth)
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, game=None):
+        """Take a final census and write the report file"""
+        if game is not None:
+            self.take_snapshot(game)
+        with open(self.path, "w") as handle:
+            handle.write(self.report())
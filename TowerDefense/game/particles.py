@@ -0,0 +1,187 @@
+"""
+Array-backed particle pool for hit sparks, death bursts and muzzle flashes
+"""
+
+import math
+import numpy as np
+import pygame
+from config import *
+
+class ParticleSystem:
+    """Fixed-capacity particle pool updated and drawn with whole-array operations
+
+    Emissions are queued as plain tuples and materialised in one vectorised
+    batch per update, so a burst of hits costs a list append each. Live
+    particles are compacted to the front of the arrays, updated with a handful
+    of NumPy operations and written straight into the screen's pixel buffer.
+    Quality scales emission counts down automatically as the pool fills.
+    """
+
+    # Effect presets: (count, speed, lifetime in frames)
+    HIT = (4, 1.5, 12)
+    DEATH = (14, 2.5, 30)
+    MUZZLE = (3, 1.0, 6)
+
+    def __init__(self, capacity=PARTICLE_CAPACITY, seed=None):
+        self.capacity = capacity
+        self.limit = capacity  # Effective cap, lowered by quality controllers
+        self.count = 0
+        self.quality = 1.0
+        self.positions = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocities = np.zeros((capacity, 2), dtype=np.float32)
+        self.lifetimes = np.zeros(capacity, dtype=np.float32)
+        self.colors = np.zeros(capacity, dtype=np.int32)  # Index into palette
+
+        self.palette = []
+        self._palette_index = {}
+        self._mapped_palette = None
+        self._mapped_format = None
+        self._pending = []
+        self._rng = np.random.default_rng(seed)
+
+    def set_limit(self, fraction):
+        """Cap the pool at a fraction of its capacity"""
+        self.limit = max(0, min(self.capacity, int(self.capacity * fraction)))
+
+    def emit(self, x, y, preset, color):
+        """Queue a burst of particles at a position"""
+        count, speed, lifetime = preset
+        count = int(count * self.quality + 0.5)
+        if count <= 0:
+            return
+        self._pending.append((x, y, count, speed, lifetime, self._color_index(color)))
+
+    def on_tower_fired(self, tower, target, frame_count):
+        self.emit(tower.position.x, tower.position.y, self.MUZZLE, YELLOW)
+
+    def on_enemy_hit(self, enemy, damage, source=None):
+        self.emit(enemy.position.x, enemy.position.y, self.HIT, ORANGE)
+
+    def on_enemy_killed(self, enemy):
+        self.emit(enemy.position.x, enemy.position.y, self.DEATH, enemy.color)
+
+    def update(self):
+        """Spawn queued bursts and advance every live particle one frame"""
+        if self._pending:
+            self._spawn_pending()
+
+        n = self.count
+        if n == 0:
+            return
+
+        self.positions[:n] += self.velocities[:n]
+        self.velocities[:n] *= 0.9
+        self.lifetimes[:n] -= 1
+
+        # Compact survivors to the front of the pool
+        alive = self.lifetimes[:n] > 0
+        survivors = int(np.count_nonzero(alive))
+        if survivors != n:
+            self.positions[:survivors] = self.positions[:n][alive]
+            self.velocities[:survivors] = self.velocities[:n][alive]
+            self.lifetimes[:survivors] = self.lifetimes[:n][alive]
+            self.colors[:survivors] = self.colors[:n][alive]
+            self.count = survivors
+
+        self._scale_quality()
+
+    def draw(self, screen, offset=(0, 0)):
+        """Write live particles into the screen as 2x2 pixel blocks"""
+        n = self.count
+        if n == 0:
+            return
+
+        width, height = screen.get_size()
+        xs = (self.positions[:n, 0] - offset[0]).astype(np.int32)
+        ys = (self.positions[:n, 1] - offset[1]).astype(np.int32)
+        visible = (xs >= 0) & (xs < width - 1) & (ys >= 0) & (ys < height - 1)
+        xs = xs[visible]
+        ys = ys[visible]
+        colors = self._mapped_colors(screen)[self.colors[:n][visible]]
+
+        try:
+            pixels = pygame.surfarray.pixels2d(screen)
+        except ValueError:
+            # Surface format without a direct pixel view; draw one rect per particle
+            for x, y, color_index in zip(xs.tolist(), ys.tolist(), self.colors[:n][visible].tolist()):
+                screen.fill(self.palette[color_index], (x, y, 2, 2))
+            return
+
+        pixels[xs, ys] = colors
+        pixels[xs + 1, ys] = colors
+        pixels[xs, ys + 1] = colors
+        pixels[xs + 1, ys + 1] = colors
+        del pixels  # Release the surface lock before the next blit
+
+    def mirror(self, positions, colors, palette):
+        """Replace the live particles with a copy of ones simulated elsewhere"""
+        n = min(len(positions), self.capacity)
+        self.positions[:n] = positions[:n]
+        self.colors[:n] = colors[:n]
+        self.count = n
+        if len(palette) != len(self.palette):
+            self.palette = [tuple(color) for color in palette]
+            self._palette_index = {color: i for i, color in enumerate(self.palette)}
+            self._mapped_palette = None
+
+    def clear(self):
+        """Remove every particle"""
+        self.count = 0
+        self._pending.clear()
+
+    def _spawn_pending(self):
+        pending = np.array(self._pending, dtype=np.float32)
+        self._pending.clear()
+
+        counts = pending[:, 2].astype(np.int64)
+        free = self.limit - self.count
+        if free <= 0:
+            return
+
+        total = int(counts.sum())
+        rows = np.repeat(np.arange(len(pending)), counts)[:free]
+        spawned = len(rows)
+        start = self.count
+        end = start + spawned
+
+        angles = self._rng.uniform(0.0, 2 * math.pi, spawned).astype(np.float32)
+        speeds = pending[rows, 3] * self._rng.uniform(0.4, 1.0, spawned).astype(np.float32)
+        self.positions[start:end, 0] = pending[rows, 0]
+        self.positions[start:end, 1] = pending[rows, 1]
+        self.velocities[start:end, 0] = np.cos(angles) * speeds
+        self.velocities[start:end, 1] = np.sin(angles) * speeds
+        self.lifetimes[start:end] = pending[rows, 4]
+        self.colors[start:end] = pending[rows, 5].astype(np.int32)
+        self.count = end
+
+        if spawned < total:
+            self.quality = max(0.1, self.quality * 0.5)  # Pool is saturated
+
+    def _scale_quality(self):
+        """Emit fewer particles per effect as the pool fills, recover when it drains"""
+        if self.limit == 0:
+            return
+        load = self.count / self.limit
+        if load > 0.75:
+            self.quality = max(0.1, self.quality * 0.95)
+        elif load < 0.25 and self.quality < 1.0:
+            self.quality = min(1.0, self.quality * 1.02)
+
+    def _color_index(self, color):
+        index = self._palette_index.get(color)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(color)
+            self._palette_index[color] = index
+            self._mapped_palette = None
+        return index
+
+    def _mapped_colors(self, screen):
+        """Get palette colors in the screen's pixel format"""
+        surface_format = (screen.get_bitsize(), screen.get_masks())
+        if self._mapped_palette is None or self._mapped_format != surface_format:
+            self._mapped_palette = np.array(
+                [screen.map_rgb(color) for color in self.palette], dtype=np.int64
+            )
+            self._mapped_format = surface_format
+        return self._mapped_palette
@@ -0,0 +1,74 @@
+"""
+Replay logs: the seed plus every player command, replayed headlessly
+"""
+
+import json
+import os
+
+class ReplayLog:
+    """Seed and frame-stamped player commands of one game
+
+    The simulation is deterministic given its seed, so the commands are all
+    that is needed to reproduce a game frame for frame. Games built from a
+    generated scenario also keep the scenario (as its to_dict() form).
+    """
+
+    def __init__(self, seed, commands=None, end_frame=0, scenario=None):
+        self.seed = seed
+        self.scenario = scenario
+        self.commands = commands if commands is not None else []  # [(frame, command)]
+        self.end_frame = end_frame
+
+    def record(self, frame, command):
+        """Log a command that took effect before simulating frame + 1"""
+        self.commands.append((frame, tuple(command)))
+        self.end_frame = max(self.end_frame, frame)
+
+    def save(self, path):
+        with open(path, "w") as handle:
+            json.dump({
+                "seed": self.seed,
+                "end_frame": self.end_frame,
+                "commands": [[frame, list(command)] for frame, command in self.commands],
+                "scenario": self.scenario,
+            }, handle)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as handle:
+            data = json.load(handle)
+        commands = [(frame, tuple(command)) for frame, command in data["commands"]]
+        return cls(data["seed"], commands, data["end_frame"], data.get("scenario"))
+
+def play_replay(log, on_frame=None):
+    """Re-run a recorded game headlessly as fast as the simulation allows
+
+    on_frame(game) is called after every simulated frame. Returns the game in
+    its final state.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    from game.tower_defense_game import TowerDefenseGame
+    from game.scenarios import Scenario
+
+    scenario = Scenario.from_dict(log.scenario) if log.scenario is not None else None
+    game = TowerDefenseGame(headless=True, simulation_process=False, seed=log.seed,
+                            record_replay=False, rewind=False, scenario=scenario,
+                            instruments=False)
+    commands = log.commands
+    next_command = 0
+    while game.frame_count < log.end_frame or next_command < len(commands):
+        while next_command < len(commands) and commands[next_command][0] <= game.frame_count:
+            game.apply_command(commands[next_command][1])
+            next_command += 1
+
+        if game.paused:
+            # Commands issued during a pause share its frame and were applied above,
+            # so a game still paused here stayed paused until the recording ended
+            break
+
+        game.update_game_logic()
+        if on_frame is not None:
+            on_frame(game)
+        if game.game_over:
+            break
+    return game
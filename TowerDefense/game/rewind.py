@@ -0,0 +1,187 @@
+"""
+Rewind buffer: periodic simulation keyframes plus per-tick deltas
+"""
+
+import bisect
+import collections
+import pickle
+import zlib
+import numpy as np
+from config import *
+
+# Game attributes that make up the simulation state, pickled together so
+# references between them (scheduler -> tower, queued hit -> enemy) survive
+STATE_ATTRIBUTES = ("frame_count", "money", "lives", "score", "game_over", "victory",
+                    "enemies", "towers", "damage_events", "tower_scheduler",
+                    "status_effects", "wave_manager")
+
+def capture_state(game):
+    """Serialize the simulation state of a game into compressed bytes"""
+    state = {name: getattr(game, name) for name in STATE_ATTRIBUTES}
+    state["grid"] = game.game_map.grid
+    state["towers_by_tile"] = game.game_map.towers_by_tile
+    state["aura"] = (game.aura_graph.supporters, game.aura_graph.buffed,
+                     game.aura_graph.max_radius)
+    return zlib.compress(pickle.dumps(state, pickle.HIGHEST_PROTOCOL), 1)
+
+def restore_state(game, data):
+    """Replace a game's simulation state with one from capture_state
+
+    Rendering, input and effect state is left alone apart from particles,
+    which belong to the abandoned timeline.
+    """
+    state = pickle.loads(zlib.decompress(data))
+    for name in STATE_ATTRIBUTES:
+        setattr(game, name, state[name])
+    game.game_map.grid = state["grid"]
+    game.game_map.towers_by_tile = state["towers_by_tile"]
+    (game.aura_graph.supporters, game.aura_graph.buffed,
+     game.aura_graph.max_radius) = state["aura"]
+    game.wave_manager.path_points = game.game_map.get_path_points()
+    game.wave_predictor.wave_manager = game.wave_manager
+    game.wave_predictor.invalidate()
+
+    for entity in game.enemies + game.towers:
+        entity.events = game.events
+    game.enemy_index.rebuild(game.enemies)
+    if game.particles is not None:
+        game.particles.clear()
+
+class _Segment:
+    """A keyframe and the ticks recorded after it, up to the next keyframe"""
+
+    __slots__ = ("frame", "data", "base", "deltas", "ticks", "commands")
+
+    def __init__(self, frame, data, base, capacity):
+        self.frame = frame
+        self.data = data
+        self.base = base  # (money, lives, score) at the keyframe
+        self.deltas = np.zeros((capacity, 3), dtype=np.int32)  # Change per tick after it
+        self.ticks = 0
+        self.commands = []  # (frame, command), in the order they were applied
+
+    def nbytes(self):
+        return len(self.data) + self.deltas.nbytes + 64 * len(self.commands)
+
+class RewindBuffer:
+    """Ring of keyframes from which any recent tick can be rebuilt
+
+    Every `interval` ticks the whole simulation state is pickled and
+    compressed as a keyframe. Between keyframes each tick stores only its
+    deltas: the player commands applied before it and its change in money,
+    lives and score. Entity arrays are not stored per tick because the
+    simulation is deterministic: restoring the keyframe at or before the
+    target and re-running at most interval - 1 ticks with the same commands
+    rebuilds them exactly, including status effects, cooldowns and hits in
+    flight. The stored money/lives/score deltas are checked against the
+    rebuilt state to catch any divergence.
+
+    The oldest keyframes are dropped once the buffer covers more than
+    `seconds` or exceeds `budget` bytes.
+    """
+
+    def __init__(self, interval=REWIND_KEYFRAME_INTERVAL, seconds=REWIND_SECONDS,
+                 budget=REWIND_MEMORY_BUDGET):
+        self.interval = interval
+        self.window = int(seconds * FPS)
+        self.budget = budget
+        self.segments = collections.deque()
+        self.nbytes = 0
+        self._frames = []         # Keyframe frames, parallel to segments, for bisect
+        self._last_values = None  # (money, lives, score) after the last recorded tick
+        self._resimulating = False
+
+    def record_command(self, frame, command):
+        """Log a command applied before simulating frame + 1"""
+        if self.segments and not self._resimulating:
+            self.segments[-1].commands.append((frame, command))
+
+    def record_tick(self, game):
+        """Log the tick just simulated, keyframing every interval ticks
+
+        Also called once before the first tick to take the opening keyframe.
+        """
+        if self._resimulating:
+            return
+        values = (game.money, game.lives, game.score)
+        if not self.segments or game.frame_count - self.segments[-1].frame >= self.interval:
+            self._add_keyframe(game, values)
+        else:
+            segment = self.segments[-1]
+            last = self._last_values
+            segment.deltas[segment.ticks] = (values[0] - last[0], values[1] - last[1],
+                                             values[2] - last[2])
+            segment.ticks += 1
+        self._last_values = values
+
+    def _add_keyframe(self, game, values):
+        segment = _Segment(game.frame_count, capture_state(game), values, self.interval)
+        self.segments.append(segment)
+        self._frames.append(segment.frame)
+        self.nbytes += segment.nbytes()
+
+        # Keep the oldest keyframe that still reaches back the full window
+        while len(self.segments) > 1 and (
+                self.segments[1].frame <= segment.frame - self.window
+                or self.nbytes > self.budget):
+            self.nbytes -= self.segments.popleft().nbytes()
+            self._frames.pop(0)
+
+    def oldest_frame(self):
+        """Earliest frame that can be rewound to, or None if nothing is recorded"""
+        return self.segments[0].frame if self.segments else None
+
+    def values_at(self, frame):
+        """Recorded (money, lives, score) after the given tick"""
+        segment = self.segments[bisect.bisect_right(self._frames, frame) - 1]
+        ticks = frame - segment.frame
+        change = segment.deltas[:ticks].sum(axis=0)
+        return tuple(int(base + delta) for base, delta in zip(segment.base, change))
+
+    def rewind(self, game, frame):
+        """Put the game back to the state right after the given tick
+
+        The frame is clamped to what the buffer holds. Commands issued on or
+        after it are forgotten, so play continues from there as a new
+        timeline. Returns the frame actually restored.
+        """
+        frame = max(self.oldest_frame(), min(frame, game.frame_count))
+        index = bisect.bisect_right(self._frames, frame) - 1
+        segment = self.segments[index]
+        expected = self.values_at(frame)
+
+        restore_state(game, segment.data)
+        commands = [(when, command) for when, command in segment.commands if when < frame]
+
+        # Re-run the ticks between the keyframe with the commands that preceded each one.
+        # Keyframes are taken after a tick, so the game is unpaused there; pause toggles
+        # in between are replayed so commands issued while paused stay ignored.
+        paused = game.paused
+        game.paused = False
+        self._resimulating = True
+        try:
+            next_command = 0
+            while game.frame_count < frame and not game.game_over:
+                while (next_command < len(commands)
+                       and commands[next_command][0] <= game.frame_count):
+                    game.apply_command(commands[next_command][1])
+                    next_command += 1
+                game.paused = False
+                game.update_game_logic()
+        finally:
+            self._resimulating = False
+            game.paused = paused
+
+        # Forget the abandoned future
+        while len(self.segments) > index + 1:
+            self.nbytes -= self.segments.pop().nbytes()
+            self._frames.pop()
+        self.nbytes -= 64 * (len(segment.commands) - len(commands))
+        segment.commands = commands
+        segment.ticks = frame - segment.frame
+        self._last_values = (game.money, game.lives, game.score)
+
+        if self._last_values != expected:
+            print(f"Rewind to frame {frame} diverged: money/lives/score {self._last_values}, "
+                  f"recorded {expected}")
+        return game.frame_count
@@ -0,0 +1,177 @@
+"""
+Seeded procedural scenarios (map path, tower layout, waves) for stress tests and benchmarks
+"""
+
+import json
+import random
+from config import *
+from entities.enemy import ENEMY_TYPES
+from entities.tower import TOWER_TYPES
+from game.game_map import GameMap
+
+class Scenario:
+    """A map path, a prebuilt tower layout and wave definitions
+
+    Plain lists and dicts only, so a scenario round-trips through JSON and
+    the same file reproduces the same game. towers holds (grid_x, grid_y,
+    tower_type) entries; wave_configs uses the WaveManager.wave_configs format.
+    """
+
+    def __init__(self, seed, width, height, path_points, towers, wave_configs, params=None):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.path_points = [tuple(point) for point in path_points]
+        self.towers = [tuple(tower) for tower in towers]
+        self.wave_configs = wave_configs
+        self.params = params or {}  # The generator arguments, for reports
+
+    def to_dict(self):
+        return {
+            "seed": self.seed,
+            "width": self.width,
+            "height": self.height,
+            "path_points": [list(point) for point in self.path_points],
+            "towers": [list(tower) for tower in self.towers],
+            "wave_configs": [{"enemies": [list(entry) for entry in config["enemies"]],
+                              "spawn_delay": config["spawn_delay"]}
+                             for config in self.wave_configs],
+            "params": self.params,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        wave_configs = [{"enemies": [tuple(entry) for entry in config["enemies"]],
+                         "spawn_delay": config["spawn_delay"]}
+                        for config in data["wave_configs"]]
+        return cls(data["seed"], data["width"], data["height"], data["path_points"],
+                   data["towers"], wave_configs, data.get("params"))
+
+    def save(self, path):
+        with open(path, "w") as handle:
+            json.dump(self.to_dict(), handle)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as handle:
+            return cls.from_dict(json.load(handle))
+
+    def build_map(self):
+        """Create the GameMap for this scenario's size and path"""
+        return GameMap(self.width, self.height, self.path_points)
+
+def generate_path(rng, width, height, turns, tile_size=TILE_SIZE):
+    """Random path from the left edge to the right edge through tile centres
+
+    Horizontal runs always move right and alternate with vertical runs, so the
+    path never crosses itself and every segment is axis-aligned, which is what
+    GameMap's tile marking expects. Vertical runs are kept at least two tiles
+    apart so towers fit between them.
+    """
+    columns = width // tile_size
+    rows = height // tile_size
+    half = tile_size // 2
+
+    # Columns where the path turns, spread across the map
+    turns = max(0, min(turns, (columns - 2) // 2))
+    candidates = list(range(1, columns - 1, 2))
+    turn_columns = sorted(rng.sample(candidates, min(turns, len(candidates))))
+
+    row = rng.randrange(1, rows - 1)
+    points = [(half, row * tile_size + half)]
+    for column in turn_columns:
+        x = column * tile_size + half
+        points.append((x, row * tile_size + half))
+        new_row = rng.randrange(1, rows - 1)
+        while new_row == row and rows > 3:
+            new_row = rng.randrange(1, rows - 1)
+        row = new_row
+        points.append((x, row * tile_size + half))
+    points.append(((columns - 1) * tile_size + half, row * tile_size + half))
+    return points
+
+def generate_layout(rng, game_map, density, tower_mix=None, reach=2):
+    """Random legal tower layout covering a fraction of the free tiles near the path
+
+    Only empty tiles within `reach` tiles of the path are candidates (towers
+    further out never fire, which only dilutes a stress test). tower_mix maps
+    tower types to relative weights; every type is equally likely by default.
+    Returns (grid_x, grid_y, tower_type) entries in placement order.
+    """
+    mix = tower_mix or {name: 1.0 for name in TOWER_TYPES}
+    names = sorted(mix)
+    weights = [mix[name] for name in names]
+
+    grid = game_map.grid
+    candidates = []
+    for grid_y in range(game_map.grid_height):
+        for grid_x in range(game_map.grid_width):
+            if grid[grid_y][grid_x] != 0:
+                continue
+            near = any(grid[y][x] == 1
+                       for y in range(max(0, grid_y - reach),
+                                      min(game_map.grid_height, grid_y + reach + 1))
+                       for x in range(max(0, grid_x - reach),
+                                      min(game_map.grid_width, grid_x + reach + 1)))
+            if near:
+                candidates.append((grid_x, grid_y))
+
+    count = int(round(len(candidates) * density))
+    chosen = rng.sample(candidates, min(count, len(candidates)))
+    return [(grid_x, grid_y, rng.choices(names, weights)[0]) for grid_x, grid_y in chosen]
+
+def generate_waves(rng, count, size, enemy_mix=None, growth=0.25, spawn_delay=30):
+    """Wave definitions with about `size` enemies in the first wave, growing by `growth` per wave
+
+    enemy_mix maps enemy types to relative weights. Each wave's enemies are
+    drawn from the mix, so counts vary around the expected proportions.
+    """
+    mix = enemy_mix or {name: 1.0 for name in ENEMY_TYPES}
+    names = sorted(mix)
+    weights = [mix[name] for name in names]
+
+    configs = []
+    for wave in range(count):
+        total = max(1, int(round(size * (1 + growth * wave))))
+        drawn = rng.choices(names, weights, k=total)
+        enemies = [(name, drawn.count(name)) for name in names if drawn.count(name)]
+        delay = max(1, int(spawn_delay * rng.uniform(0.8, 1.2)))
+        configs.append({"enemies": enemies, "spawn_delay": delay})
+    return configs
+
+def generate_scenario(seed, width=MAP_WIDTH, height=MAP_HEIGHT, turns=8, density=0.2,
+                      tower_mix=None, waves=10, wave_size=20, enemy_mix=None, growth=0.25,
+                      spawn_delay=30):
+    """Generate a complete scenario; the same arguments always give the same scenario"""
+    params = {"width": width, "height": height, "turns": turns, "density": density,
+              "tower_mix": tower_mix, "waves": waves, "wave_size": wave_size,
+              "enemy_mix": enemy_mix, "growth": growth, "spawn_delay": spawn_delay}
+    rng = random.Random(seed)
+    path_points = generate_path(rng, width, height, turns)
+    game_map = GameMap(width, height, path_points)
+    towers = generate_layout(rng, game_map, density, tower_mix)
+    wave_configs = generate_waves(rng, waves, wave_size, enemy_mix, growth, spawn_delay)
+    return Scenario(seed, width, height, path_points, towers, wave_configs, params)
+
+def generate_corpus(seed, count, **ranges):
+    """Generate `count` scenarios with parameters drawn from ranges
+
+    Each keyword of generate_scenario may be given as a (low, high) pair to
+    draw from, or a fixed value. Scenario i gets its own seed derived from
+    `seed`, so a corpus is reproducible and any member can be regenerated
+    alone from its recorded seed and params.
+    """
+    defaults = {"turns": (2, 12), "density": (0.05, 0.6), "wave_size": (10, 80),
+                "spawn_delay": (5, 60)}
+    defaults.update(ranges)
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        kwargs = {}
+        for name, value in defaults.items():
+            if isinstance(value, tuple):
+                low, high = value
+                value = rng.randint(low, high) if isinstance(low, int) else rng.uniform(low, high)
+            kwargs[name] = value
+        corpus.append(generate_scenario(rng.randrange(2 ** 32), **kwargs))
+    return corpus
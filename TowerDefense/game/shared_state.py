@@ -0,0 +1,340 @@
+"""
+Run the simulation in a worker process and hand state to the renderer
+through a double-buffered shared memory block
+"""
+
+import multiprocessing
+import queue
+from multiprocessing import shared_memory
+import numpy as np
+import pygame
+from config import *
+from entities import Enemy, Tower, Projectile, ENEMY_TYPES, TOWER_TYPES
+from game.targeting import TARGETING_STRATEGIES
+from utils.vector2d import Vector2D
+
+ENEMY_TYPE_NAMES = list(ENEMY_TYPES)
+TOWER_TYPE_NAMES = list(TOWER_TYPES)
+
+# Scalar game state, stored as int64 at the start of each buffer
+HEADER_FIELDS = ("frame", "money", "lives", "score", "wave", "wave_active", "paused",
+                 "game_over", "victory", "enemies", "towers", "projectiles",
+                 "particles", "palette")
+HEADER = {name: i for i, name in enumerate(HEADER_FIELDS)}
+
+ENEMY_DTYPE = np.dtype([
+    ("uid", np.int32), ("type", np.int16), ("progress", np.float32),
+    ("x", np.float32), ("y", np.float32), ("health", np.float32),
+    ("speed", np.float32), ("poisoned", np.uint8),
+])
+TOWER_DTYPE = np.dtype([
+    ("uid", np.int32), ("type", np.int16), ("x", np.int32), ("y", np.int32),
+    ("damage", np.float32), ("range", np.float32), ("attack_rate", np.int32),
+    ("level", np.int16), ("targeting", np.int16), ("target", np.int32),
+    ("buffs", np.float32, 3), ("cost", np.int32),
+])
+PROJECTILE_DTYPE = np.dtype([("tower", np.int32), ("x", np.float32), ("y", np.float32)])
+PALETTE_SIZE = 64
+
+# Control block: index of the newest complete buffer, then one sequence number per buffer
+CONTROL_SIZE = 4 * 8
+
+def _buffer_layout(max_enemies, max_towers, max_projectiles, max_particles):
+    """List (name, shape, dtype) for every array in one buffer"""
+    return [
+        ("header", (len(HEADER_FIELDS),), np.dtype(np.int64)),
+        ("enemies", (max_enemies,), ENEMY_DTYPE),
+        ("towers", (max_towers,), TOWER_DTYPE),
+        ("projectiles", (max_projectiles,), PROJECTILE_DTYPE),
+        ("particle_positions", (max_particles, 2), np.dtype(np.float32)),
+        ("particle_colors", (max_particles,), np.dtype(np.int32)),
+        ("palette", (PALETTE_SIZE, 3), np.dtype(np.uint8)),
+    ]
+
+def _array_bytes(shape, dtype):
+    """Size of one array rounded up to keep the next one 8-byte aligned"""
+    return (int(np.prod(shape)) * dtype.itemsize + 7) & ~7
+
+def _map_arrays(buffer, offset, layout):
+    """Create NumPy views over a buffer starting at offset"""
+    views = {}
+    for name, shape, dtype in layout:
+        views[name] = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        offset += _array_bytes(shape, dtype)
+    return views
+
+class SharedGameState:
+    """Two state buffers in one shared memory block, guarded by sequence numbers
+
+    The writer fills the buffer the reader is not pointed at, bumping that
+    buffer's sequence number to odd before writing and back to even after,
+    then publishes its index. The reader copies the newest buffer into a
+    private snapshot with one memcpy and retries if the sequence number moved
+    underneath it, so it only ever sees complete frames and nothing is pickled.
+    """
+
+    def __init__(self, name=None, max_enemies=SHARED_MAX_ENEMIES, max_towers=SHARED_MAX_TOWERS,
+                 max_projectiles=SHARED_MAX_PROJECTILES, max_particles=PARTICLE_CAPACITY):
+        layout = _buffer_layout(max_enemies, max_towers, max_projectiles, max_particles)
+        self.buffer_size = sum(_array_bytes(shape, dtype) for _, shape, dtype in layout)
+
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=CONTROL_SIZE + 2 * self.buffer_size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.control = np.ndarray(4, dtype=np.int64, buffer=self.shm.buf)
+        if self.owner:
+            self.control[:] = (-1, 0, 0, 0)
+
+        self.buffers = []
+        self._raw = []
+        for index in range(2):
+            offset = CONTROL_SIZE + index * self.buffer_size
+            self.buffers.append(_map_arrays(self.shm.buf, offset, layout))
+            self._raw.append(np.ndarray(self.buffer_size, dtype=np.uint8,
+                                        buffer=self.shm.buf, offset=offset))
+
+        # Reader side: a private copy the renderer can use at leisure
+        self._snapshot_raw = np.zeros(self.buffer_size, dtype=np.uint8)
+        self.snapshot = _map_arrays(self._snapshot_raw, 0, layout)
+        self._snapshot_version = None  # (buffer index, sequence) of the last copy
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish(self, game):
+        """Write the game's current state into the back buffer and flip"""
+        latest = int(self.control[0])
+        index = 1 if latest == 0 else 0
+        views = self.buffers[index]
+        self.control[2 + index] += 1  # Odd: write in progress
+
+        enemies = [
+            (enemy.uid, ENEMY_TYPE_NAMES.index(enemy.type), enemy.progress,
+             enemy.position.x, enemy.position.y, enemy.health, enemy.speed, enemy.poisoned)
+            for enemy in game.enemies if enemy.alive and not enemy.reached_end
+        ][:len(views["enemies"])]
+        if enemies:
+            views["enemies"][:len(enemies)] = enemies
+
+        towers = []
+        projectiles = []
+        for tower in game.towers:
+            target = tower.target
+            target_uid = target.uid if target is not None and target.alive else -1
+            towers.append((tower.uid, TOWER_TYPE_NAMES.index(tower.tower_type),
+                           tower.position.x, tower.position.y, tower.damage, tower.range,
+                           tower.attack_rate, tower.level,
+                           TARGETING_STRATEGIES.index(tower.targeting), target_uid, tower.buffs,
+                           tower.cost))
+            for projectile in tower.projectiles:
+                if projectile.alive:
+                    projectiles.append((tower.uid, projectile.position.x, projectile.position.y))
+        towers = towers[:len(views["towers"])]
+        projectiles = projectiles[:len(views["projectiles"])]
+        if towers:
+            views["towers"][:len(towers)] = towers
+        if projectiles:
+            views["projectiles"][:len(projectiles)] = projectiles
+
+        particles = game.particles
+        count = min(particles.count, len(views["particle_colors"]))
+        views["particle_positions"][:count] = particles.positions[:count]
+        views["particle_colors"][:count] = particles.colors[:count]
+        palette = particles.palette[:PALETTE_SIZE]
+        if palette:
+            views["palette"][:len(palette)] = palette
+
+        header = views["header"]
+        header[:] = (game.frame_count, game.money, game.lives, game.score,
+                     game.wave_manager.get_current_wave(), game.wave_manager.is_wave_active(),
+                     game.paused, game.game_over, game.victory,
+                     len(enemies), len(towers), len(projectiles), count, len(palette))
+
+        self.control[2 + index] += 1  # Even: buffer complete
+        self.control[0] = index
+
+    def read(self, retries=4):
+        """Copy the newest complete buffer into self.snapshot
+
+        Returns True if a frame newer than the last one read was copied.
+        """
+        for _ in range(retries):
+            index = int(self.control[0])
+            if index < 0:
+                return False
+            sequence = int(self.control[2 + index])
+            if (index, sequence) == self._snapshot_version:
+                return False
+            if sequence & 1:
+                continue  # Writer lapped the reader and is refilling this buffer
+            np.copyto(self._snapshot_raw, self._raw[index])
+            if int(self.control[2 + index]) == sequence:
+                self._snapshot_version = (index, sequence)
+                return True
+        return False
+
+    def close(self):
+        """Release this process's mapping (the owner also frees the block)"""
+        self.buffers = []
+        self._raw = []
+        self.control = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+class _ProjectileMirror:
+    """Position-only stand-in drawn with Projectile.draw"""
+
+    draw = Projectile.draw
+
+    def __init__(self, x, y):
+        self.position = Vector2D(x, y)
+        self.alive = True
+
+def run_simulation(shm_name, commands, stop_event):
+    """Worker process entry point: step a headless game and publish every tick"""
+    # No pygame.init(): the headless game brings up the font module it needs itself,
+    # and display, audio and joystick are never used here
+    from game.tower_defense_game import TowerDefenseGame
+
+    game = TowerDefenseGame(headless=True, simulation_process=False, record_replay=False,
+                            rewind=False, instruments=False)
+    state = SharedGameState(shm_name)
+    clock = pygame.time.Clock()
+    try:
+        while not stop_event.is_set():
+            _apply_commands(game, commands)
+            game.update_game_logic()
+            state.publish(game)
+            clock.tick(FPS)
+    finally:
+        state.close()
+        pygame.quit()
+
+def _apply_commands(game, commands):
+    """Replay player actions forwarded by the render process"""
+    while True:
+        try:
+            command = commands.get_nowait()
+        except queue.Empty:
+            return
+
+        game.apply_command(command)
+
+class SimulationClient:
+    """Render-process handle on a simulation running in a worker process
+
+    Player actions are sent as small command tuples; game state comes back
+    through SharedGameState and is mirrored onto the render process's game
+    object so the normal render path draws it unchanged.
+    """
+
+    def __init__(self):
+        self.state = SharedGameState()
+        context = multiprocessing.get_context("spawn")
+        self.commands = context.Queue()
+        self.stop_event = context.Event()
+        self.process = context.Process(target=run_simulation,
+                                       args=(self.state.name, self.commands, self.stop_event),
+                                       daemon=True)
+        self.process.start()
+
+        self.towers = {}   # uid -> mirrored Tower
+        self.enemies = {}  # uid -> mirrored Enemy
+
+    def send(self, command):
+        """Forward a player action tuple to the simulation"""
+        self.commands.put(command)
+
+    def sync(self, game):
+        """Mirror the newest published frame onto game
+
+        Returns True if a new frame was available.
+        """
+        if not self.state.read():
+            return False
+        snapshot = self.state.snapshot
+        header = snapshot["header"].tolist()
+
+        game.frame_count = header[HEADER["frame"]]
+        game.money = header[HEADER["money"]]
+        game.lives = header[HEADER["lives"]]
+        game.score = header[HEADER["score"]]
+        game.paused = bool(header[HEADER["paused"]])
+        game.game_over = bool(header[HEADER["game_over"]])
+        game.victory = bool(header[HEADER["victory"]])
+        game.wave_manager.current_wave = header[HEADER["wave"]]
+        game.wave_manager.wave_active = bool(header[HEADER["wave_active"]])
+
+        self._sync_enemies(game, snapshot["enemies"][:header[HEADER["enemies"]]])
+        self._sync_towers(game, snapshot["towers"][:header[HEADER["towers"]]],
+                          snapshot["projectiles"][:header[HEADER["projectiles"]]])
+
+        count = header[HEADER["particles"]]
+        game.particles.mirror(snapshot["particle_positions"][:count],
+                              snapshot["particle_colors"][:count],
+                              snapshot["palette"][:header[HEADER["palette"]]].tolist())
+        return True
+
+    def _sync_enemies(self, game, rows):
+        path_points = game.game_map.get_path_points()
+        mirrored = {}
+        for uid, type_code, progress, x, y, health, speed, poisoned in rows.tolist():
+            enemy = self.enemies.get(uid)
+            if enemy is None:
+                enemy = Enemy(path_points, ENEMY_TYPE_NAMES[type_code])
+                enemy.uid = uid
+            enemy.progress = progress
+            enemy.position.set(x, y)
+            enemy.health = health
+            enemy.speed = speed
+            enemy.poisoned = bool(poisoned)
+            mirrored[uid] = enemy
+        self.enemies = mirrored
+        game.enemies = list(mirrored.values())
+
+    def _sync_towers(self, game, rows, projectile_rows):
+        projectiles = {}
+        for tower_uid, x, y in projectile_rows.tolist():
+            projectiles.setdefault(tower_uid, []).append(_ProjectileMirror(x, y))
+
+        mirrored = {}
+        for (uid, type_code, x, y, damage, tower_range, attack_rate, level, targeting,
+             target, buffs, cost) in rows.tolist():
+            tower = self.towers.pop(uid, None)
+            if tower is None:
+                tower = Tower(x, y, TOWER_TYPE_NAMES[type_code])
+                tower.uid = uid
+                game.towers.append(tower)
+                game.game_map.place_tower(x, y, tower)
+            tower.damage = damage
+            tower.range = tower_range
+            tower.attack_rate = attack_rate
+            tower.level = level
+            tower.targeting = TARGETING_STRATEGIES[targeting]
+            tower.target = self.enemies.get(target)
+            tower.buffs = tuple(buffs)
+            tower.cost = cost  # Upgrade cost and sell value derive from it
+            tower.projectiles = projectiles.get(uid, [])
+            mirrored[uid] = tower
+
+        # Towers missing from the frame were removed by the simulation
+        for tower in self.towers.values():
+            game.towers.remove(tower)
+            game.game_map.remove_tower(int(tower.position.x), int(tower.position.y))
+            if game.selected_tower is tower:
+                game.selected_tower = None
+        self.towers = mirrored
+
+    def close(self):
+        """Stop the worker and free the shared memory"""
+        self.stop_event.set()
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.state.close()
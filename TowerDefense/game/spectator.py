@@ -0,0 +1,577 @@
+"""
+Spectator streaming: delta-encoded state frames broadcast over a local socket
+
+Every message is a 4-byte little-endian length followed by one frame:
+
+    flags      uint8    bit 0 set on keyframes (full state; clients reset to it)
+    sequence   uint32   tick number; a delta only applies on top of the frame one before it
+    header     int64[]  SPECTATOR_FIELDS, always present
+    counts     uint32[] number of rows in each of the sections below
+    sections   packed NumPy rows, in this order:
+        added enemies     ENEMY_DTYPE     (enemies new since the last frame)
+        moved enemies     MOVE_DTYPE      (enemies whose position, health, speed or poison changed)
+        removed enemies   int32 uid
+        changed towers    TOWER_DTYPE     (new, upgraded, rebuffed, retargeted or retargeting)
+        removed towers    int32 uid
+        projectiles       PROJECTILE_DTYPE (every projectile in flight; they all move each tick)
+
+A spectator may send the single byte b"K" at any time to ask for a keyframe.
+A keyframe carries the sequence number of the delta it stands in for.
+"""
+
+import asyncio
+import struct
+import sys
+import threading
+from collections import deque
+import numpy as np
+import pygame
+from config import *
+from entities import Enemy, Tower, ENEMY_TYPES, TOWER_TYPES
+from game.shared_state import ENEMY_DTYPE, TOWER_DTYPE, PROJECTILE_DTYPE, _ProjectileMirror
+from game.targeting import TARGETING_STRATEGIES
+
+ENEMY_TYPE_NAMES = list(ENEMY_TYPES)
+TOWER_TYPE_NAMES = list(TOWER_TYPES)
+ENEMY_TYPE_CODES = {name: i for i, name in enumerate(ENEMY_TYPE_NAMES)}
+TOWER_TYPE_CODES = {name: i for i, name in enumerate(TOWER_TYPE_NAMES)}
+TARGETING_CODES = {name: i for i, name in enumerate(TARGETING_STRATEGIES)}
+
+SPECTATOR_FIELDS = ("frame", "money", "lives", "score", "wave", "wave_active", "paused",
+                    "game_over", "victory")
+
+MOVE_DTYPE = np.dtype([
+    ("uid", np.int32), ("progress", np.float32), ("x", np.float32), ("y", np.float32),
+    ("health", np.float32), ("speed", np.float32), ("poisoned", np.uint8),
+])
+UID_DTYPE = np.dtype(np.int32)
+SECTIONS = (ENEMY_DTYPE, MOVE_DTYPE, UID_DTYPE, TOWER_DTYPE, UID_DTYPE, PROJECTILE_DTYPE)
+
+FRAME_HEAD = struct.Struct(f"<BI{len(SPECTATOR_FIELDS)}q{len(SECTIONS)}I")
+SEQUENCE_MOD = 2 ** 32
+LENGTH = struct.Struct("<I")
+KEYFRAME = 1
+
+def _tower_row(tower):
+    target = tower.target
+    target_uid = target.uid if target is not None and target.alive else -1
+    return (tower.uid, TOWER_TYPE_CODES[tower.tower_type], tower.position.x, tower.position.y,
+            tower.damage, tower.range, tower.attack_rate, tower.level,
+            TARGETING_CODES[tower.targeting], target_uid, tower.buffs, tower.cost)
+
+def _pack(flags, sequence, game, sections):
+    """Serialize one frame from flags, a sequence number, the game's header and row lists"""
+    header = (game.frame_count, game.money, game.lives, game.score,
+              game.wave_manager.get_current_wave(), game.wave_manager.is_wave_active(),
+              game.paused, game.game_over, game.victory)
+    parts = [FRAME_HEAD.pack(flags, sequence, *header, *(len(rows) for rows in sections))]
+    for rows, dtype in zip(sections, SECTIONS):
+        if rows:
+            parts.append(np.array(rows, dtype=dtype).tobytes())
+    payload = b"".join(parts)
+    return LENGTH.pack(len(payload)) + payload
+
+def unpack_frame(payload):
+    """Split a frame payload into (flags, sequence, header dict, six row arrays)"""
+    values = FRAME_HEAD.unpack_from(payload)
+    flags, sequence = values[:2]
+    header = dict(zip(SPECTATOR_FIELDS, values[2:2 + len(SPECTATOR_FIELDS)]))
+    counts = values[2 + len(SPECTATOR_FIELDS):]
+    offset = FRAME_HEAD.size
+    sections = []
+    for count, dtype in zip(counts, SECTIONS):
+        sections.append(np.frombuffer(payload, dtype=dtype, count=count, offset=offset))
+        offset += count * dtype.itemsize
+    return flags, sequence, header, sections
+
+class DeltaEncoder:
+    """Turns the game's state into frames holding only what changed since the last one
+
+    Registered as a GameEvents listener, so the encoder is told which towers
+    changed (placed, upgraded, rebuffed, retargeted, fired) and which enemies
+    died or leaked, and never has to diff the tower list or search for
+    removals. Live enemies move every tick, so walking them is already
+    proportional to what changed; an enemy is only sent when its position,
+    health, speed or poison differs from what the spectators last saw. Projectiles
+    are only looked up on towers that have fired recently.
+
+    A rewind swaps in restored entity lists; the encoder notices and sends a
+    keyframe instead of a delta.
+    """
+
+    def __init__(self):
+        self.enemies = {}  # uid -> (progress, x, y, health, speed, poisoned) as last sent
+        self.towers = set()  # uids the spectators know about
+        self._dirty = {}  # uid -> tower changed since the last frame
+        self._removed_towers = []
+        self._removed_enemies = []
+        self._firing = {}  # uid -> tower that may have projectiles in flight
+        self._lists = (None, None)  # The entity lists the baseline was taken from
+        self.sequence = 0  # Number of the last frame encode() returned
+
+    def on_tower_fired(self, tower, target, frame_count):
+        self._dirty[tower.uid] = tower
+        self._firing[tower.uid] = tower
+
+    def on_tower_changed(self, tower):
+        self._dirty[tower.uid] = tower
+
+    def on_tower_removed(self, tower):
+        self._dirty.pop(tower.uid, None)
+        self._firing.pop(tower.uid, None)
+        if tower.uid in self.towers:
+            self.towers.discard(tower.uid)
+            self._removed_towers.append(tower.uid)
+
+    def on_enemy_killed(self, enemy):
+        if self.enemies.pop(enemy.uid, None) is not None:
+            self._removed_enemies.append(enemy.uid)
+
+    on_enemy_leaked = on_enemy_killed
+
+    def reset(self):
+        """Forget the spectators' view; the next encode() sends a keyframe"""
+        self.enemies.clear()
+        self.towers.clear()
+        self._dirty.clear()
+        self._removed_towers.clear()
+        self._removed_enemies.clear()
+        self._firing.clear()
+        self._lists = (None, None)
+
+    def encode(self, game):
+        """Frame holding the changes since the previous call
+
+        Returns (frame, is_keyframe). The first call, and the first call after
+        reset() or a rewind, returns a keyframe.
+        """
+        self.sequence = (self.sequence + 1) % SEQUENCE_MOD
+        enemies, towers = self._lists
+        if game.enemies is not enemies or game.towers is not towers:
+            frame = self.keyframe(game)
+            self.enemies = {enemy.uid: (enemy.progress, enemy.position.x, enemy.position.y,
+                                        enemy.health, enemy.speed, enemy.poisoned)
+                            for enemy in game.enemies if enemy.alive and not enemy.reached_end}
+            self.towers = {tower.uid for tower in game.towers}
+            self._dirty.clear()
+            self._removed_towers.clear()
+            self._removed_enemies.clear()
+            self._firing = {tower.uid: tower for tower in game.towers if tower.projectiles}
+            self._lists = (game.enemies, game.towers)
+            return frame, True
+
+        sent = self.enemies
+        added = []
+        moved = []
+        removed = self._removed_enemies
+        for enemy in game.enemies:
+            uid = enemy.uid
+            if not enemy.alive or enemy.reached_end:
+                # Gone this tick; the kill or leak event comes when the game drops it
+                if sent.pop(uid, None) is not None:
+                    removed.append(uid)
+                continue
+            state = (enemy.progress, enemy.position.x, enemy.position.y, enemy.health,
+                     enemy.speed, enemy.poisoned)
+            previous = sent.get(uid)
+            if previous is None:
+                added.append((uid, ENEMY_TYPE_CODES[enemy.type], enemy.progress,
+                              enemy.position.x, enemy.position.y, enemy.health,
+                              enemy.speed, enemy.poisoned))
+            elif previous != state:
+                moved.append((uid,) + state)
+            else:
+                continue
+            sent[uid] = state
+
+        changed = []
+        for uid, tower in self._dirty.items():
+            self.towers.add(uid)
+            changed.append(_tower_row(tower))
+
+        projectiles = []
+        for uid, tower in list(self._firing.items()):
+            live = [(uid, projectile.position.x, projectile.position.y)
+                    for projectile in tower.projectiles if projectile.alive]
+            if live:
+                projectiles.extend(live)
+            else:
+                del self._firing[uid]
+
+        frame = _pack(0, self.sequence, game, (added, moved, removed, changed,
+                                               self._removed_towers, projectiles))
+        self._dirty.clear()
+        self._removed_towers = []
+        self._removed_enemies = []
+        return frame, False
+
+    def keyframe(self, game):
+        """Frame holding the whole visible state, without touching the delta baseline
+
+        It takes the sequence number of the last encode(), whose state it shows.
+        """
+        enemies = [(enemy.uid, ENEMY_TYPE_CODES[enemy.type], enemy.progress,
+                    enemy.position.x, enemy.position.y, enemy.health, enemy.speed, enemy.poisoned)
+                   for enemy in game.enemies if enemy.alive and not enemy.reached_end]
+        towers = [_tower_row(tower) for tower in game.towers]
+        projectiles = [(tower.uid, projectile.position.x, projectile.position.y)
+                       for tower in game.towers for projectile in tower.projectiles
+                       if projectile.alive]
+        return _pack(KEYFRAME, self.sequence, game, (enemies, [], [], towers, [], projectiles))
+
+class _Spectator:
+    """One connected spectator and the frames waiting to be written to it"""
+
+    def __init__(self, writer, backlog):
+        self.writer = writer
+        self.queue = asyncio.Queue(backlog)
+        self.needs_keyframe = True
+        self.dropped = 0
+
+class SpectatorServer:
+    """Broadcasts delta frames to spectators from an asyncio loop in a background thread
+
+    The game thread calls broadcast() once per tick; it encodes the frame and
+    hands it to the event loop without waiting. Each spectator has a short
+    queue of frames to write. When a slow spectator's queue is full, frames
+    are dropped for it and it is marked for a keyframe, which it gets as
+    soon as it has room again, so a stalled socket never holds up the game
+    and never leaves a spectator with a broken delta chain. Nothing is
+    encoded while nobody is watching.
+    """
+
+    def __init__(self, host=SPECTATOR_HOST, port=SPECTATOR_PORT, backlog=SPECTATOR_BACKLOG):
+        self.host = host
+        self.port = port
+        self.backlog = backlog
+        self.encoder = DeltaEncoder()
+        self.spectators = set()
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.loop = None
+        self._server = None
+        self._thread = None
+        self._keyframe_wanted = False
+
+    def start(self):
+        """Start listening; returns once the socket is bound (port 0 picks a free port)"""
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def _run(self, ready):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._server = self.loop.run_until_complete(
+            asyncio.start_server(self._serve, self.host, self.port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self._server.close()
+            self.loop.run_until_complete(self._server.wait_closed())
+            self.loop.close()
+
+    async def _serve(self, reader, writer):
+        spectator = _Spectator(writer, self.backlog)
+        self.spectators.add(spectator)
+        self._keyframe_wanted = True
+        sender = asyncio.ensure_future(self._send(spectator))
+        try:
+            while True:
+                request = await reader.read(64)
+                if not request:
+                    break
+                if b"K" in request:
+                    spectator.needs_keyframe = True
+                    self._keyframe_wanted = True
+        except ConnectionError:
+            pass
+        finally:
+            self.spectators.discard(spectator)
+            sender.cancel()
+            writer.close()
+
+    async def _send(self, spectator):
+        try:
+            while True:
+                frame = await spectator.queue.get()
+                spectator.writer.write(frame)
+                await spectator.writer.drain()
+        except ConnectionError:
+            pass
+
+    def broadcast(self, game):
+        """Encode this tick's frame and queue it for every spectator; never blocks"""
+        if not self.spectators:
+            self.encoder.reset()
+            return
+
+        frame, is_keyframe = self.encoder.encode(game)
+        keyframe = frame if is_keyframe else None
+        if keyframe is None and self._keyframe_wanted:
+            self._keyframe_wanted = False
+            keyframe = self.encoder.keyframe(game)
+        self.loop.call_soon_threadsafe(self._fan_out, frame, keyframe)
+
+    def _fan_out(self, frame, keyframe):
+        for spectator in self.spectators:
+            if spectator.needs_keyframe:
+                if keyframe is None:
+                    self._keyframe_wanted = True
+                    continue
+                outgoing = keyframe
+            else:
+                outgoing = frame
+
+            if spectator.queue.full():
+                spectator.needs_keyframe = True
+                spectator.dropped += 1
+                self.frames_dropped += 1
+                self._keyframe_wanted = True
+                continue
+            spectator.queue.put_nowait(outgoing)
+            spectator.needs_keyframe = False
+            self.frames_sent += 1
+
+    def close(self):
+        """Disconnect every spectator and stop the event loop"""
+        if self.loop is None:
+            return
+
+        async def disconnect():
+            for spectator in list(self.spectators):
+                spectator.writer.close()
+
+        asyncio.run_coroutine_threadsafe(disconnect(), self.loop).result(timeout=2)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=2)
+
+class SpectatorMirror:
+    """Applies received frames to a render-only game so its normal render path draws them
+
+    Deltas that arrive before the first keyframe are skipped. So is every
+    delta after a gap in the sequence numbers (frames the client threw away
+    or the server dropped): the mirror stops applying them, sets
+    wants_keyframe for the caller to ask the server, and waits for a keyframe.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.enemies = {}  # uid -> mirrored Enemy
+        self.towers = {}  # uid -> mirrored Tower
+        self.synced = False
+        self.wants_keyframe = False  # Set on a sequence gap; the caller requests a keyframe
+        self.sequence = None  # Number of the last frame applied
+        self.frames_applied = 0
+
+    def apply(self, payload):
+        """Apply one frame payload (without its length prefix); returns False if skipped"""
+        flags, sequence, header, (added, moved, removed, changed, removed_towers,
+                                  projectiles) = unpack_frame(payload)
+        game = self.game
+        if flags & KEYFRAME:
+            self._clear()
+            self.synced = True
+            self.wants_keyframe = False
+        elif not self.synced:
+            return False
+        elif sequence != (self.sequence + 1) % SEQUENCE_MOD:
+            # A frame in between never arrived, so this delta has nothing to build on
+            self.synced = False
+            self.wants_keyframe = True
+            return False
+        self.sequence = sequence
+
+        game.frame_count = header["frame"]
+        game.money = header["money"]
+        game.lives = header["lives"]
+        game.score = header["score"]
+        game.paused = bool(header["paused"])
+        game.game_over = bool(header["game_over"])
+        game.victory = bool(header["victory"])
+        game.wave_manager.current_wave = header["wave"]
+        game.wave_manager.wave_active = bool(header["wave_active"])
+
+        path_points = game.game_map.get_path_points()
+        for uid, type_code, progress, x, y, health, speed, poisoned in added.tolist():
+            enemy = Enemy(path_points, ENEMY_TYPE_NAMES[type_code])
+            enemy.uid = uid
+            enemy.progress = progress
+            enemy.position.set(x, y)
+            enemy.health = health
+            enemy.speed = speed
+            enemy.poisoned = bool(poisoned)
+            self.enemies[uid] = enemy
+            game.enemies.append(enemy)
+        for uid, progress, x, y, health, speed, poisoned in moved.tolist():
+            enemy = self.enemies.get(uid)
+            if enemy is None:
+                continue
+            enemy.progress = progress
+            enemy.position.set(x, y)
+            enemy.health = health
+            enemy.speed = speed  # The effective speed, whatever slowed it
+            enemy.poisoned = bool(poisoned)
+        if len(removed):
+            for uid in removed.tolist():
+                enemy = self.enemies.pop(uid, None)
+                if enemy is not None:
+                    enemy.alive = False  # Clears target lines still pointing at it
+            game.enemies = list(self.enemies.values())
+
+        for (uid, type_code, x, y, damage, tower_range, attack_rate, level, targeting,
+             target, buffs, cost) in changed.tolist():
+            tower = self.towers.get(uid)
+            if tower is None:
+                tower = Tower(x, y, TOWER_TYPE_NAMES[type_code])
+                tower.uid = uid
+                self.towers[uid] = tower
+                game.towers.append(tower)
+                game.game_map.place_tower(x, y, tower)
+            tower.damage = damage
+            tower.range = tower_range
+            tower.attack_rate = attack_rate
+            tower.level = level
+            tower.targeting = TARGETING_STRATEGIES[targeting]
+            tower.target = self.enemies.get(target)
+            tower.buffs = tuple(buffs)
+            tower.cost = cost
+        for uid in removed_towers.tolist():
+            tower = self.towers.pop(uid, None)
+            if tower is not None:
+                self._remove_tower(tower)
+
+        # Projectiles are sent in full every frame
+        for tower in game.towers:
+            tower.projectiles = []
+        for uid, x, y in projectiles.tolist():
+            tower = self.towers.get(uid)
+            if tower is not None:
+                tower.projectiles.append(_ProjectileMirror(x, y))
+
+        self.frames_applied += 1
+        return True
+
+    def _remove_tower(self, tower):
+        game = self.game
+        game.towers.remove(tower)
+        game.game_map.remove_tower(int(tower.position.x), int(tower.position.y))
+        if game.selected_tower is tower:
+            game.selected_tower = None
+
+    def _clear(self):
+        for tower in list(self.towers.values()):
+            self._remove_tower(tower)
+        self.towers = {}
+        self.enemies = {}
+        self.game.enemies = []
+
+class SpectatorClient:
+    """Receives frames from a SpectatorServer on a background thread
+
+    Frames are kept whole and in order, since every delta builds on the one
+    before it. If the renderer falls more than `backlog` frames behind, the
+    queued frames are thrown away and a keyframe is requested instead.
+    """
+
+    def __init__(self, host=SPECTATOR_HOST, port=SPECTATOR_PORT, backlog=SPECTATOR_BACKLOG * 4):
+        self.host = host
+        self.port = port
+        self.backlog = backlog
+        self.frames = deque()
+        self.connected = threading.Event()
+        self.closed = False
+        self.bytes_received = 0
+        self.loop = None
+        self._writer = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        """Connect; returns once connected (raises on failure)"""
+        self._thread.start()
+        self.connected.wait(5)
+        if not self.connected.is_set():
+            raise ConnectionError(f"Could not reach a spectator server at {self.host}:{self.port}")
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._receive())
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self.closed = True
+            self.loop.close()
+
+    async def _receive(self):
+        reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self.connected.set()
+        try:
+            while True:
+                length = LENGTH.unpack(await reader.readexactly(LENGTH.size))[0]
+                payload = await reader.readexactly(length)
+                self.bytes_received += LENGTH.size + length
+                with self._lock:
+                    if len(self.frames) >= self.backlog:
+                        self.frames.clear()
+                        self._writer.write(b"K")
+                    self.frames.append(payload)
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            self._writer.close()
+
+    def take(self):
+        """Every frame received since the last call, oldest first"""
+        with self._lock:
+            frames = list(self.frames)
+            self.frames.clear()
+        return frames
+
+    def request_keyframe(self):
+        """Ask the server for a keyframe, e.g. after the mirror found a gap"""
+        if self.loop is not None and not self.closed:
+            self.loop.call_soon_threadsafe(self._writer.write, b"K")
+
+    def close(self):
+        if self.loop is not None and not self.closed:
+            self.loop.call_soon_threadsafe(self._writer.close)
+        self._thread.join(timeout=2)
+
+def run_spectator(host=SPECTATOR_HOST, port=SPECTATOR_PORT):
+    """Open a window that draws a live match streamed by a SpectatorServer"""
+    from game.tower_defense_game import TowerDefenseGame
+
+    game = TowerDefenseGame(simulation_process=False, record_replay=False, rewind=False,
+                            instruments=False)
+    pygame.display.set_caption(f"Tower Defense - spectating {host}:{port}")
+    mirror = SpectatorMirror(game)
+    client = SpectatorClient(host, port)
+    client.start()
+    print(f"Spectating {host}:{port} (ESC to quit)")
+    try:
+        while game.running and not client.closed:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    game.running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    game.running = False
+            for payload in client.take():
+                mirror.apply(payload)
+            if mirror.wants_keyframe:
+                mirror.wants_keyframe = False
+                client.request_keyframe()
+            game.render()
+            game.clock.tick(FPS)
+    finally:
+        client.close()
+        pygame.quit()
+    print(f"Received {mirror.frames_applied} frames, {client.bytes_received} bytes")
+
+if __name__ == "__main__":
+    run_spectator(sys.argv[1] if len(sys.argv) > 1 else SPECTATOR_HOST,
+                  int(sys.argv[2]) if len(sys.argv) > 2 else SPECTATOR_PORT)
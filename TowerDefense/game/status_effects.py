@@ -0,0 +1,164 @@
+"""
+Status effects (slow, poison, armor break) applied by towers to enemies
+"""
+
+import heapq
+import numpy as np
+
+# Frames between poison damage ticks
+POISON_TICK_INTERVAL = 15
+
+EFFECT_KINDS = ("slow", "poison", "armor_break")
+
+class _EffectTable:
+    """Growable column arrays holding one row per (enemy, effect kind)"""
+
+    def __init__(self, capacity):
+        self.count = 0
+        self.enemies = []  # Row -> enemy, kept parallel to the arrays
+        self.magnitudes = np.zeros(capacity, dtype=np.float64)
+        self.end_ticks = np.zeros(capacity, dtype=np.int64)
+        self.generations = np.zeros(capacity, dtype=np.int64)
+
+    def append(self, enemy, magnitude, end_tick, generation):
+        if self.count == len(self.magnitudes):
+            self._grow()
+        row = self.count
+        self.enemies.append(enemy)
+        self.magnitudes[row] = magnitude
+        self.end_ticks[row] = end_tick
+        self.generations[row] = generation
+        self.count += 1
+        return row
+
+    def swap_remove(self, row):
+        """Remove a row by moving the last row into its place
+
+        Returns the enemy that moved into `row`, or None if nothing moved.
+        """
+        last = self.count - 1
+        moved = None
+        if row != last:
+            self.enemies[row] = self.enemies[last]
+            self.magnitudes[row] = self.magnitudes[last]
+            self.end_ticks[row] = self.end_ticks[last]
+            self.generations[row] = self.generations[last]
+            moved = self.enemies[row]
+        self.enemies.pop()
+        self.count = last
+        return moved
+
+    def _grow(self):
+        capacity = len(self.magnitudes) * 2
+        for name in ("magnitudes", "end_ticks", "generations"):
+            old = getattr(self, name)
+            grown = np.zeros(capacity, dtype=old.dtype)
+            grown[:len(old)] = old
+            setattr(self, name, grown)
+
+class StatusEffectEngine:
+    """Stores timed effects as arrays per kind and expires them from a min-heap
+
+    Each enemy holds at most one row per kind; re-applying an effect keeps the
+    stronger magnitude and the later end tick. Slow and armor break only change
+    an enemy's stats when they are applied or expire, so they cost nothing per
+    frame. Poison damage is computed for all poisoned enemies in one array
+    operation every POISON_TICK_INTERVAL frames. Expirations are popped from a
+    heap keyed on end tick instead of counting down per enemy.
+    """
+
+    def __init__(self, capacity=64):
+        self.tables = {kind: _EffectTable(capacity) for kind in EFFECT_KINDS}
+        self.rows = {kind: {} for kind in EFFECT_KINDS}  # kind -> {enemy: row}
+        self.expiry_heap = []  # (end_tick, sequence, kind, enemy, generation)
+        self._sequence = 0    # Plain counters rather than itertools.count so the engine pickles
+        self._generation = 0
+
+    def apply(self, enemy, kind, magnitude, duration, tick):
+        """Apply or refresh an effect on an enemy"""
+        if not enemy.alive or enemy.reached_end:
+            return
+
+        table = self.tables[kind]
+        rows = self.rows[kind]
+        end_tick = tick + duration
+        self._generation += 1
+        generation = self._generation
+
+        row = rows.get(enemy)
+        if row is None:
+            rows[enemy] = table.append(enemy, magnitude, end_tick, generation)
+        else:
+            table.magnitudes[row] = max(table.magnitudes[row], magnitude)
+            table.end_ticks[row] = max(table.end_ticks[row], end_tick)
+            table.generations[row] = generation
+            end_tick = int(table.end_ticks[row])
+
+        # Older heap entries for this row are now stale and skipped on pop
+        self._sequence += 1
+        heapq.heappush(self.expiry_heap,
+                       (end_tick, self._sequence, kind, enemy, generation))
+        self._refresh_stats(enemy, kind)
+
+    def apply_all(self, enemy, effects, tick):
+        """Apply a tower's effect list, given as (kind, magnitude, duration) tuples"""
+        for kind, magnitude, duration in effects:
+            self.apply(enemy, kind, magnitude, duration, tick)
+
+    def update(self, tick):
+        """Expire finished effects and deal poison damage"""
+        heap = self.expiry_heap
+        while heap and heap[0][0] <= tick:
+            _, _, kind, enemy, generation = heapq.heappop(heap)
+            row = self.rows[kind].get(enemy)
+            if row is not None and self.tables[kind].generations[row] == generation:
+                self._remove_row(kind, enemy)
+                self._refresh_stats(enemy, kind)
+
+        if tick % POISON_TICK_INTERVAL == 0:
+            table = self.tables["poison"]
+            if table.count:
+                # Magnitudes are damage per second
+                damage = table.magnitudes[:table.count] * (POISON_TICK_INTERVAL / 60.0)
+                for enemy, amount in zip(list(table.enemies), damage.tolist()):
+                    if enemy.alive and not enemy.reached_end:
+                        enemy.take_damage(amount)
+
+    def release(self, enemy):
+        """Drop every effect held by an enemy that died or leaked"""
+        for kind in EFFECT_KINDS:
+            if enemy in self.rows[kind]:
+                self._remove_row(kind, enemy)
+
+    def clear(self):
+        """Drop all effects"""
+        for kind in EFFECT_KINDS:
+            for enemy in list(self.rows[kind]):
+                self._remove_row(kind, enemy)
+                self._refresh_stats(enemy, kind)
+        self.expiry_heap.clear()
+
+    def active_count(self, kind=None):
+        """Get the number of active effects, optionally of one kind"""
+        if kind is not None:
+            return self.tables[kind].count
+        return sum(table.count for table in self.tables.values())
+
+    def _remove_row(self, kind, enemy):
+        rows = self.rows[kind]
+        row = rows.pop(enemy)
+        moved = self.tables[kind].swap_remove(row)
+        if moved is not None:
+            rows[moved] = row
+
+    def _refresh_stats(self, enemy, kind):
+        """Write an enemy's effective stats after one of its effects changed"""
+        row = self.rows[kind].get(enemy)
+        magnitude = float(self.tables[kind].magnitudes[row]) if row is not None else 0.0
+
+        if kind == "slow":
+            enemy.speed = enemy.base_speed * (1.0 - magnitude)
+        elif kind == "armor_break":
+            enemy.armor = enemy.base_armor - magnitude
+        elif kind == "poison":
+            enemy.poisoned = row is not None
@@ -0,0 +1,207 @@
+"""
+Path-progress index and targeting strategies used by towers
+"""
+
+from bisect import bisect_left, bisect_right
+
+# Selectable targeting strategies, in the order the UI cycles through them
+TARGETING_STRATEGIES = ["first", "last", "strongest", "weakest", "closest"]
+
+class RangeExtremeTree:
+    """Segment tree answering max/min of a value over index ranges in O(log n)"""
+
+    def __init__(self, values):
+        self.values = values
+        self.size = len(values)
+        # Leaves hold indices into values; internal nodes hold the winning index
+        self.max_tree = [0] * (2 * self.size)
+        self.min_tree = [0] * (2 * self.size)
+        for i in range(self.size):
+            self.max_tree[self.size + i] = i
+            self.min_tree[self.size + i] = i
+        for node in range(self.size - 1, 0, -1):
+            left, right = self.max_tree[2 * node], self.max_tree[2 * node + 1]
+            self.max_tree[node] = left if values[left] >= values[right] else right
+            left, right = self.min_tree[2 * node], self.min_tree[2 * node + 1]
+            self.min_tree[node] = left if values[left] <= values[right] else right
+
+    def query(self, lo, hi, largest=True):
+        """Get the index of the extreme value in [lo, hi), or None if empty"""
+        values = self.values
+        tree = self.max_tree if largest else self.min_tree
+        best = None
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                best = self._pick(best, tree[lo], largest)
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = self._pick(best, tree[hi], largest)
+            lo >>= 1
+            hi >>= 1
+        return best
+
+    def _pick(self, best, candidate, largest):
+        if best is None:
+            return candidate
+        if largest:
+            return candidate if self.values[candidate] > self.values[best] else best
+        return candidate if self.values[candidate] < self.values[best] else best
+
+class EnemyProgressIndex:
+    """Live enemies kept sorted by arc length travelled along the path
+
+    Towers never move, so each one covers a fixed set of path intervals. With
+    enemies sorted by progress, every targeting strategy becomes a query over a
+    few contiguous slices: first/last are a binary search per interval,
+    strongest/weakest a segment-tree range query, and closest a binary search
+    around the point of each covered segment nearest the tower.
+
+    The index is rebuilt once per frame before towers acquire targets. Damage
+    only lands after targeting, so it stays exact for the whole targeting pass.
+    A full rebuild rather than incremental upkeep is deliberate: every live
+    enemy's progress changes every tick, so all n keys must be rewritten each
+    frame whatever the structure, and the game's list is close to sorted
+    already (spawn order), which Timsort handles in near-linear time. Kills
+    and hits during the frame are handled by skipping dead enemies in every
+    query instead of removing them. The health tree is only built on
+    frames where a strongest or weakest tower actually queries it.
+    """
+
+    def __init__(self):
+        self.enemies = []
+        self.keys = []
+        self._health_tree = None
+
+    def rebuild(self, enemies):
+        """Re-sort live enemies by progress (nearly sorted input, so close to linear)"""
+        active = [enemy for enemy in enemies if enemy.alive and not enemy.reached_end]
+        active.sort(key=lambda enemy: enemy.progress)
+        self.enemies = active
+        self.keys = [enemy.progress for enemy in active]
+        self._health_tree = None  # Built on first health query this frame
+
+    def slice_bounds(self, start, end):
+        """Get the index range of enemies with progress in [start, end]"""
+        return bisect_left(self.keys, start), bisect_right(self.keys, end)
+
+    def select(self, strategy, coverage, pieces=None, position=None):
+        """Pick a target inside the coverage using the named strategy"""
+        if strategy == "last":
+            return self.last_in(coverage)
+        if strategy == "strongest":
+            return self.extreme_health_in(coverage, largest=True)
+        if strategy == "weakest":
+            return self.extreme_health_in(coverage, largest=False)
+        if strategy == "closest" and pieces is not None and position is not None:
+            return self.closest_in(pieces, position)
+        return self.furthest_in(coverage)
+
+    def furthest_in(self, intervals):
+        """Get the enemy furthest along the path within any of the intervals"""
+        keys = self.keys
+        enemies = self.enemies
+        for start, end in reversed(intervals):
+            index = bisect_right(keys, end) - 1
+            while index >= 0 and keys[index] >= start:
+                enemy = enemies[index]
+                # Enemies killed earlier this frame are still indexed
+                if enemy.alive and not enemy.reached_end:
+                    return enemy
+                index -= 1
+        return None
+
+    def last_in(self, intervals):
+        """Get the enemy least far along the path within any of the intervals"""
+        keys = self.keys
+        enemies = self.enemies
+        for start, end in intervals:
+            index = bisect_left(keys, start)
+            while index < len(keys) and keys[index] <= end:
+                enemy = enemies[index]
+                if enemy.alive and not enemy.reached_end:
+                    return enemy
+                index += 1
+        return None
+
+    def extreme_health_in(self, intervals, largest=True):
+        """Get the enemy with the most (or least) health within the intervals"""
+        if self._health_tree is None:
+            self._health_tree = RangeExtremeTree([enemy.health for enemy in self.enemies])
+        tree = self._health_tree
+
+        best = None
+        for start, end in intervals:
+            lo, hi = self.slice_bounds(start, end)
+            if lo >= hi:
+                continue
+            candidate = tree.query(lo, hi, largest)
+            best = candidate if best is None else tree._pick(best, candidate, largest)
+
+        if best is None:
+            return None
+        enemy = self.enemies[best]
+        if enemy.alive and not enemy.reached_end:
+            return enemy
+
+        # An enemy killed earlier this frame won (weakest); scan the live ones instead
+        live = [enemy for start, end in intervals
+                for enemy in self.enemies[slice(*self.slice_bounds(start, end))]
+                if enemy.alive and not enemy.reached_end]
+        if not live:
+            return None
+        return (max if largest else min)(live, key=lambda enemy: enemy.health)
+
+    def closest_in(self, pieces, position):
+        """Get the enemy nearest to the position within the coverage pieces"""
+        keys = self.keys
+        enemies = self.enemies
+        best = None
+        best_distance_sq = None
+
+        for start, end, nearest in pieces:
+            # Distance is convex along a segment, so only the first live enemy on
+            # each side of the nearest point in this piece can be the closest one
+            split = bisect_left(keys, nearest)
+            for index, step in ((split - 1, -1), (split, 1)):
+                while 0 <= index < len(keys) and start <= keys[index] <= end:
+                    enemy = enemies[index]
+                    # Enemies killed earlier this frame are still indexed
+                    if not enemy.alive or enemy.reached_end:
+                        index += step
+                        continue
+                    dx = enemy.position.x - position.x
+                    dy = enemy.position.y - position.y
+                    distance_sq = dx * dx + dy * dy
+                    if best_distance_sq is None or distance_sq < best_distance_sq:
+                        best = enemy
+                        best_distance_sq = distance_sq
+                    break
+
+        return best
+
+    def within_radius(self, path, center, radius):
+        """Get live enemies within radius of a point
+
+        Enemies sit on the path, so the circle maps to a few arc-length
+        intervals and each interval to one contiguous slice of the index.
+        """
+        found = []
+        for start, end in path.coverage_intervals(center, radius):
+            lo, hi = self.slice_bounds(start, end)
+            for enemy in self.enemies[lo:hi]:
+                if enemy.alive and not enemy.reached_end:
+                    found.append(enemy)
+        return found
+
+    def damage_area(self, path, center, radius, damage, source=None):
+        """Apply damage to every live enemy within radius of a point"""
+        hit = self.within_radius(path, center, radius)
+        for enemy in hit:
+            enemy.take_damage(damage, source)
+        return hit
+
+    def __len__(self):
+        return len(self.enemies)
@@ -0,0 +1,237 @@
+"""
+Opt-in gameplay telemetry recorded into a preallocated ring buffer
+"""
+
+import csv
+import glob
+import os
+import numpy as np
+from config import *
+
+# Record kinds
+FIRE = 0
+HIT = 1
+KILL = 2
+LEAK = 3
+RECORD_KINDS = ("fire", "hit", "kill", "leak")
+
+# One fixed-size row per gameplay event
+RECORD_DTYPE = np.dtype([
+    ("kind", np.uint8),
+    ("frame", np.int32),
+    ("wave", np.int16),
+    ("tower", np.int32),       # Tower uid, -1 for damage without a tower (poison ticks)
+    ("tower_type", np.int16),  # Index into tower_types, -1 if unknown
+    ("enemy", np.int32),       # Enemy uid, -1 if none
+    ("enemy_type", np.int16),  # Index into enemy_types, -1 if none
+    ("damage", np.float32),    # Damage after armor (fire: nominal tower damage)
+    ("overkill", np.float32),  # Part of the damage beyond the enemy's remaining health
+    ("x", np.float32),
+    ("y", np.float32),
+    ("progress", np.float32),  # Arc length along the path
+])
+
+class TelemetryRecorder:
+    """Event listener that stores gameplay events as fixed-size records
+
+    Each event costs one tuple store into a preallocated structured array.
+    When the ring fills it is flushed in bulk to the output file, or, with no
+    output configured, the oldest records are overwritten and counted as
+    dropped. Output format follows the file extension: ``.npz`` writes each
+    flush to its own part file (telemetry.0000.npz, telemetry.0001.npz, ...)
+    with one array per column, ``.csv`` appends rows with type names spelled
+    out. Either way a flush only costs the records it writes, and nothing
+    already written stays in memory.
+    """
+
+    def __init__(self, path=TELEMETRY_PATH, capacity=TELEMETRY_CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self.records = np.zeros(capacity, dtype=RECORD_DTYPE)
+        self.count = 0       # Records currently buffered
+        self.head = 0        # Next slot to write
+        self.dropped = 0
+        self.written = 0
+
+        self.frame = 0
+        self.wave = 0
+
+        self.tower_types = []
+        self.enemy_types = []
+        self._tower_codes = {}
+        self._enemy_codes = {}
+        self._parts = 0      # .npz part files written so far
+        self._csv_started = False
+
+    def begin_frame(self, frame, wave):
+        """Stamp subsequent records with the current frame and wave"""
+        self.frame = frame
+        self.wave = wave
+
+    def on_tower_fired(self, tower, target, frame_count):
+        self._write(FIRE, tower, target, tower.damage, 0.0)
+
+    def on_enemy_hit(self, enemy, damage, source=None):
+        dealt = damage * (1.0 - enemy.armor)
+        overkill = min(dealt, -enemy.health) if enemy.health < 0 else 0.0
+        self._write(HIT, source, enemy, dealt, overkill)
+
+    def on_enemy_killed(self, enemy):
+        self._write(KILL, None, enemy, 0.0, 0.0)
+
+    def on_enemy_leaked(self, enemy):
+        self._write(LEAK, None, enemy, enemy.health, 0.0)
+
+    def _write(self, kind, tower, enemy, damage, overkill):
+        if tower is not None:
+            tower_id = tower.uid
+            tower_type = self._code(self.tower_types, self._tower_codes, tower.tower_type)
+        else:
+            tower_id = tower_type = -1
+        if enemy is not None:
+            enemy_id = enemy.uid
+            enemy_type = self._code(self.enemy_types, self._enemy_codes, enemy.type)
+            x = enemy.position.x
+            y = enemy.position.y
+            progress = enemy.progress
+        else:
+            enemy_id = enemy_type = -1
+            x = y = progress = 0.0
+
+        self.records[self.head] = (kind, self.frame, self.wave, tower_id, tower_type,
+                                   enemy_id, enemy_type, damage, overkill, x, y, progress)
+        self.head += 1
+        if self.head == self.capacity:
+            self.head = 0
+        if self.count < self.capacity:
+            self.count += 1
+            if self.count == self.capacity and self.path:
+                self.flush()
+        else:
+            self.dropped += 1  # No output configured: the oldest record was overwritten
+
+    def _code(self, names, codes, name):
+        code = codes.get(name)
+        if code is None:
+            code = len(names)
+            names.append(name)
+            codes[name] = code
+        return code
+
+    def buffered(self):
+        """Get the buffered records in the order they were written"""
+        start = (self.head - self.count) % self.capacity
+        if start + self.count <= self.capacity:
+            return self.records[start:start + self.count].copy()
+        return np.concatenate((self.records[start:], self.records[:self.head]))
+
+    def flush(self):
+        """Write buffered records to the output file and empty the ring
+
+        Returns the number of records written.
+        """
+        if not self.path or self.count == 0:
+            return 0
+
+        chunk = self.buffered()
+        if self.path.endswith(".csv"):
+            self._append_csv(chunk)
+        else:
+            self._write_npz(chunk)
+
+        self.count = 0
+        self.head = 0
+        self.written += len(chunk)
+        return len(chunk)
+
+    def _write_npz(self, records):
+        if self._parts == 0:
+            # Parts left by an earlier session would be loaded along with this one
+            for stale in part_paths(self.path):
+                os.remove(stale)
+        base, extension = os.path.splitext(self.path)
+        columns = {name: records[name] for name in RECORD_DTYPE.names}
+        np.savez(f"{base}.{self._parts:04d}{extension}", **columns,
+                 record_kinds=np.array(RECORD_KINDS),
+                 tower_types=np.array(self.tower_types, dtype=str),
+                 enemy_types=np.array(self.enemy_types, dtype=str))
+        self._parts += 1
+
+    def _append_csv(self, records):
+        mode = "a" if self._csv_started else "w"
+        with open(self.path, mode, newline="") as handle:
+            writer = csv.writer(handle)
+            if not self._csv_started:
+                writer.writerow(RECORD_DTYPE.names)
+                self._csv_started = True
+
+            names = {
+                "kind": RECORD_KINDS,
+                "tower_type": self.tower_types,
+                "enemy_type": self.enemy_types,
+            }
+            columns = []
+            for field in RECORD_DTYPE.names:
+                values = records[field].tolist()
+                if field in names:
+                    table = names[field]
+                    values = [table[v] if v >= 0 else "" for v in values]
+                columns.append(values)
+            writer.writerows(zip(*columns))
+
+    def summary(self):
+        """Aggregate balance figures over the session so far
+
+        With .npz output the written parts are read back from disk; with .csv
+        output or no output it only covers what remains in the ring.
+        """
+        records = self.buffered()
+        if self._parts:
+            records = np.concatenate((load_telemetry(self.path), records))
+        return summarize(records, self.tower_types)
+
+def part_paths(path):
+    """The .npz part files written for an output path, in order"""
+    base, extension = os.path.splitext(path)
+    return sorted(glob.glob(f"{glob.escape(base)}.[0-9][0-9][0-9][0-9]{extension}"))
+
+def load_telemetry(path):
+    """Load every .npz part written for path back into one structured record array"""
+    chunks = []
+    for part in part_paths(path):
+        with np.load(part) as data:
+            records = np.zeros(len(data["kind"]), dtype=RECORD_DTYPE)
+            for name in RECORD_DTYPE.names:
+                records[name] = data[name]
+        chunks.append(records)
+    if not chunks:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.concatenate(chunks)
+
+def summarize(records, tower_types):
+    """Damage and overkill per tower type, plus kills and leaks per wave"""
+    kinds = records["kind"]
+    hits = records[kinds == HIT]
+    damage_by_type = {}
+    overkill_by_type = {}
+    for code, name in enumerate(tower_types):
+        mask = hits["tower_type"] == code
+        damage_by_type[name] = float(hits["damage"][mask].sum())
+        overkill_by_type[name] = float(hits["overkill"][mask].sum())
+    effects = hits["tower_type"] == -1  # Poison ticks carry no tower
+    if effects.any():
+        damage_by_type["effects"] = float(hits["damage"][effects].sum())
+        overkill_by_type["effects"] = float(hits["overkill"][effects].sum())
+
+    waves = records["wave"]
+    kills = np.bincount(waves[kinds == KILL], minlength=int(waves.max(initial=0)) + 1)
+    leaks = np.bincount(waves[kinds == LEAK], minlength=len(kills))
+    leaked = records[kinds == LEAK]
+
+    return {
+        "damage_by_tower_type": damage_by_type,
+        "overkill_by_tower_type": overkill_by_type,
+        "kills_per_wave": kills.tolist(),
+        "leaks_per_wave": leaks.tolist(),
+        "leak_positions": list(zip(leaked["x"].tolist(), leaked["y"].tolist())),
+    }
@@ -2,35 +2,77 @@
 Main Tower Defense Game class with ModernGL integration
 """
 
+import random
+import time
 import pygame
-import moderngl
 import numpy as np
 from config import *
-from entities import Enemy, Tower
+from entities import Enemy, Tower, TOWER_TYPES
 from game.game_map import GameMap
 from game.ui import UI
 from game.wave_manager import WaveManager
+from game.damage_events import DamageEventQueue
+from game.tower_scheduler import TowerScheduler
+from game.targeting import EnemyProgressIndex, TARGETING_STRATEGIES
+from game.status_effects import StatusEffectEngine
+from game.aura_graph import AuraGraph
+from game.crowd import CrowdSeparation
+from game.wave_predictor import WavePredictor
+from game.events import GameEvents
+from game.particles import ParticleSystem
+from game.lod import LODController
+from game.replay import ReplayLog
+from game.camera import Camera
+from game.background_cache import ChunkedBackground
 from utils.vector2d import Vector2D
+from utils.timing import StartupTimer
 
 class TowerDefenseGame:
     """Main game class that handles all game logic and rendering"""
     
-    def __init__(self):
+    def __init__(self, headless=False, simulation_process=SIMULATION_PROCESS, seed=None,
+                 record_replay=REPLAY_RECORD, rewind=REWIND_ENABLED, graphics=True, startup=None,
+                 scenario=None, instruments=True):
         print("Initializing Tower Defense Game...")
+        self.startup = startup if startup is not None else StartupTimer()
         
-        # Initialize pygame first
-        pygame.init()
-        pygame.font.init()  # Ensure font system is ready
+        # Every random choice derives from this seed so recorded games replay exactly
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
         
-        print("Creating game display...")
-        # Use regular pygame display mode for reliable rendering
-        try:
-            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-            pygame.display.set_caption("Tower Defense Game")
-            print("Display created successfully")
-        except Exception as e:
-            print(f"Error creating display: {e}")
-            raise
+        # Without graphics (training environments) nothing render-related is created at all:
+        # no pygame modules, surfaces, fonts, UI or particles
+        self.graphics = graphics
+        headless = headless or not graphics
+        
+        # Initialize only the pygame modules the game uses (the mixer would open an audio device),
+        # skipping any the launcher already brought up
+        self.headless = headless
+        if not headless and not pygame.display.get_init():
+            pygame.display.init()
+        if graphics and not pygame.font.get_init():
+            pygame.font.init()
+        self.startup.mark("pygame init")
+        
+        # Headless games render to an offscreen surface and never open a window
+        if not graphics:
+            self.screen = None
+        elif headless:
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            print("Creating game display...")
+            # Use regular pygame display mode for reliable rendering
+            try:
+                self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+                pygame.display.set_caption("Tower Defense Game")
+                print("Display created successfully")
+            except Exception as e:
+                print(f"Error creating display: {e}")
+                raise
+        
+        # Put the loading screen up before building anything else
+        if graphics:
+            self.show_loading_screen()
+        self.startup.mark("display")
         
         print("Setting up game components...")
         
@@ -41,17 +83,22 @@ class TowerDefenseGame:
         
         try:
             # Game objects
-            self.game_map = GameMap()
+            # A generated scenario (game.scenarios) replaces the default map, waves and layout
+            self.scenario = scenario
+            self.game_map = GameMap() if scenario is None else scenario.build_map()
             print("Game map created")
             
-            self.ui = UI()
+            self.ui = UI() if graphics else None
             print("UI created")
             
-            self.wave_manager = WaveManager(self.game_map.get_path_points())
+            self.wave_manager = WaveManager(self.game_map.get_path_points(), seed=self.seed)
+            if scenario is not None:
+                self.wave_manager.wave_configs = scenario.wave_configs
             print("Wave manager created")
         except Exception as e:
             print(f"Error creating game components: {e}")
             raise
+        self.startup.mark("map, UI and fonts")
         
         # Game state
         self.money = STARTING_MONEY
@@ -63,51 +110,195 @@ class TowerDefenseGame:
         self.enemies = []
         self.towers = []
         
+        # Pending analytic hits (None falls back to stepped projectiles)
+        self.damage_events = DamageEventQueue() if ANALYTIC_PROJECTILES else None
+        
+        # Only towers whose cooldown has expired look for targets
+        self.tower_scheduler = TowerScheduler()
+        self.enemy_index = EnemyProgressIndex()
+        self.status_effects = StatusEffectEngine()
+        self.aura_graph = AuraGraph(self.game_map)
+        self.crowd = CrowdSeparation() if CROWD_SEPARATION_ENABLED else None
+        self.wave_predictor = WavePredictor(self.game_map.path_geometry, self.wave_manager)
+        
+        # Gameplay events and the effects that listen to them
+        self.events = GameEvents()
+        self.particles = None
+        if graphics:
+            self.particles = ParticleSystem(seed=self.seed)
+            self.events.add_listener(self.particles)
+        
+        # Opt-in instruments below only belong to the player's own session; simulation
+        # workers, replays, environments and spectator windows pass instruments=False
+        
+        # Balance telemetry records every fire, hit, kill and leak when enabled
+        self.telemetry = None
+        if TELEMETRY_ENABLED and instruments:
+            from game.telemetry import TelemetryRecorder
+            self.telemetry = TelemetryRecorder()
+            self.events.add_listener(self.telemetry)
+        
+        # Live object counts and allocation tracing, censused at every wave end
+        self.memory = None
+        if MEMORY_PROFILE_ENABLED and instruments:
+            from game.memory_stats import MemoryMonitor
+            self.memory = MemoryMonitor()
+        
+        # Click-to-flip timing, and whether input is polled late in the frame
+        self.latency = None
+        if LATENCY_PROFILE_ENABLED and instruments:
+            from game.latency import InputLatencyMonitor
+            self.latency = InputLatencyMonitor()
+        self.low_latency = LOW_LATENCY_INPUT
+        
+        # Rendering detail adapts to measured frame time
+        self.lod = LODController()
+        
+        # Viewport over the map; the static background is cached in chunks
+        self.camera = Camera(self.game_map.width, self.game_map.height)
+        self.background = ChunkedBackground(self.game_map)
+        self._zoom_surface = None
+        
         # Input state
         self.selected_tower_type = "basic"
+        self.selected_tower = None  # Placed tower chosen for inspection
         self.mouse_pos = (0, 0)
+        self.drag_start = None  # World position where a build drag began
+        self.drag_rect = False  # Shift held: drags fill a rectangle instead of a line
+        self._drag_plan = None  # (key, plan) of the previewed batch
         
         # Game state flags
         self.game_over = False
         self.victory = False
         
-        print("Tower Defense Game initialized successfully!")
+        # Scenario towers are prebuilt for free, before recording starts
+        if scenario is not None and scenario.towers:
+            prebuilt = [self._build_tower(grid_x, grid_y, tower_type)
+                        for grid_x, grid_y, tower_type in scenario.towers
+                        if self.game_map.grid[grid_y][grid_x] == 0]
+            self.refresh_buffed_towers(self.aura_graph.add_towers(prebuilt))
+        
+        # Optionally step the simulation in a worker process; this object then only renders.
+        # The worker builds the default map, so scenario games always simulate in-process.
+        self.simulation = None
+        if simulation_process and scenario is None:
+            from game.shared_state import SimulationClient
+            self.simulation = SimulationClient()
         
-        # Test render to make sure display works
+        # Live state frames for spectators, broadcast from the simulating process
+        self.spectator = None
+        if SPECTATOR_ENABLED and instruments and self.simulation is None:
+            from game.spectator import SpectatorServer
+            self.spectator = SpectatorServer()
+            self.spectator.start()
+            self.events.add_listener(self.spectator.encoder)
+            print(f"Spectators can connect to {self.spectator.host}:{self.spectator.port}")
+        
+        # Player commands stamped with the frame they took effect on
+        self.replay = None
+        if record_replay and self.simulation is None:
+            self.replay = ReplayLog(self.seed, scenario=None if scenario is None
+                                    else scenario.to_dict())
+        
+        # Keyframes and per-tick deltas of the last few seconds, for rewinding
+        self.history = None
+        if rewind and self.simulation is None:
+            from game.rewind import RewindBuffer
+            self.history = RewindBuffer()
+            self.history.record_tick(self)
+        self.startup.mark("game systems")
+        
+        # Render the opening view's background chunks while the loading screen is still up
+        if not headless:
+            self.background.prepare(self.camera.view_rect())
+            self.startup.mark("background")
+        
+        print("Tower Defense Game initialized successfully!")
+    
+    def show_loading_screen(self):
+        """Draw the loading screen shown while the game is being built"""
         self.screen.fill((50, 100, 50))  # Dark green
         font = pygame.font.Font(None, 36)
         text = font.render("Loading Tower Defense...", True, (255, 255, 255))
         self.screen.blit(text, (SCREEN_WIDTH//2 - 150, SCREEN_HEIGHT//2))
-        pygame.display.flip()
-        
-        print("Initial display test successful")
+        if not self.headless:
+            pygame.display.flip()
     
-    def handle_events(self):
-        """Handle pygame events"""
-        for event in pygame.event.get():
+    def handle_events(self, first_event=None):
+        """Handle pygame events
+        
+        first_event is an event already taken off the queue; it is handled
+        before the ones still queued behind it.
+        """
+        latency = self.latency
+        if latency is not None:
+            latency.begin_poll(time.perf_counter())
+        
+        events = pygame.event.get()
+        if first_event is not None:
+            events.insert(0, first_event)
+        for event in events:
+            if latency is not None and event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+                # A worker's state only shows the click two frames later
+                latency.record_input(event, 0 if self.simulation is None else 2)
+            
             if event.type == pygame.QUIT:
                 self.running = False
             
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left click
                     self.handle_mouse_click(event.pos)
+                elif event.button == 3:  # Right click
+                    self.selected_tower = None
+                    self.drag_start = None
+            
+            elif event.type == pygame.MOUSEBUTTONUP:
+                if event.button == 1:
+                    self.handle_mouse_release(event.pos)
             
             elif event.type == pygame.MOUSEMOTION:
                 self.mouse_pos = event.pos
             
+            elif event.type == pygame.MOUSEWHEEL:
+                if self.is_on_map(self.mouse_pos):
+                    self.camera.zoom_at(1.1 ** event.y, self.mouse_pos)
+            
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
                     self.toggle_pause()
+                elif event.key == pygame.K_r:
+                    long_step = event.mod & pygame.KMOD_SHIFT
+                    self.rewind(REWIND_LONG_STEP_SECONDS if long_step else REWIND_STEP_SECONDS)
                 elif event.key == pygame.K_n:
-                    if not self.wave_manager.is_wave_active():
-                        self.wave_manager.start_next_wave()
+                    self.start_next_wave()
+                elif event.key == pygame.K_u:
+                    self.upgrade_selected_tower()
+                elif event.key in (pygame.K_s, pygame.K_DELETE):
+                    self.sell_selected_tower()
                 elif event.key == pygame.K_ESCAPE:
                     self.running = False
+                elif event.key == pygame.K_F3 and self.memory is not None:
+                    self.memory.visible = not self.memory.visible
+                elif event.key == pygame.K_F9 and self.memory is not None:
+                    self.memory.take_snapshot(self)
+        
+        self.drag_rect = bool(pygame.key.get_mods() & pygame.KMOD_SHIFT)
+        
+        # Arrow keys pan the camera while held
+        keys = pygame.key.get_pressed()
+        dx = (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT]) * CAMERA_PAN_SPEED
+        dy = (keys[pygame.K_DOWN] - keys[pygame.K_UP]) * CAMERA_PAN_SPEED
+        if dx or dy:
+            self.camera.pan(dx, dy)
+    
+    def is_on_map(self, pos):
+        """Check whether a screen position is inside the map viewport"""
+        return pos[0] < SCREEN_WIDTH - UI_PANEL_WIDTH
     
     def handle_mouse_click(self, pos):
         """Handle mouse click events"""
         # Check UI clicks first
-        ui_action = self.ui.handle_click(pos)
+        ui_action = self.ui.handle_click(pos, self.selected_tower is not None)
         
         if ui_action:
             if ui_action.startswith("select_tower/?"):
@@ -116,39 +307,276 @@ class TowerDefenseGame:
                 self.ui.selected_tower_type = tower_type
             
             elif ui_action == "start_wave":
-                if not self.wave_manager.is_wave_active():
-                    self.wave_manager.start_next_wave()
+                self.start_next_wave()
             
             elif ui_action == "pause_game":
                 self.toggle_pause()
+            
+            elif ui_action == "cycle_targeting":
+                self.cycle_targeting()
+            
+            elif ui_action == "upgrade_tower":
+                self.upgrade_selected_tower()
+            
+            elif ui_action == "sell_tower":
+                self.sell_selected_tower()
+        
+        # Check map clicks for tower selection or placement
+        elif self.is_on_map(pos):  # Click is on game area
+            world_x, world_y = self.camera.screen_to_world(*pos)
+            tower = self.game_map.get_tower_at(world_x, world_y)
+            if tower is not None:
+                self.selected_tower = tower
+            else:
+                # Build on release; dragging first previews a line or rectangle of towers
+                self.selected_tower = None
+                self.drag_start = (world_x, world_y)
+    
+    def handle_mouse_release(self, pos):
+        """Finish a build drag: one tower for a click, a batch for a drag"""
+        if self.drag_start is None:
+            return
+        
+        start = self.drag_start
+        self.drag_start = None
+        end = self.camera.screen_to_world(*pos)
+        if (start[0] // TILE_SIZE, start[1] // TILE_SIZE) == (end[0] // TILE_SIZE,
+                                                               end[1] // TILE_SIZE):
+            self.try_place_tower(*start)
+        else:
+            self.issue_command(("place_batch", start[0], start[1], end[0], end[1],
+                                self.drag_shape(), self.selected_tower_type))
+    
+    def drag_shape(self):
+        """Shape of a build drag: a filled rectangle while Shift is held, else a line"""
+        return "rect" if self.drag_rect else "line"
+    
+    def cycle_targeting(self):
+        """Switch the selected tower to the next targeting strategy"""
+        if self.selected_tower is None:
+            return
         
-        # Check map clicks for tower placement
-        elif pos[0] < SCREEN_WIDTH - UI_PANEL_WIDTH:  # Click is on game area
-            self.try_place_tower(pos[0], pos[1])
+        current = TARGETING_STRATEGIES.index(self.selected_tower.targeting)
+        next_index = (current + 1) % len(TARGETING_STRATEGIES)
+        position = self.selected_tower.position
+        self.issue_command(("targeting", int(position.x), int(position.y),
+                            TARGETING_STRATEGIES[next_index]))
+    
+    def upgrade_selected_tower(self):
+        """Upgrade the selected tower"""
+        if self.selected_tower is None:
+            return
+        
+        position = self.selected_tower.position
+        self.issue_command(("upgrade", int(position.x), int(position.y)))
+    
+    def sell_selected_tower(self):
+        """Sell the selected tower"""
+        if self.selected_tower is None:
+            return
+        
+        position = self.selected_tower.position
+        self.issue_command(("sell", int(position.x), int(position.y)))
+        self.selected_tower = None
+    
+    def start_next_wave(self):
+        """Start the next wave unless one is already running"""
+        self.issue_command(("start_wave",))
     
     def try_place_tower(self, x, y):
         """Try to place a tower at the given position"""
-        if self.game_over or self.paused:
+        self.issue_command(("place", x, y, self.selected_tower_type))
+    
+    def toggle_pause(self):
+        """Toggle game pause state"""
+        self.issue_command(("pause",))
+    
+    def rewind(self, seconds):
+        """Pause and step the simulation back by the given number of seconds"""
+        if self.history is None or self.history.oldest_frame() is None:
             return
+        if not self.paused:
+            self.issue_command(("pause",))
         
-        # Snap to grid
-        grid_x = (x // TILE_SIZE) * TILE_SIZE + TILE_SIZE // 2
-        grid_y = (y // TILE_SIZE) * TILE_SIZE + TILE_SIZE // 2
+        # Re-run ticks must not reach the replay log or telemetry a second time
+        replay, self.replay = self.replay, None
+        if self.telemetry is not None:
+            self.events.remove_listener(self.telemetry)
+        try:
+            frame = self.history.rewind(self, self.frame_count - int(seconds * FPS))
+        finally:
+            self.replay = replay
+            if self.telemetry is not None:
+                self.events.add_listener(self.telemetry)
+                self.telemetry.begin_frame(self.frame_count, self.wave_manager.get_current_wave())
+        
+        # The recording continues from the restored frame, still paused
+        if self.replay is not None:
+            self.replay.commands = [(when, command) for when, command in self.replay.commands
+                                    if when < frame]
+            self.replay.end_frame = frame
+            self.replay.record(frame, ("pause",))
+        self.history.record_command(frame, ("pause",))
+        
+        if self.selected_tower is not None:
+            position = self.selected_tower.position
+            self.selected_tower = self.game_map.get_tower_at(int(position.x), int(position.y))
+        print(f"Rewound to frame {frame}")
+    
+    def issue_command(self, command):
+        """Send a player action to whichever process owns the simulation"""
+        if self.simulation is not None:
+            self.simulation.send(command)
+        else:
+            self.apply_command(command)
+    
+    def apply_command(self, command):
+        """Carry out a player action given as a plain tuple
+        
+        Every action that changes the simulation goes through here, so a log of
+        these tuples and the frames they arrived on reproduces a game exactly.
+        """
+        if self.replay is not None:
+            self.replay.record(self.frame_count, command)
+        if self.history is not None:
+            self.history.record_command(self.frame_count, command)
+        
+        action = command[0]
+        if action == "place":
+            _, x, y, tower_type = command
+            self.place_tower(x, y, tower_type)
+        elif action == "place_batch":
+            _, start_x, start_y, end_x, end_y, shape, tower_type = command
+            self.place_tower_batch((start_x, start_y), (end_x, end_y), shape, tower_type)
+        elif action == "start_wave":
+            if not self.wave_manager.is_wave_active():
+                self.wave_manager.start_next_wave()
+        elif action == "pause":
+            self.paused = not self.paused
+        elif action == "targeting":
+            _, x, y, strategy = command
+            tower = self.game_map.get_tower_at(x, y)
+            if tower is not None:
+                tower.targeting = strategy
+                self.events.tower_changed(tower)
+        elif action == "upgrade":
+            _, x, y = command
+            tower = self.game_map.get_tower_at(x, y)
+            if tower is not None:
+                self.upgrade_tower(tower)
+        elif action == "sell":
+            _, x, y = command
+            tower = self.game_map.get_tower_at(x, y)
+            if tower is not None:
+                self.sell_tower(tower)
+    
+    def place_tower(self, x, y, tower_type):
+        """Build a tower of the given type at a world position if valid and affordable"""
+        if self.game_over or self.paused:
+            return
         
         # Check if placement is valid
         if self.game_map.can_place_tower(x, y):
-            tower_cost = self.ui.tower_info[self.selected_tower_type]["cost"]
+            tower_cost = TOWER_TYPES[tower_type]["cost"]
             
             if self.money >= tower_cost:
-                # Place tower
-                new_tower = Tower(grid_x, grid_y, self.selected_tower_type)
-                self.towers.append(new_tower)
-                self.game_map.place_tower(x, y)
+                new_tower = self._build_tower(x // TILE_SIZE, y // TILE_SIZE, tower_type)
                 self.money -= tower_cost
+                self.refresh_buffed_towers(self.aura_graph.add_tower(new_tower))
+    
+    def plan_tower_batch(self, start, end, shape, tower_type):
+        """Work out which tiles of a drag between two world positions would get a tower
+        
+        The tiles are checked against the map and the budget in one pass:
+        free tiles are paid for in drag order until the money runs out.
+        Returns (grid_xs, grid_ys, free, build) arrays, where build marks the
+        free tiles that are also affordable.
+        """
+        grid_xs, grid_ys = self.game_map.tiles_in_drag(start, end, shape)
+        free = self.game_map.placement_mask(grid_xs, grid_ys)
+        spent = np.cumsum(free) * TOWER_TYPES[tower_type]["cost"]
+        build = free & (spent <= self.money)
+        return grid_xs, grid_ys, free, build
+    
+    def place_tower_batch(self, start, end, shape, tower_type):
+        """Build towers on every free, affordable tile of a drag in one step
+        
+        The whole batch is validated before anything changes, and the aura
+        graph, scheduler and wave predictor see all the new towers at once
+        instead of once per tower.
+        """
+        if self.game_over or self.paused:
+            return
+        
+        grid_xs, grid_ys, _, build = self.plan_tower_batch(start, end, shape, tower_type)
+        new_towers = [self._build_tower(grid_x, grid_y, tower_type)
+                      for grid_x, grid_y in zip(grid_xs[build].tolist(), grid_ys[build].tolist())]
+        if new_towers:
+            self.money -= TOWER_TYPES[tower_type]["cost"] * len(new_towers)
+            self.refresh_buffed_towers(self.aura_graph.add_towers(new_towers))
+    
+    def _build_tower(self, grid_x, grid_y, tower_type):
+        """Create a tower on a free tile and register it with the map and scheduler"""
+        new_tower = Tower(grid_x * TILE_SIZE + TILE_SIZE // 2,
+                          grid_y * TILE_SIZE + TILE_SIZE // 2, tower_type)
+        new_tower.compute_coverage(self.game_map.path_geometry)
+        new_tower.events = self.events
+        new_tower.projectile_visuals = self.graphics
+        self.towers.append(new_tower)
+        self.game_map.place_tower(grid_x * TILE_SIZE, grid_y * TILE_SIZE, new_tower)
+        
+        # Support towers never attack, so they stay out of the scheduler
+        if new_tower.aura is None:
+            self.tower_scheduler.add(new_tower, self.frame_count)
+        self.events.tower_changed(new_tower)
+        return new_tower
+    
+    def upgrade_tower(self, tower):
+        """Upgrade a placed tower if affordable
+        
+        Only this tower and the towers its aura reaches are touched: the aura
+        graph rewrites their effective stats, coverage is recomputed for any
+        whose range changed, and their cooldowns are re-parked.
+        """
+        if self.game_over or self.paused:
+            return
+        
+        upgrade_cost = tower.get_upgrade_cost()
+        if self.money < upgrade_cost:
+            return
+        
+        self.money -= upgrade_cost
+        tower.upgrade()
+        self.events.tower_changed(tower)
+        self.refresh_buffed_towers(self.aura_graph.upgrade_tower(tower))
+        self.wave_predictor.invalidate()
+    
+    def sell_tower(self, tower):
+        """Remove a placed tower and refund part of what was spent on it"""
+        if self.game_over or self.paused:
+            return
+        
+        self.money += int(tower.cost * SELL_REFUND)
+        self.towers.remove(tower)
+        self.game_map.remove_tower(int(tower.position.x), int(tower.position.y))
+        self.tower_scheduler.remove(tower)
+        self.refresh_buffed_towers(self.aura_graph.remove_tower(tower))
+        self.wave_predictor.invalidate()
+        self.events.tower_removed(tower)
+        
+        # Drop references so the sold tower and its last target can be collected
+        tower.target = None
+        tower.projectiles = []
+        if self.selected_tower is tower:
+            self.selected_tower = None
+    
+    def refresh_buffed_towers(self, towers):
+        """Re-park towers whose fire rate changed because of a support aura"""
+        for tower in towers:
+            if tower.aura is None:
+                self.tower_scheduler.reschedule(tower)
+            self.events.tower_changed(tower)
     
-    def toggle_pause(self):
-        """Toggle game pause state"""
-        self.paused = not self.paused
     
     def update_game_logic(self):
         """Update all game logic"""
@@ -156,11 +584,18 @@ class TowerDefenseGame:
             return
         
         self.frame_count += 1
+        if self.telemetry is not None:
+            self.telemetry.begin_frame(self.frame_count, self.wave_manager.get_current_wave())
         
         # Update wave manager and spawn enemies
         new_enemies = self.wave_manager.update(self.enemies, self.frame_count)
+        for enemy in new_enemies:
+            enemy.events = self.events
         self.enemies.extend(new_enemies)
         
+        # Expire status effects and tick poison before movement
+        self.status_effects.update(self.frame_count)
+        
         # Update enemies
         for enemy in self.enemies[:]:
             enemy.update()
@@ -169,6 +604,8 @@ class TowerDefenseGame:
             if enemy.reached_end:
                 self.lives -= 1
                 self.enemies.remove(enemy)
+                self.status_effects.release(enemy)
+                self.events.enemy_leaked(enemy)
                 if self.lives <= 0:
                     self.game_over = True
             
@@ -177,15 +614,50 @@ class TowerDefenseGame:
                 self.money += enemy.reward
                 self.score += enemy.reward
                 self.enemies.remove(enemy)
+                self.status_effects.release(enemy)
+                self.events.enemy_killed(enemy)
+        
+        # Spread out enemies that bunch up
+        if self.crowd is not None:
+            self.crowd.update(self.enemies)
         
         # Update towers
+        self.enemy_index.rebuild(self.enemies)
+        self.tower_scheduler.update(self.enemies, self.frame_count, self.damage_events,
+                                    self.enemy_index)
         for tower in self.towers:
-            tower.update(self.enemies, self.frame_count)
+            if tower.projectiles:
+                tower.update_projectiles(self.enemies, self.frame_count, self.damage_events,
+                                         self.enemy_index, self.status_effects)
+        
+        # Land scheduled hits
+        if self.damage_events is not None:
+            self.damage_events.process(self.frame_count, self.enemy_index,
+                                       self.status_effects)
+        
+        # Advance visual effects with the simulation
+        if self.particles is not None:
+            self.particles.update()
         
         # Check victory condition (completed many waves)
         if self.wave_manager.get_current_wave() >= 10 and not self.wave_manager.is_wave_active():
             if len([e for e in self.enemies if e.alive and not e.reached_end]) == 0:
                 self.victory = True
+        
+        if self.history is not None:
+            self.history.record_tick(self)
+    
+    def wave_warning(self):
+        """Warning text if the next wave looks too strong for the towers, else None"""
+        if self.wave_manager.is_wave_active() or self.game_over or self.victory:
+            return None
+        self.wave_predictor.refresh(self.towers)
+        prediction = self.wave_predictor.predict(self.wave_manager.get_current_wave() + 1)
+        if not prediction["dangerous"]:
+            return None
+        if prediction["predicted_leaks"]:
+            return f"Danger: ~{prediction['predicted_leaks']} may leak"
+        return "Danger: next wave is close"
     
     def render(self):
         """Main render function"""
@@ -193,16 +665,19 @@ class TowerDefenseGame:
             # Clear screen
             self.screen.fill(BLACK)
             
-            # Draw game map
-            self.game_map.draw(self.screen)
-            
-            # Draw towers
-            for tower in self.towers:
-                tower.draw(self.screen)
-            
-            # Draw enemies
-            for enemy in self.enemies:
-                enemy.draw(self.screen)
+            # Draw the visible part of the map, scaled afterwards when zoomed
+            view = self.camera.view_rect()
+            viewport = self.screen.subsurface((0, 0, self.camera.viewport_width,
+                                               self.camera.viewport_height))
+            if self.camera.zoom == 1.0:
+                surface = viewport
+            else:
+                if self._zoom_surface is None or self._zoom_surface.get_size() != view.size:
+                    self._zoom_surface = pygame.Surface(view.size)
+                surface = self._zoom_surface
+            self.render_world(surface, view)
+            if surface is not viewport:
+                pygame.transform.scale(surface, viewport.get_size(), viewport)
             
             # Draw UI
             game_state = {
@@ -212,60 +687,201 @@ class TowerDefenseGame:
                 'wave_active': self.wave_manager.is_wave_active(),
                 'paused': self.paused,
                 'game_over': self.game_over,
-                'victory': self.victory
+                'victory': self.victory,
+                'selected_tower': self.selected_tower,
+                'upgrade_cost': (None if self.selected_tower is None
+                                 else self.selected_tower.get_upgrade_cost()),
+                'sell_value': (None if self.selected_tower is None
+                               else int(self.selected_tower.cost * SELL_REFUND)),
+                'rewind_seconds': (None if self.history is None
+                                   else (self.frame_count - self.history.oldest_frame()) / FPS),
+                'wave_warning': self.wave_warning()
             }
             self.ui.draw(self.screen, game_state)
             
-            # Draw tower preview
-            if not self.game_over and self.mouse_pos[0] < SCREEN_WIDTH - UI_PANEL_WIDTH:
-                grid_x = (self.mouse_pos[0] // TILE_SIZE) * TILE_SIZE + TILE_SIZE // 2
-                grid_y = (self.mouse_pos[1] // TILE_SIZE) * TILE_SIZE + TILE_SIZE // 2
-                
-                if self.game_map.can_place_tower(self.mouse_pos[0], self.mouse_pos[1]):
-                    tower_cost = self.ui.tower_info[self.selected_tower_type]["cost"]
-                    color = GREEN if self.money >= tower_cost else RED
-                    pygame.draw.circle(self.screen, color, (grid_x, grid_y), 15, 2)
+            if self.memory is not None and self.memory.visible:
+                self.memory.draw(self.screen, self)
             
             # Update display
-            pygame.display.flip()
+            if not self.headless:
+                pygame.display.flip()
             
         except Exception as e:
             print(f"Render error: {e}")
             # Fill screen with a color to show something is working
             self.screen.fill((100, 0, 0))  # Dark red to indicate error
-            pygame.display.flip()
+            if not self.headless:
+                pygame.display.flip()
+    
+    def render_world(self, surface, view):
+        """Draw map, towers, enemies and effects inside the world rect view"""
+        offset = (view.x, view.y)
+        self.background.draw(surface, view)
+        
+        detail = self.lod.settings
+        
+        # Towers under the cursor or selected keep their range circle at any detail level
+        hovered_tower = None
+        mouse_world = None
+        if self.is_on_map(self.mouse_pos):
+            mouse_world = self.camera.screen_to_world(*self.mouse_pos)
+            hovered_tower = self.game_map.get_tower_at(*mouse_world)
+        
+        # Draw towers, skipping those whose sprite and range circle are off screen
+        for tower in self.towers:
+            show_range = (detail["all_ranges"] or tower is hovered_tower
+                          or tower is self.selected_tower)
+            reach = tower.range if show_range else tower.radius
+            if not view.inflate(reach * 2, reach * 2).collidepoint(tower.position.x,
+                                                                    tower.position.y):
+                if not tower.projectiles:
+                    continue
+            tower.draw(surface, show_range, detail["target_lines"], offset)
+        
+        # Highlight the selected tower
+        if self.selected_tower is not None:
+            pygame.draw.circle(surface, YELLOW,
+                               self.selected_tower.position.to_screen(offset),
+                               self.selected_tower.radius + 4, 3)
+        
+        # Draw enemies inside the view
+        margin = 30  # Largest enemy radius plus its health bar
+        visible = view.inflate(margin * 2, margin * 2)
+        for enemy in self.enemies:
+            if visible.collidepoint(enemy.position.x, enemy.position.y):
+                enemy.draw(surface, detail["simple_health_bars"], offset)
+        
+        # Draw particles in one batched pixel write
+        self.particles.draw(surface, offset)
+        
+        # Draw tower preview: the whole batch while dragging, else the tile under the cursor
+        if not self.game_over and mouse_world is not None:
+            if self.drag_start is not None:
+                self.draw_drag_preview(surface, mouse_world, offset)
+            else:
+                grid_x = (mouse_world[0] // TILE_SIZE) * TILE_SIZE + TILE_SIZE // 2
+                grid_y = (mouse_world[1] // TILE_SIZE) * TILE_SIZE + TILE_SIZE // 2
+                
+                if self.game_map.can_place_tower(*mouse_world):
+                    tower_cost = self.ui.tower_info[self.selected_tower_type]["cost"]
+                    color = GREEN if self.money >= tower_cost else RED
+                    pygame.draw.circle(surface, color, (grid_x - view.x, grid_y - view.y), 15, 2)
+    
+    def draw_drag_preview(self, surface, mouse_world, offset):
+        """Outline the tiles a build drag would fill: green if built, red if unaffordable"""
+        start = self.drag_start
+        shape = self.drag_shape()
+        
+        # Re-plan only when the covered tiles, budget or layout changed
+        key = (start[0] // TILE_SIZE, start[1] // TILE_SIZE, mouse_world[0] // TILE_SIZE,
+               mouse_world[1] // TILE_SIZE, shape, self.selected_tower_type, self.money,
+               len(self.towers))
+        if self._drag_plan is None or self._drag_plan[0] != key:
+            self._drag_plan = (key, self.plan_tower_batch(start, mouse_world, shape,
+                                                          self.selected_tower_type))
+        grid_xs, grid_ys, free, build = self._drag_plan[1]
+        
+        half = TILE_SIZE // 2
+        for grid_x, grid_y, ok in zip(grid_xs[free].tolist(), grid_ys[free].tolist(),
+                                      build[free].tolist()):
+            center = (grid_x * TILE_SIZE + half - offset[0], grid_y * TILE_SIZE + half - offset[1])
+            pygame.draw.circle(surface, DARK_GREEN if ok else RED, center, 15, 2)
+        
+        count = int(build.sum())
+        if count:
+            cost = count * TOWER_TYPES[self.selected_tower_type]["cost"]
+            label = self.ui.font_small.render(f"{count} towers, ${cost}", True, BLACK)
+            surface.blit(label, (mouse_world[0] - offset[0] + 18, mouse_world[1] - offset[1] + 18))
+    
+    def wait_for_next_frame(self, next_frame):
+        """Wait out the rest of the frame, drawing at once if a click or key arrives
+        
+        Used instead of clock.tick in low-latency mode. Otherwise input that
+        arrives during the wait sits in the queue until the next frame polls
+        it, half a frame on average. The extra draw does not step the
+        simulation, so the tick rate is unchanged. Returns when the next
+        frame is due.
+        """
+        next_frame = max(next_frame + 1.0 / FPS, time.perf_counter())
+        while self.running:
+            remaining = next_frame - time.perf_counter()
+            if remaining <= 0:
+                break
+            event = pygame.event.wait(max(1, int(remaining * 1000)))
+            if event.type == pygame.NOEVENT:
+                continue
+            
+            # Handled ahead of anything queued behind it, so a press stays before its release
+            self.handle_events(event)
+            if event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.KEYDOWN):
+                self.render()
+                if self.latency is not None:
+                    self.latency.frame_shown(time.perf_counter())
+        return next_frame
     
     def run(self):
         """Main game loop"""
         print("Starting Tower Defense Game...")
         print("Controls:")
         print("- Click on towers in UI to select")
-        print("- Click on map to place towers")
+        print("- Click on map to place towers, drag for a line (Shift+drag: rectangle)")
+        print("- Arrow keys: Scroll map, mouse wheel: Zoom")
         print("- Click 'Start Wave' to begin next wave")
         print("- SPACE: Pause/Resume")
+        if self.history is not None:
+            print(f"- R: Rewind {REWIND_STEP_SECONDS}s, Shift+R: Rewind {REWIND_LONG_STEP_SECONDS}s")
         print("- N: Start next wave")
+        print("- U: Upgrade selected tower, S/Delete: Sell selected tower")
+        if self.memory is not None:
+            print("- F3: Memory overlay, F9: Memory snapshot")
         print("- ESC: Quit")
         
-        # Show initial screen briefly
-        import time
-        time.sleep(1)  # Show loading screen for 1 second
-        
         frame_count = 0
+        next_frame = time.perf_counter()
         while self.running:
             frame_count += 1
             
-            # Handle events
-            self.handle_events()
+            # Handle events (late in the frame in low-latency mode, see below)
+            if not self.low_latency:
+                self.handle_events()
+            
+            work_start = time.perf_counter()
             
-            # Update game (only if not paused)
-            if not self.paused:
+            # Update game (only if not paused), or pick up the worker's latest frame
+            if self.simulation is not None:
+                if self.simulation.sync(self) and self.latency is not None:
+                    self.latency.state_synced()
+            elif not self.paused:
                 self.update_game_logic()
+            if self.memory is not None:
+                self.memory.update(self)
+            if self.spectator is not None:
+                self.spectator.broadcast(self)
+            
+            # Polling right before rendering keeps the update out of the time between a
+            # click being read and being drawn; commands are stamped with the frame they
+            # land on either way, so replays are unaffected
+            if self.low_latency:
+                self.handle_events()
             
             # Always render
             self.render()
+            if self.latency is not None:
+                self.latency.frame_shown(time.perf_counter())
+            if frame_count == 1:
+                self.startup.mark("first frame")
+                print(self.startup.report())
+            
+            # Adapt detail to the work done this frame (excluding the frame cap sleep)
+            if self.lod.update((time.perf_counter() - work_start) * 1000.0):
+                self.lod.apply(self.particles)
+                print(f"Detail level changed to {self.lod.level} (avg frame {self.lod.average_ms:.1f} ms)")
             
             # Maintain framerate
-            self.clock.tick(FPS)
+            if self.low_latency:
+                next_frame = self.wait_for_next_frame(next_frame)
+            else:
+                self.clock.tick(FPS)
             
             # Debug output every 5 seconds
             if frame_count % (FPS * 5) == 0:
@@ -278,15 +894,28 @@ class TowerDefenseGame:
             elif self.victory:
                 print(f"Victory! Final Score: {self.score}")
         
+        if self.telemetry is not None:
+            self.telemetry.flush()
+            print(f"Telemetry: {self.telemetry.written} records written to {self.telemetry.path}")
+        
+        if self.memory is not None:
+            self.memory.write_report(self)
+            print(f"Memory report written to {self.memory.path}")
+        
+        if self.simulation is not None:
+            self.simulation.close()
+        
+        if self.latency is not None:
+            print(self.latency.report())
+        
+        if self.spectator is not None:
+            self.spectator.close()
+            print(f"Spectators: {self.spectator.frames_sent} frames sent, "
+                  f"{self.spectator.frames_dropped} dropped")
+        
+        if self.replay is not None:
+            self.replay.end_frame = self.frame_count
+            self.replay.save(REPLAY_PATH)
+            print(f"Replay saved to {REPLAY_PATH}")
+        
         print("Game ended.")
-
-# For moderngl import error handling
-try:
-    import moderngl
-except ImportError:
-    print("Warning: ModernGL not available. Using pygame-only rendering.")
-    # Create a dummy moderngl context
-    class DummyModernGL:
-        def create_context(self):
-            return None
-    moderngl = DummyModernGL()
\ No newline at end of file
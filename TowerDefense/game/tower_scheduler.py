@@ -0,0 +1,74 @@
+"""
+Cooldown scheduler that keeps idle towers out of the targeting loop
+"""
+
+class TowerScheduler:
+    """Timing wheel that parks towers until their next attack is ready
+
+    Towers on cooldown sit in the wheel slot of the frame they become ready and
+    cost nothing until then. Ready towers query for a target every frame until
+    they fire, at which point they are parked again.
+    """
+
+    def __init__(self, slots=128):
+        self.slots = slots
+        self.wheel = [[] for _ in range(slots)]
+        self.ready = []
+        self.parked = {}  # tower -> frame it is parked for (stale wheel entries are skipped)
+        self.current_tick = 0
+
+    def add(self, tower, frame_count):
+        """Start scheduling a tower"""
+        self._park(tower, tower.last_attack + tower.attack_rate)
+
+    def remove(self, tower):
+        """Stop scheduling a tower"""
+        self.parked.pop(tower, None)
+        if tower in self.ready:
+            self.ready.remove(tower)
+
+    def reschedule(self, tower):
+        """Re-park a tower whose attack rate changed"""
+        self.remove(tower)
+        self._park(tower, tower.last_attack + tower.attack_rate)
+
+    def _park(self, tower, ready_tick):
+        if ready_tick <= self.current_tick:
+            self.ready.append(tower)
+            return
+        self.parked[tower] = ready_tick
+        self.wheel[ready_tick % self.slots].append((ready_tick, tower))
+
+    def advance(self, frame_count):
+        """Move the wheel to the given frame and return the towers ready to attack"""
+        while self.current_tick < frame_count:
+            self.current_tick += 1
+            slot = self.current_tick % self.slots
+            bucket = self.wheel[slot]
+            if not bucket:
+                continue
+
+            remaining = []
+            for ready_tick, tower in bucket:
+                if ready_tick > self.current_tick:
+                    remaining.append((ready_tick, tower))  # Due on a later rotation
+                elif self.parked.get(tower) == ready_tick:
+                    del self.parked[tower]
+                    self.ready.append(tower)
+            self.wheel[slot] = remaining
+
+        return self.ready
+
+    def update(self, enemies, frame_count, damage_events=None, enemy_index=None):
+        """Run target acquisition for ready towers and park the ones that fired"""
+        still_ready = []
+        for tower in self.advance(frame_count):
+            tower.acquire_target(enemies, frame_count, damage_events, enemy_index)
+            if tower.last_attack == frame_count:
+                self._park(tower, frame_count + tower.attack_rate)
+            else:
+                still_ready.append(tower)
+        self.ready = still_ready
+
+    def __len__(self):
+        return len(self.ready) + len(self.parked)
@@ -4,6 +4,7 @@ User Interface for the tower defense game
 
 import pygame
 from config import *
+from entities.tower import TOWER_TYPES
 
 class UI:
     """Handles all UI elements"""
@@ -19,30 +20,42 @@ class UI:
         self.font_medium = pygame.font.Font(None, 24)
         self.font_small = pygame.font.Font(None, 18)
         
-        # Tower buttons
-        self.tower_buttons = {
-            "basic": pygame.Rect(SCREEN_WIDTH - 180, 150, 80, 40),
-            "sniper": pygame.Rect(SCREEN_WIDTH - 90, 150, 80, 40),
-            "machine_gun": pygame.Rect(SCREEN_WIDTH - 180, 200, 80, 40),
-            "cannon": pygame.Rect(SCREEN_WIDTH - 90, 200, 80, 40),
-        }
+        # Tower buttons, two per row
+        self.tower_buttons = {}
+        for index, tower_type in enumerate(TOWER_TYPES):
+            column, row = index % 2, index // 2
+            self.tower_buttons[tower_type] = pygame.Rect(
+                SCREEN_WIDTH - 180 + column * 90, 150 + row * 50, 80, 40
+            )
         
         # Control buttons
-        self.start_wave_button = pygame.Rect(SCREEN_WIDTH - 180, 350, 160, 40)
-        self.pause_button = pygame.Rect(SCREEN_WIDTH - 180, 400, 160, 40)
+        self.start_wave_button = pygame.Rect(SCREEN_WIDTH - 180, 470, 160, 40)
+        self.pause_button = pygame.Rect(SCREEN_WIDTH - 180, 520, 160, 40)
+        
+        # Selected tower controls
+        self.targeting_button = pygame.Rect(SCREEN_WIDTH - 180, 600, 160, 30)
+        self.upgrade_button = pygame.Rect(SCREEN_WIDTH - 180, 640, 160, 30)
+        self.sell_button = pygame.Rect(SCREEN_WIDTH - 180, 680, 160, 30)
         
         self.selected_tower_type = "basic"
         
         # Tower info
-        self.tower_info = {
-            "basic": {"name": "Basic", "cost": 50, "damage": 25, "range": 80},
-            "sniper": {"name": "Sniper", "cost": 100, "damage": 75, "range": 150},
-            "machine_gun": {"name": "M.Gun", "cost": 75, "damage": 10, "range": 60},
-            "cannon": {"name": "Cannon", "cost": 150, "damage": 100, "range": 90},
-        }
+        self.tower_info = {}
+        for tower_type, props in TOWER_TYPES.items():
+            self.tower_info[tower_type] = {
+                "name": props["name"], "cost": props["cost"],
+                "damage": props["damage"], "range": props["range"],
+                "splash": props["splash_radius"],
+                "effects": [kind.replace("_", " ").title() for kind, _, _ in props["effects"]],
+                "aura": props["aura"],
+            }
     
-    def handle_click(self, pos):
-        """Handle mouse clicks on UI elements"""
+    def handle_click(self, pos, tower_selected=False):
+        """Handle mouse clicks on UI elements
+        
+        The targeting, upgrade and sell buttons are only drawn, and only
+        respond, while a placed tower is selected.
+        """
         # Check tower buttons
         for tower_type, button_rect in self.tower_buttons.items():
             if button_rect.collidepoint(pos):
@@ -56,6 +69,18 @@ class UI:
         if self.pause_button.collidepoint(pos):
             return "pause_game"
         
+        if not tower_selected:
+            return None
+        
+        if self.targeting_button.collidepoint(pos):
+            return "cycle_targeting"
+        
+        if self.upgrade_button.collidepoint(pos):
+            return "upgrade_tower"
+        
+        if self.sell_button.collidepoint(pos):
+            return "sell_tower"
+        
         return None
     
     def draw(self, screen, game_state):
@@ -84,6 +109,12 @@ class UI:
         wave_text = self.font_medium.render(f"Wave: {game_state.get('wave', 1)}", 
                                           True, BLACK)
         screen.blit(wave_text, (panel_left, y_offset))
+        
+        # Predicted trouble with the next wave
+        wave_warning = game_state.get('wave_warning')
+        if wave_warning:
+            warning_text = self.font_small.render(wave_warning, True, RED)
+            screen.blit(warning_text, (panel_left, y_offset + 24))
         y_offset += 40
         
         # Tower selection title
@@ -132,6 +163,25 @@ class UI:
         cost_text = self.font_small.render(f"Cost: ${selected_info['cost']}", True, BLACK)
         screen.blit(cost_text, (panel_left, y_offset))
         
+        if selected_info.get('splash'):
+            y_offset += 15
+            splash_text = self.font_small.render(f"Splash: {selected_info['splash']}", True, BLACK)
+            screen.blit(splash_text, (panel_left, y_offset))
+        
+        if selected_info.get('aura'):
+            y_offset += 15
+            aura = selected_info['aura']
+            aura_text = self.font_small.render(
+                f"Aura: +{int(aura['damage'] * 100)}% dmg, +{int(aura['attack_rate'] * 100)}% rate",
+                True, BLACK)
+            screen.blit(aura_text, (panel_left, y_offset))
+        
+        if selected_info.get('effects'):
+            y_offset += 15
+            effects_text = self.font_small.render(
+                f"Effects: {', '.join(selected_info['effects'])}", True, BLACK)
+            screen.blit(effects_text, (panel_left, y_offset))
+        
         # Control buttons
         # Start wave button
         wave_color = GREEN if not game_state.get('wave_active', False) else GRAY
@@ -153,6 +203,44 @@ class UI:
         pause_text_rect = pause_text.get_rect(center=self.pause_button.center)
         screen.blit(pause_text, pause_text_rect)
         
+        # Selected tower panel
+        selected_tower = game_state.get('selected_tower')
+        if selected_tower is not None:
+            tower_name = self.tower_info.get(selected_tower.tower_type, {}).get("name", selected_tower.tower_type)
+            selected_text = self.font_small.render(
+                f"Selected: {tower_name} (level {selected_tower.level})", True, BLACK)
+            screen.blit(selected_text, (panel_left, self.targeting_button.y - 20))
+            
+            pygame.draw.rect(screen, WHITE, self.targeting_button)
+            pygame.draw.rect(screen, BLACK, self.targeting_button, 2)
+            
+            targeting_text = self.font_small.render(
+                f"Target: {selected_tower.targeting.capitalize()}", True, BLACK)
+            targeting_text_rect = targeting_text.get_rect(center=self.targeting_button.center)
+            screen.blit(targeting_text, targeting_text_rect)
+            
+            # Upgrade button, greyed out when unaffordable
+            upgrade_cost = game_state.get('upgrade_cost', 0)
+            upgrade_color = GREEN if game_state.get('money', 0) >= upgrade_cost else GRAY
+            pygame.draw.rect(screen, upgrade_color, self.upgrade_button)
+            pygame.draw.rect(screen, BLACK, self.upgrade_button, 2)
+            upgrade_text = self.font_small.render(f"Upgrade ${upgrade_cost} (U)", True, BLACK)
+            screen.blit(upgrade_text, upgrade_text.get_rect(center=self.upgrade_button.center))
+            
+            # Sell button
+            pygame.draw.rect(screen, ORANGE, self.sell_button)
+            pygame.draw.rect(screen, BLACK, self.sell_button, 2)
+            sell_text = self.font_small.render(
+                f"Sell for ${game_state.get('sell_value', 0)} (S)", True, BLACK)
+            screen.blit(sell_text, sell_text.get_rect(center=self.sell_button.center))
+        
+        # How far back R can rewind
+        rewind_seconds = game_state.get('rewind_seconds')
+        if rewind_seconds is not None:
+            rewind_text = self.font_small.render(
+                f"Rewind: {rewind_seconds:.0f}s available (R)", True, BLACK)
+            screen.blit(rewind_text, (panel_left, SCREEN_HEIGHT - 30))
+        
         # Game over or victory message
         if game_state.get('game_over', False):
             game_over_text = self.font_large.render("GAME OVER", True, RED)
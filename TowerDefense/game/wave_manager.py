@@ -8,8 +8,9 @@ from entities.enemy import Enemy
 class WaveManager:
     """Manages enemy waves and spawning"""
     
-    def __init__(self, path_points):
+    def __init__(self, path_points, seed=None):
         self.path_points = path_points
+        self.rng = random.Random(seed)  # Seeded for reproducible spawn orders
         self.current_wave = 0
         self.enemies_in_wave = []
         self.enemies_spawned = 0
@@ -44,18 +45,7 @@ class WaveManager:
         self.enemies_spawned = 0
         self.spawn_timer = 0
         
-        # Get wave configuration
-        wave_index = min(self.current_wave - 1, len(self.wave_configs) - 1)
-        config = self.wave_configs[wave_index]
-        
-        # If beyond predefined waves, scale the last configuration
-        if self.current_wave > len(self.wave_configs):
-            scale_factor = 1 + (self.current_wave - len(self.wave_configs)) * 0.2
-            scaled_enemies = []
-            for enemy_type, count in config["enemies"]:
-                scaled_count = int(count * scale_factor)
-                scaled_enemies.append((enemy_type, scaled_count))
-            config = {"enemies": scaled_enemies, "spawn_delay": max(20, config["spawn_delay"] - 5)}
+        config = self.get_wave_config(self.current_wave)
         
         # Create enemy spawn queue
         self.enemies_in_wave = []
@@ -64,11 +54,26 @@ class WaveManager:
                 self.enemies_in_wave.append(enemy_type)
         
         # Shuffle for variety
-        random.shuffle(self.enemies_in_wave)
+        self.rng.shuffle(self.enemies_in_wave)
         self.spawn_delay = config["spawn_delay"]
         
         return True
     
+    def get_wave_config(self, wave_number):
+        """Get the enemy counts and spawn delay of a wave (1-based)"""
+        wave_index = min(wave_number - 1, len(self.wave_configs) - 1)
+        config = self.wave_configs[wave_index]
+        
+        # If beyond predefined waves, scale the last configuration
+        if wave_number > len(self.wave_configs):
+            scale_factor = 1 + (wave_number - len(self.wave_configs)) * 0.2
+            scaled_enemies = []
+            for enemy_type, count in config["enemies"]:
+                scaled_count = int(count * scale_factor)
+                scaled_enemies.append((enemy_type, scaled_count))
+            config = {"enemies": scaled_enemies, "spawn_delay": max(20, config["spawn_delay"] - 5)}
+        return config
+    
     def update(self, enemies_list, frame_count):
         """Update wave spawning logic"""
         if not self.wave_active:
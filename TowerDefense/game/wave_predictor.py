@@ -0,0 +1,181 @@
+"""
+Analytic wave outcome estimate from tower damage rates along the path
+"""
+
+import numpy as np
+from config import *
+from entities.enemy import ENEMY_TYPES
+
+def _merge(intervals):
+    """Sort and merge arc-length intervals"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+def _overlap(intervals, others):
+    """Total length shared by two sorted, merged interval lists"""
+    total = 0.0
+    i = j = 0
+    while i < len(intervals) and j < len(others):
+        start = max(intervals[i][0], others[j][0])
+        end = min(intervals[i][1], others[j][1])
+        if end > start:
+            total += end - start
+        if intervals[i][1] < others[j][1]:
+            i += 1
+        else:
+            j += 1
+    return total
+
+class WavePredictor:
+    """Estimates whether the current towers can kill every enemy of a wave
+
+    Each attacking tower is reduced to numbers once per layout: the arc
+    length of path inside its range, its damage per shot and frames per
+    shot. An enemy moving at speed v stays in range for length / v frames,
+    but while enemies stream past one every spawn_delay frames a tower can
+    give each of them at most spawn_delay frames of its attention, so the
+    damage one enemy receives is the sum over towers of
+    min(length / v, spawn_delay) / attack_rate shots. Shots are capped at
+    the enemy's health (overkill), splash counts the neighbours expected
+    within its radius at that spacing, poison (which does not stack) adds
+    its damage over the time spent in poison range plus its duration, and
+    path inside a frost tower's range is stretched by its slow. Armor break
+    and the slow that lingers after leaving frost range are ignored, which
+    errs on the side of danger. Enemy types whose damage falls short of their health are
+    predicted to leak.
+
+    Predictions are cached per wave until the layout changes.
+    """
+
+    def __init__(self, path, wave_manager, danger_margin=PREDICTOR_DANGER_MARGIN):
+        self.path = path
+        self.wave_manager = wave_manager
+        self.danger_margin = danger_margin
+        self.tower_count = 0
+        self._towers = None
+        self._cache = {}
+        self.set_towers([])
+
+    def refresh(self, towers):
+        """Recompute the layout figures if the tower list changed since the last call"""
+        if towers is not self._towers or len(towers) != self.tower_count:
+            self.set_towers(towers)
+
+    def invalidate(self):
+        """Recompute the layout on the next refresh (a tower was upgraded or sold)
+
+        Nothing is recomputed here, so upgrades mid-wave cost nothing until
+        the next prediction between waves.
+        """
+        self._towers = None
+
+    def set_towers(self, towers):
+        """Precompute the per-tower figures of a layout"""
+        coverage = []
+        for tower in towers:
+            intervals = tower.coverage
+            if intervals is None or tower.path is not self.path:
+                intervals = self.path.coverage_intervals((tower.position.x, tower.position.y),
+                                                         tower.range)
+            coverage.append(intervals)
+
+        # Path stretches slowed by frost towers (the strongest slow applies)
+        slowed = []
+        slow = 0.0
+        for tower, intervals in zip(towers, coverage):
+            for kind, magnitude, _ in tower.effects:
+                if kind == "slow":
+                    slowed.extend(intervals)
+                    slow = max(slow, magnitude)
+        slowed = _merge(slowed)
+        stretch = 1.0 / (1.0 - slow) - 1.0 if slow < 1.0 else 0.0
+
+        # Poison does not stack: one dose per enemy, refreshed by every hit
+        poisoned = []
+        poison_rate = poison_duration = 0.0
+        lengths, damages, rates, splashes, poisoners = [], [], [], [], []
+        for tower, intervals in zip(towers, coverage):
+            if tower.aura is not None or tower.damage <= 0 or not intervals:
+                continue
+            length = sum(end - start for start, end in intervals)
+            lengths.append(length + _overlap(intervals, slowed) * stretch)
+            damages.append(tower.damage)
+            rates.append(tower.attack_rate)
+            splashes.append(tower.splash_radius)
+            poison = [(magnitude, duration) for kind, magnitude, duration in tower.effects
+                      if kind == "poison"]
+            poisoners.append(bool(poison))
+            if poison:
+                poisoned.extend(intervals)
+                poison_rate = max(poison_rate, poison[0][0] / 60.0)  # Damage per frame
+                poison_duration = max(poison_duration, poison[0][1])
+        poisoned = _merge(poisoned)
+
+        self.lengths = np.array(lengths, dtype=np.float64)
+        self.damages = np.array(damages, dtype=np.float64)
+        self.rates = np.array(rates, dtype=np.float64)
+        self.splashes = np.array(splashes, dtype=np.float64)
+        self.poisoners = np.array(poisoners, dtype=bool)
+        self.poison_rate = poison_rate
+        self.poison_duration = poison_duration
+        self.poison_length = (sum(end - start for start, end in poisoned)
+                              + _overlap(poisoned, slowed) * stretch)
+        self.tower_count = len(towers)
+        self._towers = towers
+        self._cache.clear()
+
+    def predict(self, wave_number):
+        """Estimate a wave's outcome against the current layout
+
+        Returns a dict with the wave's total health, the damage expected to
+        land, the number of enemies expected to leak, the margin (least
+        damage over health across enemy types, infinite for a wave with no
+        enemies) and whether the wave looks dangerous (leaks, or a margin
+        under danger_margin).
+        """
+        cached = self._cache.get(wave_number)
+        if cached is not None:
+            return cached
+
+        config = self.wave_manager.get_wave_config(wave_number)
+        names = [name for name, count in config["enemies"] if count > 0]
+        counts = np.array([count for _, count in config["enemies"] if count > 0], dtype=np.float64)
+        health = np.array([ENEMY_TYPES[name]["health"] for name in names], dtype=np.float64)
+        speed = np.array([ENEMY_TYPES[name]["speed"] for name in names], dtype=np.float64)
+        spacing = float(config["spawn_delay"])
+
+        if len(self.lengths) and len(names):
+            # Rows are enemy types, columns are towers
+            in_range = self.lengths / speed[:, None]
+            attention = np.minimum(in_range, spacing)
+            per_shot = np.minimum(self.damages, health[:, None])
+            neighbours = np.minimum(2.0 * self.splashes / (speed[:, None] * spacing), 2.0)
+            damage = (attention / self.rates * per_shot * (1.0 + neighbours)).sum(axis=1)
+            if self.poison_rate:
+                # Poison runs from the first hit until its duration after leaving range
+                hit = np.minimum((attention / self.rates)[:, self.poisoners].sum(axis=1), 1.0)
+                damage += hit * self.poison_rate * (self.poison_length / speed
+                                                    + self.poison_duration)
+        else:
+            damage = np.zeros(len(names))
+
+        ratio = damage / health
+        leaks = int(counts[ratio < 1.0].sum())
+        # An empty wave cannot leak, so nothing limits its margin
+        margin = float(ratio.min()) if len(names) else float("inf")
+        prediction = {
+            "wave": wave_number,
+            "enemies": int(counts.sum()),
+            "total_health": float((counts * health).sum()),
+            "expected_damage": float((counts * np.minimum(damage, health)).sum()),
+            "predicted_leaks": leaks,
+            "margin": margin,
+            "dangerous": leaks > 0 or margin < self.danger_margin,
+        }
+        self._cache[wave_number] = prediction
+        return prediction
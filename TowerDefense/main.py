@@ -3,16 +3,24 @@
 Main entry point for the game
 """
 
+import time
+_started = time.perf_counter()  # Taken before the heavy imports so they count towards startup
+
 import pygame
 import sys
 from game.tower_defense_game import TowerDefenseGame
+from utils.timing import StartupTimer
 
 def main():
     """Main function to run the tower defense game"""
     print("Initializing Tower Defense Game...")
+    startup = StartupTimer(_started)
+    startup.mark("imports")
     
     try:
-        pygame.init()
+        # The game only needs the display and fonts; a full pygame.init() also opens audio
+        pygame.display.init()
+        pygame.font.init()
         print("Pygame initialized successfully")
     except Exception as e:
         print(f"Error initializing pygame: {e}")
@@ -20,7 +28,7 @@ def main():
     
     try:
         print("Creating game instance...")
-        game = TowerDefenseGame()
+        game = TowerDefenseGame(startup=startup)
         print("Game instance created, starting game loop...")
         game.run()
     except Exception as e:
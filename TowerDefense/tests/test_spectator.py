@@ -0,0 +1,132 @@
+"""
+Loopback test for spectator streaming: a server and a client on localhost
+"""
+
+import os
+import sys
+import time
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+from game.tower_defense_game import TowerDefenseGame
+from game.spectator import SpectatorServer, SpectatorClient, SpectatorMirror
+
+class TestSpectatorLoopback(unittest.TestCase):
+    """Broadcast a keyframe and deltas over a socket and compare the mirror to the game"""
+
+    def setUp(self):
+        pygame.init()
+        self.game = TowerDefenseGame(headless=True, simulation_process=False, seed=3,
+                                     record_replay=False, rewind=False, instruments=False)
+        self.view = TowerDefenseGame(headless=True, simulation_process=False,
+                                     record_replay=False, rewind=False, instruments=False)
+        self.mirror = SpectatorMirror(self.view)
+        self.server = SpectatorServer(port=0)
+        self.server.start()
+        self.game.events.add_listener(self.server.encoder)
+        self.client = SpectatorClient(port=self.server.port)
+        self.client.start()
+        deadline = time.monotonic() + 5
+        while not self.server.spectators and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(self.server.spectators, "client never connected")
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def receive(self, ticks=1):
+        """Advance and broadcast one tick at a time, returning each tick's payload"""
+        payloads = []
+        for _ in range(ticks):
+            self.game.update_game_logic()
+            self.server.broadcast(self.game)
+            deadline = time.monotonic() + 5
+            received = []
+            while not received and time.monotonic() < deadline:
+                received = self.client.take()
+                time.sleep(0.001)
+            self.assertEqual(len(received), 1)
+            payloads.extend(received)
+        return payloads
+
+    def tick(self, ticks=1):
+        """Advance, broadcast and apply one frame at a time, so none are dropped"""
+        for payload in self.receive(ticks):
+            self.assertTrue(self.mirror.apply(payload))
+
+    def assertMirrors(self):
+        game, view = self.game, self.view
+        live = [enemy for enemy in game.enemies if enemy.alive and not enemy.reached_end]
+        mirrored = {enemy.uid: enemy for enemy in view.enemies}
+        self.assertEqual(sorted(mirrored), sorted(enemy.uid for enemy in live))
+        for enemy in live:
+            copy = mirrored[enemy.uid]
+            self.assertAlmostEqual(copy.position.x, enemy.position.x, places=3)
+            self.assertAlmostEqual(copy.position.y, enemy.position.y, places=3)
+            self.assertAlmostEqual(copy.health, enemy.health, places=3)
+            self.assertAlmostEqual(copy.speed, enemy.speed, places=5)
+            self.assertEqual(copy.poisoned, enemy.poisoned)
+        self.assertEqual({tower.uid: (tower.tower_type, tower.level, tower.targeting, tower.cost)
+                          for tower in view.towers},
+                         {tower.uid: (tower.tower_type, tower.level, tower.targeting, tower.cost)
+                          for tower in game.towers})
+        self.assertEqual((view.money, view.lives, view.score, view.frame_count),
+                         (game.money, game.lives, game.score, game.frame_count))
+        self.assertEqual(view.wave_manager.current_wave, game.wave_manager.current_wave)
+
+    def test_keyframe_then_deltas(self):
+        game = self.game
+        game.money = 10000
+        game.apply_command(("place", 4 * 40 + 5, 3 * 40 + 5, "frost"))
+        self.tick()  # The first frame is the keyframe
+        self.assertEqual(len(self.view.towers), 1)
+        self.assertMirrors()
+
+        game.apply_command(("start_wave",))
+        self.tick(120)
+        self.assertTrue(game.enemies, "wave spawned nothing")
+        self.assertMirrors()
+
+        # Stronger than the frost tower's slow, so only the sent speed can match it
+        enemy = next(enemy for enemy in game.enemies if enemy.alive)
+        game.status_effects.apply_all(enemy, [("slow", 0.7, 600)], game.frame_count)
+        game.apply_command(("place", 6 * 40 + 5, 3 * 40 + 5, "poison"))
+        game.apply_command(("upgrade", 4 * 40 + 5, 3 * 40 + 5))
+        self.tick(5)
+        self.assertMirrors()
+        copy = next(copy for copy in self.view.enemies if copy.uid == enemy.uid)
+        self.assertAlmostEqual(copy.speed, copy.base_speed * 0.3, places=5)
+        self.assertEqual(sorted(tower.level for tower in self.view.towers), [1, 2])
+
+    def test_gap_waits_for_keyframe(self):
+        game = self.game
+        game.apply_command(("start_wave",))
+        self.tick(60)
+        self.assertMirrors()
+
+        # Lose one delta in transit; the ones after it must not be applied
+        _, *later = self.receive(4)
+        frame_count = self.view.frame_count
+        for payload in later:
+            self.assertFalse(self.mirror.apply(payload))
+        self.assertFalse(self.mirror.synced)
+        self.assertTrue(self.mirror.wants_keyframe)
+        self.assertEqual(self.view.frame_count, frame_count)
+
+        self.client.request_keyframe()
+        deadline = time.monotonic() + 5
+        while not self.mirror.synced and time.monotonic() < deadline:
+            for payload in self.receive():
+                self.mirror.apply(payload)
+        self.assertTrue(self.mirror.synced)
+        self.assertFalse(self.mirror.wants_keyframe)
+        self.assertMirrors()
+        self.tick(30)
+        self.assertMirrors()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,4 +2,6 @@
 Utilities package initialization
 """
 
-from .vector2d import Vector2D
\ No newline at end of file
+from .vector2d import Vector2D, vectors_to_array, array_to_vectors
+from .path_geometry import PathGeometry, get_path_geometry
+from .timing import StartupTimer
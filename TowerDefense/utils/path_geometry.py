@@ -0,0 +1,195 @@
+"""
+Path geometry helpers for arc-length based movement and interception
+"""
+
+import math
+from bisect import bisect_right
+
+class PathGeometry:
+    """Polyline path with precomputed arc-length tables"""
+
+    def __init__(self, path_points):
+        self.points = [(float(x), float(y)) for x, y in path_points]
+        self.cumulative = [0.0]  # Arc length at the start of each point
+        self.directions = []     # Unit direction of each segment
+
+        for (x0, y0), (x1, y1) in zip(self.points, self.points[1:]):
+            length = math.hypot(x1 - x0, y1 - y0)
+            self.cumulative.append(self.cumulative[-1] + length)
+            if length > 0:
+                self.directions.append(((x1 - x0) / length, (y1 - y0) / length))
+            else:
+                self.directions.append((0.0, 0.0))
+
+        self.total_length = self.cumulative[-1]
+        self.segment_count = len(self.directions)
+
+    def __reduce__(self):
+        # Unpickle to the shared instance for these points instead of a private copy
+        return (get_path_geometry, (self.points,))
+
+    def segment_at(self, distance, hint=0):
+        """Get the index of the segment containing the given arc length"""
+        cumulative = self.cumulative
+        last = self.segment_count - 1
+
+        # Enemies only move forward, so walking from the previous segment is O(1)
+        if 0 <= hint <= last and cumulative[hint] <= distance:
+            while hint < last and distance >= cumulative[hint + 1]:
+                hint += 1
+            return hint
+
+        return min(max(bisect_right(cumulative, distance) - 1, 0), last)
+
+    def point_at(self, distance, hint=0):
+        """Get the (x, y) position at the given arc length along the path"""
+        if distance >= self.total_length:
+            return self.points[-1]
+        if distance <= 0:
+            return self.points[0]
+
+        index = self.segment_at(distance, hint)
+        start_x, start_y = self.points[index]
+        dir_x, dir_y = self.directions[index]
+        offset = distance - self.cumulative[index]
+        return (start_x + dir_x * offset, start_y + dir_y * offset)
+
+    def normal_at(self, distance, hint=0, blend=0.0):
+        """Get the unit normal (left of travel) at the given arc length
+
+        Over the first `blend` units of a segment the normal turns from the
+        previous segment's, so points offset along it stay continuous at corners.
+        """
+        index = self.segment_at(distance, hint)
+        dir_x, dir_y = self.directions[index]
+        offset = distance - self.cumulative[index]
+        if index > 0 and offset < blend:
+            t = max(offset, 0.0) / blend
+            prev_x, prev_y = self.directions[index - 1]
+            dir_x = prev_x + (dir_x - prev_x) * t
+            dir_y = prev_y + (dir_y - prev_y) * t
+            length = math.hypot(dir_x, dir_y)
+            if length > 0:
+                dir_x /= length
+                dir_y /= length
+        return (dir_y, -dir_x)
+
+    def intercept_time(self, distance, speed, origin, projectile_speed, max_travel=None):
+        """Solve when a projectile fired now from origin meets an enemy on the path
+
+        The enemy is at arc length `distance` and advances `speed` per frame.
+        Returns the time in frames, or None if the enemy leaves the path (or the
+        projectile would exceed `max_travel`) before it can be caught.
+        """
+        origin_x, origin_y = origin
+
+        # Stationary target: straight-line flight time
+        if speed <= 0:
+            target_x, target_y = self.point_at(distance)
+            time = math.hypot(target_x - origin_x, target_y - origin_y) / projectile_speed
+            if max_travel is not None and time * projectile_speed > max_travel:
+                return None
+            return time
+
+        speed_sq_diff = speed * speed - projectile_speed * projectile_speed
+        index = self.segment_at(distance)
+
+        for segment in range(index, self.segment_count):
+            # Time window the enemy spends on this segment
+            time_start = max(0.0, (self.cumulative[segment] - distance) / speed)
+            time_end = (self.cumulative[segment + 1] - distance) / speed
+            if time_end < time_start:
+                continue
+
+            # Enemy position on this segment as a linear function of time:
+            # P(t) = start + dir * (distance + speed * t - cumulative[segment])
+            start_x, start_y = self.points[segment]
+            dir_x, dir_y = self.directions[segment]
+            offset = distance - self.cumulative[segment]
+            rel_x = start_x + dir_x * offset - origin_x
+            rel_y = start_y + dir_y * offset - origin_y
+            vel_x = dir_x * speed
+            vel_y = dir_y * speed
+
+            # |rel + vel * t| = projectile_speed * t  ->  a t^2 + b t + c = 0
+            a = speed_sq_diff
+            b = 2 * (rel_x * vel_x + rel_y * vel_y)
+            c = rel_x * rel_x + rel_y * rel_y
+
+            roots = []
+            if abs(a) < 1e-9:
+                if b != 0:
+                    roots.append(-c / b)
+            else:
+                discriminant = b * b - 4 * a * c
+                if discriminant >= 0:
+                    sqrt_disc = math.sqrt(discriminant)
+                    roots.append((-b - sqrt_disc) / (2 * a))
+                    roots.append((-b + sqrt_disc) / (2 * a))
+
+            valid = [t for t in roots if time_start - 1e-9 <= t <= time_end + 1e-9 and t >= 0]
+            if valid:
+                time = min(valid)
+                if max_travel is not None and time * projectile_speed > max_travel:
+                    return None
+                return time
+
+        return None
+
+    def coverage_pieces(self, center, radius):
+        """Get the per-segment arc-length pieces of the path inside a circle
+
+        Each piece is (start, end, nearest) where nearest is the arc length of
+        the point in the piece closest to the circle's center. Distance to the
+        center is convex within a piece, which makes "closest" queries a bisect.
+        """
+        center_x, center_y = center
+        radius_sq = radius * radius
+        pieces = []
+
+        for segment in range(self.segment_count):
+            start_x, start_y = self.points[segment]
+            dir_x, dir_y = self.directions[segment]
+            length = self.cumulative[segment + 1] - self.cumulative[segment]
+            rel_x = start_x - center_x
+            rel_y = start_y - center_y
+
+            # |rel + dir * u|^2 <= r^2 for u in [0, length]
+            half_b = rel_x * dir_x + rel_y * dir_y
+            c = rel_x * rel_x + rel_y * rel_y - radius_sq
+            discriminant = half_b * half_b - c
+            if discriminant < 0:
+                continue
+
+            sqrt_disc = math.sqrt(discriminant)
+            enter = max(0.0, -half_b - sqrt_disc)
+            leave = min(length, -half_b + sqrt_disc)
+            if enter > leave:
+                continue
+
+            nearest = min(max(-half_b, enter), leave)
+            base = self.cumulative[segment]
+            pieces.append((base + enter, base + leave, base + nearest))
+
+        return pieces
+
+    def coverage_intervals(self, center, radius):
+        """Get the sorted, merged arc-length intervals of the path inside a circle"""
+        intervals = []
+        for start, end, _ in self.coverage_pieces(center, radius):
+            if intervals and start <= intervals[-1][1] + 1e-9:
+                intervals[-1] = (intervals[-1][0], max(intervals[-1][1], end))
+            else:
+                intervals.append((start, end))
+        return intervals
+
+_geometry_cache = {}
+
+def get_path_geometry(path_points):
+    """Get a shared PathGeometry for the given path points"""
+    key = tuple((point[0], point[1]) for point in path_points)
+    geometry = _geometry_cache.get(key)
+    if geometry is None:
+        geometry = PathGeometry(key)
+        _geometry_cache[key] = geometry
+    return geometry
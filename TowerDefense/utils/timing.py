@@ -0,0 +1,28 @@
+"""
+Phase timing for startup reports
+"""
+
+import time
+
+class StartupTimer:
+    """Records how long each named startup phase took"""
+
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        self.phases = []  # (label, seconds)
+
+    def mark(self, label):
+        """End the current phase under the given label"""
+        now = time.perf_counter()
+        self.phases.append((label, now - self.last))
+        self.last = now
+
+    def total(self):
+        """Seconds from start to the last mark"""
+        return self.last - self.start
+
+    def report(self):
+        """One-line breakdown of every phase"""
+        phases = ", ".join(f"{label} {seconds * 1000:.0f} ms" for label, seconds in self.phases)
+        return f"Startup took {self.total() * 1000:.0f} ms ({phases})"
@@ -5,7 +5,14 @@ Vector2D class for position and movement calculations
 import math
 
 class Vector2D:
-    """2D Vector class for handling positions, velocities, and directions"""
+    """2D Vector class for handling positions, velocities, and directions
+    
+    Slotted to keep instances small. Operators return new vectors; the
+    trailing-underscore and i-prefixed methods update the vector in place and
+    return it, for hot paths that would otherwise allocate every frame.
+    """
+    
+    __slots__ = ("x", "y")
     
     def __init__(self, x=0, y=0):
         self.x = float(x)
@@ -27,9 +34,45 @@ class Vector2D:
         """Divide vector by scalar"""
         return Vector2D(self.x / scalar, self.y / scalar)
     
+    def set(self, x, y):
+        """Overwrite both components in place"""
+        self.x = x
+        self.y = y
+        return self
+    
+    def iadd(self, other):
+        """Add another vector in place"""
+        self.x += other.x
+        self.y += other.y
+        return self
+    
+    def isub(self, other):
+        """Subtract another vector in place"""
+        self.x -= other.x
+        self.y -= other.y
+        return self
+    
+    def scale_(self, scalar):
+        """Multiply by a scalar in place"""
+        self.x *= scalar
+        self.y *= scalar
+        return self
+    
+    def normalize_(self):
+        """Scale to unit length in place (zero vectors stay zero)"""
+        mag = math.hypot(self.x, self.y)
+        if mag != 0:
+            self.x /= mag
+            self.y /= mag
+        return self
+    
+    def copy(self):
+        """Get an independent copy"""
+        return Vector2D(self.x, self.y)
+    
     def magnitude(self):
         """Calculate the magnitude (length) of the vector"""
-        return math.sqrt(self.x ** 2 + self.y ** 2)
+        return math.hypot(self.x, self.y)
     
     def normalize(self):
         """Return a normalized (unit) vector"""
@@ -38,13 +81,48 @@ class Vector2D:
             return Vector2D(0, 0)
         return Vector2D(self.x / mag, self.y / mag)
     
+    def distance_sq_to(self, other):
+        """Squared distance to another vector, for comparisons against a squared radius"""
+        dx = other.x - self.x
+        dy = other.y - self.y
+        return dx * dx + dy * dy
+    
     def distance_to(self, other):
         """Calculate distance to another vector"""
-        return (other - self).magnitude()
+        return math.hypot(other.x - self.x, other.y - self.y)
     
     def to_tuple(self):
         """Convert to tuple for pygame compatibility"""
         return (int(self.x), int(self.y))
     
+    def to_screen(self, offset):
+        """Convert to an integer tuple relative to a camera offset"""
+        return (int(self.x - offset[0]), int(self.y - offset[1]))
+    
+    @classmethod
+    def from_array(cls, row):
+        """Create a vector from a length-2 sequence or NumPy row"""
+        return cls(row[0], row[1])
+    
     def __str__(self):
-        return f"Vector2D({self.x:.2f}, {self.y:.2f})"
\ No newline at end of file
+        return f"Vector2D({self.x:.2f}, {self.y:.2f})"
+
+def vectors_to_array(vectors, out=None):
+    """Pack vectors into an (n, 2) float array, reusing out when it is large enough"""
+    import numpy as np
+    count = len(vectors)
+    if out is None or len(out) < count:
+        out = np.empty((count, 2), dtype=np.float64)
+    out = out[:count]
+    out[:, 0] = [vector.x for vector in vectors]
+    out[:, 1] = [vector.y for vector in vectors]
+    return out
+
+def array_to_vectors(array, vectors=None):
+    """Copy an (n, 2) array into Vector2Ds, updating existing ones in place when given"""
+    rows = array.tolist()
+    if vectors is None:
+        return [Vector2D(x, y) for x, y in rows]
+    for vector, (x, y) in zip(vectors, rows):
+        vector.set(x, y)
+    return vectors